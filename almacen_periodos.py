@@ -0,0 +1,432 @@
+"""
+Almacén local de períodos procesados
+Persiste en SQLite las marcaciones normalizadas y los resultados de cada cálculo para
+reabrir quincenas, recalcular sin volver a leer los PDFs y consultar acumulados
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Dict, Optional, Union
+
+from calculations import serie_hora_a_minutos
+
+# pandas se importa dentro de cada función: la página inicial consulta el almacén
+# (hay_periodos) sin cargarlo
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from resultados_por_partes import ResultadosPorPartes
+
+ARCHIVO_BASE_DATOS = os.path.join(os.path.dirname(__file__), "periodos_procesados.sqlite")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS periodos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    creado TEXT NOT NULL,
+    fecha_desde TEXT,
+    fecha_hasta TEXT,
+    valor_por_hora REAL,
+    feriados TEXT,
+    firma TEXT UNIQUE
+);
+CREATE TABLE IF NOT EXISTS marcaciones (
+    periodo_id INTEGER NOT NULL REFERENCES periodos(id) ON DELETE CASCADE,
+    empleado TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    entrada TEXT,
+    salida TEXT,
+    descuento_inventario REAL DEFAULT 0,
+    descuento_caja REAL DEFAULT 0,
+    retiro REAL DEFAULT 0,
+    id_registro INTEGER,
+    clave_empleado TEXT
+);
+CREATE TABLE IF NOT EXISTS resultados (
+    periodo_id INTEGER NOT NULL REFERENCES periodos(id) ON DELETE CASCADE,
+    empleado TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    entrada TEXT,
+    salida TEXT,
+    feriado TEXT,
+    minutos_trabajados INTEGER,
+    minutos_normales INTEGER,
+    minutos_especiales INTEGER,
+    descuento_inventario REAL,
+    descuento_caja REAL,
+    retiro REAL,
+    sueldo_final REAL,
+    sueldo_centavos INTEGER,
+    observaciones TEXT,
+    id_registro INTEGER,
+    clave_empleado TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_marcaciones_empleado_fecha ON marcaciones(empleado, fecha);
+CREATE INDEX IF NOT EXISTS idx_marcaciones_periodo ON marcaciones(periodo_id);
+CREATE INDEX IF NOT EXISTS idx_resultados_empleado_fecha ON resultados(empleado, fecha);
+CREATE INDEX IF NOT EXISTS idx_resultados_periodo ON resultados(periodo_id);
+"""
+
+# Índice por empleado creado después de agregar clave_empleado (ver _migrar)
+_INDICE_CLAVE_EMPLEADO = (
+    "CREATE INDEX IF NOT EXISTS idx_resultados_clave_fecha ON resultados(clave_empleado, fecha)"
+)
+
+# Columnas del reporte de resultados -> columnas de la tabla resultados
+_COLUMNAS_RESULTADOS = {
+    "Empleado": "empleado",
+    "Fecha": "fecha",
+    "Entrada": "entrada",
+    "Salida": "salida",
+    "Feriado": "feriado",
+    "Descuento Inventario": "descuento_inventario",
+    "Descuento Caja": "descuento_caja",
+    "Retiro": "retiro",
+    "_sueldo_centavos": "sueldo_centavos",
+    "Observaciones": "observaciones",
+    "Id_Registro": "id_registro"
+}
+
+# Columnas agregadas después de la primera versión del esquema: (tabla, columna, tipo).
+# Los sueldos se guardan en centavos enteros; sueldo_final (REAL) queda solo en filas antiguas.
+# id_registro (Id_Registro de la ingesta, ver identificadores.py) queda vacío en filas antiguas.
+# clave_empleado (RegistroEmpleados.clave) agrupa a un empleado aunque su nombre se haya
+# guardado escrito de distintas formas; al agregarla se completa en las filas antiguas
+_COLUMNAS_AGREGADAS = [
+    ("resultados", "sueldo_centavos", "INTEGER"),
+    ("marcaciones", "id_registro", "INTEGER"),
+    ("resultados", "id_registro", "INTEGER"),
+    ("marcaciones", "clave_empleado", "TEXT"),
+    ("resultados", "clave_empleado", "TEXT"),
+]
+
+_COLUMNAS_MINUTOS = {
+    "Horas Trabajadas (h:mm)": "minutos_trabajados",
+    "Horas Normales": "minutos_normales",
+    "Horas Especiales": "minutos_especiales"
+}
+
+
+def conectar(ruta: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Abre (y crea si hace falta) la base de datos de períodos
+
+    Args:
+        ruta: Ruta del archivo SQLite (por defecto periodos_procesados.sqlite)
+
+    Returns:
+        sqlite3.Connection: Conexión lista para usar
+    """
+    conexion = sqlite3.connect(ruta or ARCHIVO_BASE_DATOS)
+    conexion.execute("PRAGMA foreign_keys = ON")
+    conexion.execute("PRAGMA journal_mode = WAL")
+    conexion.executescript(_ESQUEMA)
+    _migrar(conexion)
+    return conexion
+
+
+def _migrar(conexion: sqlite3.Connection):
+    """Agrega a una base creada por una versión anterior las columnas nuevas del esquema"""
+    for tabla, columna, tipo in _COLUMNAS_AGREGADAS:
+        existentes = {fila[1] for fila in conexion.execute(f"PRAGMA table_info({tabla})")}
+        if columna not in existentes:
+            conexion.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}")
+            if columna == "clave_empleado":
+                _completar_claves_empleado(conexion, tabla)
+    conexion.execute(_INDICE_CLAVE_EMPLEADO)
+    conexion.commit()
+
+
+def _completar_claves_empleado(conexion: sqlite3.Connection, tabla: str):
+    """Completa clave_empleado en las filas guardadas antes de la columna (una vez por nombre)"""
+    from registro_empleados import obtener_registro
+
+    registro = obtener_registro()
+    nombres = [fila[0] for fila in conexion.execute(f"SELECT DISTINCT empleado FROM {tabla}")]
+    conexion.executemany(
+        f"UPDATE {tabla} SET clave_empleado = ? WHERE empleado = ?",
+        [(registro.clave(nombre), nombre) for nombre in nombres]
+    )
+
+
+def _claves_empleado(empleados: pd.Series) -> pd.Series:
+    """Clave normalizada de cada empleado (RegistroEmpleados.clave), una vez por nombre distinto"""
+    from registro_empleados import obtener_registro
+
+    registro = obtener_registro()
+    return empleados.map({nombre: registro.clave(nombre) for nombre in empleados.unique()})
+
+
+@contextmanager
+def _abrir(ruta: Optional[str] = None):
+    """Abre una conexión, confirma la transacción al terminar y la cierra siempre"""
+    conexion = conectar(ruta)
+    try:
+        with conexion:
+            yield conexion
+    finally:
+        conexion.close()
+
+
+def _firma(df_marcaciones: pd.DataFrame, fechas_feriados) -> str:
+    """
+    Firma del período: marcaciones y feriados. El valor por hora y los descuentos no
+    forman parte, así volver a guardar el mismo período con otros montos lo actualiza
+    """
+    import pandas as pd
+
+    columnas = df_marcaciones[['Empleado', 'Fecha', 'Entrada', 'Salida']].astype(str)
+    digest = hashlib.sha1(pd.util.hash_pandas_object(columnas, index=False).values.tobytes())
+    digest.update(f"{sorted(str(f) for f in fechas_feriados or [])}".encode())
+    return digest.hexdigest()
+
+
+def _normalizar_marcaciones(df: pd.DataFrame) -> pd.DataFrame:
+    """Lleva las marcaciones al formato de la tabla marcaciones"""
+    import pandas as pd
+
+    return pd.DataFrame({
+        "empleado": df['Empleado'].astype(str),
+        "fecha": pd.to_datetime(df['Fecha']).dt.strftime('%Y-%m-%d'),
+        "entrada": df['Entrada'].astype(str),
+        "salida": df['Salida'].astype(str),
+        "descuento_inventario": pd.to_numeric(df.get('Descuento Inventario', 0), errors='coerce'),
+        "descuento_caja": pd.to_numeric(df.get('Descuento Caja', 0), errors='coerce'),
+        "retiro": pd.to_numeric(df.get('Retiro', 0), errors='coerce'),
+        "id_registro": df['Id_Registro'] if 'Id_Registro' in df.columns else None,
+        "clave_empleado": _claves_empleado(df['Empleado'].astype(str))
+    }).fillna({"descuento_inventario": 0, "descuento_caja": 0, "retiro": 0})
+
+
+def _partes_resultados(resultados):
+    """
+    Resultados de procesar_datos_excel como DataFrames: uno solo para una lista, o las partes
+    de a una para un período particionado (ResultadosPorPartes), sin unirlas en memoria
+    """
+    import pandas as pd
+    from resultados_por_partes import ResultadosPorPartes
+
+    if isinstance(resultados, ResultadosPorPartes):
+        return resultados.partes()
+    return [pd.DataFrame(resultados)]
+
+
+def guardar_periodo(df_marcaciones: pd.DataFrame, resultados: Union[List[Dict], ResultadosPorPartes], valor_por_hora: float,
+                    fechas_feriados=None, nombre: Optional[str] = None, ruta: Optional[str] = None) -> int:
+    """
+    Guarda las marcaciones normalizadas y los resultados de un cálculo
+
+    Si el mismo período (mismas marcaciones y feriados) ya estaba guardado, se actualiza
+    esa fila (valor por hora, descuentos y resultados) en lugar de agregar otra.
+
+    Args:
+        df_marcaciones: DataFrame final usado en procesar_datos_excel
+        resultados: Resultados devueltos por procesar_datos_excel (lista, o ResultadosPorPartes
+                    de un período particionado, que se guarda parte por parte)
+        valor_por_hora: Valor por hora usado
+        fechas_feriados: Fechas de feriados usadas
+        nombre: Nombre descriptivo del período (ej: archivo de origen)
+        ruta: Ruta de la base de datos
+
+    Returns:
+        int: Id del período guardado
+    """
+    import pandas as pd
+
+    firma = _firma(df_marcaciones, fechas_feriados)
+    marcaciones = _normalizar_marcaciones(df_marcaciones)
+
+    with _abrir(ruta) as conexion:
+        existente = conexion.execute("SELECT id FROM periodos WHERE firma = ?", (firma,)).fetchone()
+        if existente:
+            periodo_id = existente[0]
+            conexion.execute(
+                "UPDATE periodos SET creado = ?, valor_por_hora = ? WHERE id = ?",
+                (datetime.now().isoformat(timespec='seconds'), float(valor_por_hora), periodo_id)
+            )
+            conexion.execute("DELETE FROM marcaciones WHERE periodo_id = ?", (periodo_id,))
+            conexion.execute("DELETE FROM resultados WHERE periodo_id = ?", (periodo_id,))
+        else:
+            fecha_desde = marcaciones['fecha'].min() if not marcaciones.empty else None
+            fecha_hasta = marcaciones['fecha'].max() if not marcaciones.empty else None
+            cursor = conexion.execute(
+                "INSERT INTO periodos (nombre, creado, fecha_desde, fecha_hasta, valor_por_hora, feriados, firma) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    nombre or f"Período {fecha_desde} - {fecha_hasta}",
+                    datetime.now().isoformat(timespec='seconds'),
+                    fecha_desde,
+                    fecha_hasta,
+                    float(valor_por_hora),
+                    json.dumps(sorted(str(f) for f in fechas_feriados or [])),
+                    firma
+                )
+            )
+            periodo_id = cursor.lastrowid
+
+        marcaciones.insert(0, "periodo_id", periodo_id)
+        marcaciones.to_sql("marcaciones", conexion, if_exists="append", index=False)
+
+        for df_resultados in _partes_resultados(resultados):
+            if df_resultados.empty:
+                continue
+            tabla = pd.DataFrame({"periodo_id": periodo_id}, index=df_resultados.index)
+            for columna, destino in _COLUMNAS_RESULTADOS.items():
+                tabla[destino] = df_resultados[columna] if columna in df_resultados.columns else None
+            for columna, destino in _COLUMNAS_MINUTOS.items():
+                tabla[destino] = serie_hora_a_minutos(df_resultados[columna]).fillna(0).astype(int)
+            tabla["clave_empleado"] = _claves_empleado(df_resultados["Empleado"].astype(str))
+            tabla.to_sql("resultados", conexion, if_exists="append", index=False)
+
+    return periodo_id
+
+
+def hay_periodos(ruta: Optional[str] = None) -> bool:
+    """Indica si hay al menos un período guardado (consulta liviana, sin pandas)"""
+    with _abrir(ruta) as conexion:
+        return conexion.execute("SELECT 1 FROM periodos LIMIT 1").fetchone() is not None
+
+
+def listar_periodos(ruta: Optional[str] = None) -> pd.DataFrame:
+    """
+    Lista los períodos guardados, del más reciente al más antiguo
+
+    Returns:
+        DataFrame: id, nombre, creado, fecha_desde, fecha_hasta, valor_por_hora, registros
+    """
+    import pandas as pd
+
+    with _abrir(ruta) as conexion:
+        return pd.read_sql_query(
+            "SELECT p.id, p.nombre, p.creado, p.fecha_desde, p.fecha_hasta, p.valor_por_hora, "
+            "(SELECT COUNT(*) FROM marcaciones m WHERE m.periodo_id = p.id) AS registros "
+            "FROM periodos p ORDER BY p.fecha_hasta DESC, p.id DESC",
+            conexion
+        )
+
+
+def cargar_marcaciones(periodo_id: int, ruta: Optional[str] = None) -> pd.DataFrame:
+    """
+    Carga las marcaciones de un período en el formato estándar del sistema,
+    listas para procesar_datos_excel (sin volver a leer los PDFs)
+
+    Args:
+        periodo_id: Id del período
+
+    Returns:
+        DataFrame: Empleado, Fecha, Entrada, Salida, Descuento Inventario, Descuento Caja, Retiro
+                   e Id_Registro (solo si el período se guardó con sus identificadores)
+    """
+    import pandas as pd
+
+    with _abrir(ruta) as conexion:
+        df = pd.read_sql_query(
+            "SELECT empleado, fecha, entrada, salida, descuento_inventario, descuento_caja, retiro, id_registro "
+            "FROM marcaciones WHERE periodo_id = ? ORDER BY fecha, empleado",
+            conexion,
+            params=(periodo_id,)
+        )
+
+    df = df.rename(columns={
+        "empleado": "Empleado",
+        "fecha": "Fecha",
+        "entrada": "Entrada",
+        "salida": "Salida",
+        "descuento_inventario": "Descuento Inventario",
+        "descuento_caja": "Descuento Caja",
+        "retiro": "Retiro",
+        "id_registro": "Id_Registro"
+    })
+    df['Fecha'] = pd.to_datetime(df['Fecha'])
+    # Períodos guardados antes de id_registro: identificadores.asignar_id_registro los asigna
+    if df['Id_Registro'].isna().any():
+        df = df.drop(columns='Id_Registro')
+    else:
+        df['Id_Registro'] = df['Id_Registro'].astype('int64')
+    return df
+
+
+def cargar_resultados(periodo_id: int, ruta: Optional[str] = None) -> pd.DataFrame:
+    """
+    Carga los resultados guardados de un período
+
+    Returns:
+        DataFrame: Filas de resultados con minutos trabajados, normales y especiales, el
+                   sueldo en centavos enteros (sueldo_centavos) y el Id_Registro del registro
+                   (id_registro; vacío en filas guardadas antes de conservarlo)
+    """
+    import pandas as pd
+
+    with _abrir(ruta) as conexion:
+        df = pd.read_sql_query(
+            "SELECT * FROM resultados WHERE periodo_id = ? ORDER BY fecha, empleado",
+            conexion,
+            params=(periodo_id,)
+        )
+    # Filas guardadas antes de sueldo_centavos: solo tienen el sueldo en moneda
+    df['sueldo_centavos'] = df['sueldo_centavos'].fillna((df['sueldo_final'] * 100).round()).astype('int64')
+    return df
+
+
+def resumen_acumulado(desde: str, hasta: str, ruta: Optional[str] = None) -> pd.DataFrame:
+    """
+    Acumulado por empleado entre dos fechas (ej: año a la fecha) sobre los resultados guardados
+
+    Si un mismo día quedó guardado en varios períodos (recalculos), se usa el período más reciente.
+    Se agrupa por la clave normalizada del empleado, así un nombre guardado con otras
+    mayúsculas, acentos u orden no parte al empleado en varias filas; se muestra el nombre
+    con que figura en su período más reciente.
+
+    Args:
+        desde: Fecha inicial YYYY-MM-DD (inclusive)
+        hasta: Fecha final YYYY-MM-DD (inclusive)
+
+    Returns:
+        DataFrame: empleado, dias, minutos_trabajados, minutos_especiales, descuentos,
+                   sueldo_centavos (entero)
+    """
+    import pandas as pd
+
+    with _abrir(ruta) as conexion:
+        return pd.read_sql_query(
+            """
+            WITH ultimos AS (
+                SELECT clave_empleado, fecha, MAX(periodo_id) AS periodo_id
+                FROM resultados
+                WHERE fecha BETWEEN ? AND ?
+                GROUP BY clave_empleado, fecha
+            ),
+            nombres AS (
+                -- Con un único MAX, SQLite toma empleado de la fila del período más reciente
+                SELECT clave_empleado, MAX(periodo_id) AS periodo_id, empleado
+                FROM resultados
+                WHERE fecha BETWEEN ? AND ?
+                GROUP BY clave_empleado
+            )
+            SELECT n.empleado,
+                   COUNT(DISTINCT r.fecha) AS dias,
+                   SUM(r.minutos_trabajados) AS minutos_trabajados,
+                   SUM(r.minutos_especiales) AS minutos_especiales,
+                   SUM(r.descuento_inventario + r.descuento_caja + r.retiro) AS descuentos,
+                   SUM(COALESCE(r.sueldo_centavos, CAST(ROUND(r.sueldo_final * 100) AS INTEGER))) AS sueldo_centavos
+            FROM resultados r
+            JOIN ultimos u ON u.clave_empleado = r.clave_empleado AND u.fecha = r.fecha
+                          AND u.periodo_id = r.periodo_id
+            JOIN nombres n ON n.clave_empleado = r.clave_empleado
+            GROUP BY r.clave_empleado
+            ORDER BY n.empleado
+            """,
+            conexion,
+            params=(desde, hasta, desde, hasta)
+        )
+
+
+def eliminar_periodo(periodo_id: int, ruta: Optional[str] = None):
+    """Elimina un período con sus marcaciones y resultados"""
+    with _abrir(ruta) as conexion:
+        conexion.execute("DELETE FROM periodos WHERE id = ?", (periodo_id,))
@@ -0,0 +1,225 @@
+"""
+Detección de anomalías del período
+Revisa el período completo de una vez, con estadísticas por empleado calculadas con
+operaciones agrupadas de NumPy (sin recorrer filas en Python), y señala los registros atípicos:
+- Duración del turno fuera del rango habitual del empleado (IQR)
+- Entrada que se aparta del horario reciente del empleado (z-score circular sobre sus
+  registros anteriores, así los horarios cerca de la medianoche no parecen atípicos)
+- Descuentos o retiros inusualmente altos para el período (IQR sobre los montos distintos de 0)
+
+Complementa las reglas fijas de detectar_registros_incompletos y detectar_horarios_ambiguos:
+no modifica los datos, solo informa registros para revisar (errores de reloj o irregularidades).
+"""
+import numpy as np
+import pandas as pd
+
+from calculations import serie_hora_a_minutos, minutos_a_hora_str, minutos_a_horasminutos, MINUTOS_DIA
+from registro_empleados import clave_empleado
+
+# Registros anteriores del empleado que forman su horario reciente
+VENTANA_REGISTROS = 10
+
+# Registros mínimos (del empleado, o anteriores en la ventana) para evaluar un indicador
+MIN_REGISTROS = 5
+
+# Desvíos a partir de los cuales una entrada es atípica
+UMBRAL_Z = 3.0
+
+# Rango habitual = [Q1 - FACTOR × IQR, Q3 + FACTOR × IQR]
+FACTOR_IQR = 1.5
+FACTOR_IQR_MONTOS = 3.0
+
+# Márgenes mínimos (minutos) para empleados muy regulares, cuyo desvío o IQR es casi 0
+MARGEN_MINIMO_ENTRADA = 15
+MARGEN_MINIMO_DURACION = 30
+
+COLUMNAS_MONTOS = ["Descuento Inventario", "Descuento Caja", "Retiro"]
+
+COLUMNAS_ANOMALIAS = ["Empleado", "Fecha", "Indicador", "Valor", "Habitual", "Puntaje"]
+
+
+def _inicio_de_grupo(codigos: np.ndarray) -> np.ndarray:
+    """Posición de la primera fila del grupo de cada fila (filas ordenadas por grupo)"""
+    posiciones = np.arange(len(codigos))
+    cambio = np.ones(len(codigos), dtype=bool)
+    cambio[1:] = codigos[1:] != codigos[:-1]
+    return np.maximum.accumulate(np.where(cambio, posiciones, 0))
+
+
+def _media_y_desvio_previos(valores: np.ndarray, inicio_grupo: np.ndarray, ventana: int):
+    """
+    Media y desvío de los 'ventana' registros anteriores de cada fila dentro de su grupo,
+    con sumas acumuladas: costo lineal, sin recorrer los grupos en Python
+
+    Args:
+        valores: Valores ordenados por grupo y fecha (NaN = sin dato)
+        inicio_grupo: Resultado de _inicio_de_grupo
+        ventana: Registros anteriores considerados
+
+    Returns:
+        tuple: (media, desvio, cantidad) por fila; la fila actual no entra en su propia estadística
+    """
+    validos = ~np.isnan(valores)
+    x = np.where(validos, valores, 0.0)
+    suma = np.concatenate(([0.0], np.cumsum(x)))
+    suma_cuadrados = np.concatenate(([0.0], np.cumsum(x * x)))
+    cuenta = np.concatenate(([0], np.cumsum(validos)))
+
+    hasta = np.arange(len(valores))
+    desde = np.maximum(inicio_grupo, hasta - ventana)
+    cantidad = cuenta[hasta] - cuenta[desde]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = (suma[hasta] - suma[desde]) / cantidad
+        varianza = (suma_cuadrados[hasta] - suma_cuadrados[desde]) / cantidad - media ** 2
+    return media, np.sqrt(np.clip(varianza, 0, None)), cantidad
+
+
+def _hora_media_y_desvio_previos(minutos: np.ndarray, inicio_grupo: np.ndarray, ventana: int):
+    """
+    Media y desvío circulares (sobre las 24 horas) de las horas de los 'ventana' registros
+    anteriores de cada fila: 23:50 y 00:10 promedian 00:00, no 12:00
+
+    Cada hora se lleva a un ángulo del reloj; la media es la dirección del promedio de sus
+    cosenos y senos, y el desvío el circular, sqrt(-2 ln R) con R la longitud de ese promedio.
+    Para horarios regulares coincide con la media y el desvío lineales.
+
+    Args:
+        minutos: Minutos desde medianoche ordenados por grupo y fecha (NaN = sin dato)
+        inicio_grupo: Resultado de _inicio_de_grupo
+        ventana: Registros anteriores considerados
+
+    Returns:
+        tuple: (media en minutos [0, MINUTOS_DIA), desvío en minutos, cantidad) por fila
+    """
+    angulo = minutos * (2 * np.pi / MINUTOS_DIA)
+    media_cos, _, cantidad = _media_y_desvio_previos(np.cos(angulo), inicio_grupo, ventana)
+    media_sin, _, _ = _media_y_desvio_previos(np.sin(angulo), inicio_grupo, ventana)
+    largo = np.clip(np.hypot(media_cos, media_sin), 1e-12, 1.0)
+    media = (np.arctan2(media_sin, media_cos) * (MINUTOS_DIA / (2 * np.pi))) % MINUTOS_DIA
+    desvio = np.sqrt(-2 * np.log(largo)) * (MINUTOS_DIA / (2 * np.pi))
+    return media, desvio, cantidad
+
+
+def _diferencia_horaria(minutos: np.ndarray, referencia: np.ndarray) -> np.ndarray:
+    """Diferencia más corta en el reloj entre dos horas, en minutos (-720 a 720)"""
+    mitad = MINUTOS_DIA // 2
+    return (minutos - referencia + mitad) % MINUTOS_DIA - mitad
+
+
+def _cuartiles_por_grupo(valores: np.ndarray, codigos: np.ndarray):
+    """
+    Q1, Q3 y cantidad de valores válidos del grupo de cada fila (cuantiles agrupados de pandas)
+
+    Returns:
+        tuple: (q1, q3, cantidad) alineados a las filas
+    """
+    serie = pd.Series(valores)
+    grupos = serie.groupby(codigos)
+    q1 = grupos.quantile(0.25)
+    q3 = grupos.quantile(0.75)
+    cantidad = grupos.count()
+    return q1.to_numpy()[codigos], q3.to_numpy()[codigos], cantidad.to_numpy()[codigos]
+
+
+def detectar_anomalias(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Señala los registros atípicos del período (ver el encabezado del módulo)
+
+    Args:
+        df: Registros con Empleado, Fecha, Entrada, Salida y, si existen, los descuentos
+
+    Returns:
+        DataFrame: Una fila por anomalía (un registro puede tener varias) con Empleado, Fecha,
+                   Indicador, Valor, Habitual y Puntaje (desvíos respecto de lo habitual),
+                   ordenadas de mayor a menor puntaje. El índice es el del registro en df;
+                   incluye Id_Registro si df lo trae.
+    """
+    vacio = pd.DataFrame(columns=COLUMNAS_ANOMALIAS)
+    if df.empty:
+        return vacio
+
+    # Ordenar por empleado (Id_Empleado si ya se unificaron los nombres) y fecha: las
+    # estadísticas se calculan por tramos contiguos
+    codigos, _ = pd.factorize(clave_empleado(df), sort=True)
+    fechas = pd.to_datetime(df["Fecha"], errors='coerce')
+    con_empleado = np.flatnonzero(codigos >= 0)
+    orden = con_empleado[np.lexsort((fechas.to_numpy()[con_empleado], codigos[con_empleado]))]
+    if len(orden) == 0:
+        return vacio
+    codigos = codigos[orden]
+    inicio_grupo = _inicio_de_grupo(codigos)
+
+    entrada = serie_hora_a_minutos(df["Entrada"]).to_numpy(dtype=float)[orden]
+    salida = serie_hora_a_minutos(df["Salida"]).to_numpy(dtype=float)[orden]
+    duracion = (salida - entrada) % MINUTOS_DIA
+
+    hallazgos = []
+
+    def agregar(mascara, indicador, valores, habitual, puntaje):
+        """Agrega las filas marcadas; valores y habitual ya vienen solo para esas filas"""
+        if mascara.any():
+            hallazgos.append(pd.DataFrame({
+                "posicion": orden[mascara],
+                "Indicador": indicador,
+                "Valor": valores,
+                "Habitual": habitual,
+                "Puntaje": np.round(puntaje[mascara], 1)
+            }))
+
+    # Duración del turno fuera del rango habitual del empleado
+    q1, q3, cantidad = _cuartiles_por_grupo(duracion, codigos)
+    margen = np.maximum(FACTOR_IQR * (q3 - q1), MARGEN_MINIMO_DURACION)
+    with np.errstate(invalid='ignore'):
+        atipica = (cantidad >= MIN_REGISTROS) & ((duracion < q1 - margen) | (duracion > q3 + margen))
+        puntaje = np.abs(duracion - (q1 + q3) / 2) / np.maximum(q3 - q1, MARGEN_MINIMO_DURACION)
+    agregar(
+        atipica, "Duración del turno",
+        minutos_a_horasminutos(duracion[atipica].astype(np.int64)),
+        [f"{desde} a {hasta}" for desde, hasta in zip(
+            minutos_a_horasminutos(np.round(q1[atipica]).astype(np.int64)),
+            minutos_a_horasminutos(np.round(q3[atipica]).astype(np.int64))
+        )],
+        puntaje
+    )
+
+    # Entrada que se aparta del horario de los registros anteriores del empleado (sobre el
+    # reloj de 24 horas: una entrada a las 00:05 no se aparta de otras a las 23:55)
+    media, desvio, cantidad = _hora_media_y_desvio_previos(entrada, inicio_grupo, VENTANA_REGISTROS)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = np.abs(_diferencia_horaria(entrada, media)) / np.maximum(desvio, MARGEN_MINIMO_ENTRADA / UMBRAL_Z)
+        deriva = (cantidad >= MIN_REGISTROS) & (z > UMBRAL_Z)
+    agregar(
+        deriva, "Horario de entrada",
+        minutos_a_hora_str(pd.Series(entrada[deriva])).to_numpy(),
+        [f"~{hora} ± {int(round(minutos))} min" for hora, minutos in zip(
+            minutos_a_hora_str(pd.Series(media[deriva])), desvio[deriva]
+        )],
+        z
+    )
+
+    # Montos inusualmente altos para el período (entre los distintos de 0)
+    for columna in COLUMNAS_MONTOS:
+        if columna not in df.columns:
+            continue
+        montos = pd.to_numeric(df[columna], errors='coerce').to_numpy(dtype=float)[orden]
+        positivos = montos[montos > 0]
+        if len(positivos) < MIN_REGISTROS:
+            continue
+        m_q1, m_q3 = np.quantile(positivos, [0.25, 0.75])
+        limite = m_q3 + FACTOR_IQR_MONTOS * (m_q3 - m_q1)
+        with np.errstate(invalid='ignore'):
+            alto = montos > limite
+        puntaje = (montos - np.median(positivos)) / max(m_q3 - m_q1, 1.0)
+        agregar(alto, columna, [f"${monto:,.0f}" for monto in montos[alto]], f"hasta ${limite:,.0f}", puntaje)
+
+    if not hallazgos:
+        return vacio
+
+    anomalias = pd.concat(hallazgos, ignore_index=True)
+    posiciones = anomalias.pop("posicion").to_numpy()
+    anomalias.insert(0, "Fecha", fechas.iloc[posiciones].dt.strftime("%Y-%m-%d").to_numpy())
+    anomalias.insert(0, "Empleado", df["Empleado"].iloc[posiciones].to_numpy())
+    if "Id_Registro" in df.columns:
+        anomalias["Id_Registro"] = df["Id_Registro"].iloc[posiciones].to_numpy()
+    anomalias.index = df.index[posiciones]
+    return anomalias.sort_values("Puntaje", ascending=False, kind='stable')
@@ -0,0 +1,243 @@
+"""
+Motor de autocorrección de marcaciones incompletas
+Completa en bloque las marcas únicas usando reglas declarativas por empleado u horario del local
+"""
+import json
+import os
+from typing import List, Dict, Tuple, Optional
+
+import pandas as pd
+
+from calculations import serie_hora_a_minutos, minutos_a_hora_str
+from registro_empleados import clave_empleado
+
+# Horario del local usado por las reglas que completan con apertura/cierre
+HORARIO_LOCAL_POR_DEFECTO = {
+    "apertura": "10:30",
+    "cierre": "22:00"
+}
+
+# Reglas evaluadas en orden: la primera que aplica a un registro lo resuelve.
+# Campos de cada regla:
+#   nombre: identificador que queda registrado para auditoría
+#   hora_desde / hora_hasta: rango (HH:MM) de la marca registrada donde aplica la regla
+#   tipo_marca: cómo se interpreta la marca registrada ('Entrada' o 'Salida')
+#   completar: 'mediana_empleado', 'horario_local' o una hora fija "HH:MM"
+#   respaldo: estrategia alternativa si 'completar' no produce valor (ej: sin historial)
+#   empleados: lista opcional de empleados a los que se restringe la regla
+#   duracion_minima / duracion_maxima: horas del turno resultante para aceptar la corrección
+REGLAS_POR_DEFECTO = [
+    {
+        "nombre": "Marca antes de 14:00 = entrada (salida mediana del empleado)",
+        "hora_hasta": "14:00",
+        "tipo_marca": "Entrada",
+        "completar": "mediana_empleado",
+        "respaldo": "horario_local",
+        "duracion_minima": 2,
+        "duracion_maxima": 14
+    },
+    {
+        "nombre": "Marca desde 14:00 = salida (entrada mediana del empleado)",
+        "hora_desde": "14:00",
+        "tipo_marca": "Salida",
+        "completar": "mediana_empleado",
+        "respaldo": "horario_local",
+        "duracion_minima": 2,
+        "duracion_maxima": 14
+    }
+]
+
+ARCHIVO_REGLAS = os.path.join(os.path.dirname(__file__), "reglas_autocorreccion.json")
+
+
+def cargar_reglas(ruta: Optional[str] = None) -> Tuple[List[Dict], Dict]:
+    """
+    Carga las reglas de autocorrección desde un archivo JSON si existe
+
+    El archivo puede contener las claves "reglas" (lista) y "horario_local" (dict).
+
+    Args:
+        ruta: Ruta del archivo de reglas (por defecto reglas_autocorreccion.json)
+
+    Returns:
+        Tuple[List[Dict], Dict]: (reglas, horario_local)
+    """
+    ruta = ruta or ARCHIVO_REGLAS
+    if not os.path.exists(ruta):
+        return REGLAS_POR_DEFECTO, HORARIO_LOCAL_POR_DEFECTO
+
+    with open(ruta, encoding='utf-8') as f:
+        config = json.load(f)
+
+    horario_local = dict(HORARIO_LOCAL_POR_DEFECTO)
+    horario_local.update(config.get("horario_local", {}))
+    return config.get("reglas", REGLAS_POR_DEFECTO), horario_local
+
+
+def _a_minutos(hora: str) -> int:
+    """Convierte "HH:MM" a minutos desde medianoche"""
+    horas, minutos = hora.split(':')
+    return int(horas) * 60 + int(minutos)
+
+
+def _valores_estrategia(estrategia: str, columna: str, empleados: pd.Series,
+                        medianas: Dict[str, pd.Series], horario_local: Dict) -> pd.Series:
+    """
+    Calcula los minutos con que se completa la columna faltante según una estrategia
+
+    Args:
+        estrategia: 'mediana_empleado', 'horario_local' o una hora "HH:MM"
+        columna: Columna a completar ('Entrada' o 'Salida')
+        empleados: Clave de empleado de los registros a completar (ver clave_empleado)
+        medianas: Mediana en minutos por empleado para cada columna
+        horario_local: Horario de apertura/cierre del local
+
+    Returns:
+        Series: Minutos a usar (NaN si la estrategia no produce valor)
+    """
+    if estrategia == "mediana_empleado":
+        return empleados.map(medianas[columna]).astype(float)
+
+    if estrategia == "horario_local":
+        hora = horario_local["apertura"] if columna == "Entrada" else horario_local["cierre"]
+    else:
+        hora = estrategia
+    return pd.Series(float(_a_minutos(hora)), index=empleados.index)
+
+
+def aplicar_reglas_autocorreccion(df_completo: pd.DataFrame, df_incompletos: pd.DataFrame,
+                                  reglas: Optional[List[Dict]] = None,
+                                  horario_local: Optional[Dict] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Aplica las reglas de autocorrección a todos los registros incompletos en una pasada vectorizada
+
+    Args:
+        df_completo: DataFrame con todos los registros con asistencia (fuente del historial)
+        df_incompletos: Registros con una sola marca (salida de detectar_registros_incompletos)
+        reglas: Reglas a aplicar (por defecto las cargadas con cargar_reglas)
+        horario_local: Horario de apertura/cierre del local
+
+    Returns:
+        Tuple[DataFrame, DataFrame]: (df_autocorregidos, df_pendientes)
+            df_autocorregidos incluye Entrada, Salida y la columna 'Auto_Correccion' con la regla aplicada;
+            df_pendientes son las excepciones que requieren revisión manual
+    """
+    if reglas is None or horario_local is None:
+        reglas_archivo, horario_archivo = cargar_reglas()
+        reglas = reglas if reglas is not None else reglas_archivo
+        horario_local = horario_local if horario_local is not None else horario_archivo
+
+    if df_incompletos.empty:
+        return df_incompletos.iloc[0:0], df_incompletos
+
+    # Medianas de entrada y salida por empleado sobre los registros completos del período
+    # (por Id_Empleado entero si los nombres ya se unificaron, ver registro_empleados.py)
+    completos = df_completo.drop(index=df_incompletos.index, errors='ignore')
+    empleado_completos = clave_empleado(completos)
+    medianas = {}
+    for columna in ['Entrada', 'Salida']:
+        minutos_columna = serie_hora_a_minutos(completos[columna])
+        minutos_columna = minutos_columna[minutos_columna > 0]
+        medianas[columna] = minutos_columna.groupby(empleado_completos.loc[minutos_columna.index]).median()
+
+    marca = serie_hora_a_minutos(df_incompletos['Horario_Registrado'])
+    empleados = df_incompletos['Empleado']
+    claves_empleados = clave_empleado(df_incompletos)
+
+    entrada = pd.Series(float('nan'), index=df_incompletos.index)
+    salida = pd.Series(float('nan'), index=df_incompletos.index)
+    regla_aplicada = pd.Series('', index=df_incompletos.index, dtype=object)
+    pendiente = marca.notna()
+
+    for regla in reglas:
+        mascara = pendiente.copy()
+        if regla.get("hora_desde"):
+            mascara &= marca >= _a_minutos(regla["hora_desde"])
+        if regla.get("hora_hasta"):
+            mascara &= marca < _a_minutos(regla["hora_hasta"])
+        if regla.get("empleados"):
+            mascara &= empleados.isin(regla["empleados"])
+        if not mascara.any():
+            continue
+
+        columna_faltante = 'Salida' if regla["tipo_marca"] == 'Entrada' else 'Entrada'
+        valores = _valores_estrategia(regla["completar"], columna_faltante, claves_empleados[mascara], medianas, horario_local)
+        if regla.get("respaldo"):
+            respaldo = _valores_estrategia(regla["respaldo"], columna_faltante, claves_empleados[mascara], medianas, horario_local)
+            valores = valores.fillna(respaldo)
+
+        if regla["tipo_marca"] == 'Entrada':
+            entrada_regla, salida_regla = marca[mascara], valores
+        else:
+            entrada_regla, salida_regla = valores, marca[mascara]
+
+        # Validar que el turno resultante sea razonable; si no, queda como excepción
+        duracion = (salida_regla - entrada_regla) / 60
+        valido = duracion.notna() & (duracion >= regla.get("duracion_minima", 0)) & (duracion <= regla.get("duracion_maxima", 24))
+        indices_validos = valido[valido].index
+
+        entrada[indices_validos] = entrada_regla[indices_validos]
+        salida[indices_validos] = salida_regla[indices_validos]
+        regla_aplicada[indices_validos] = regla["nombre"]
+        pendiente[indices_validos] = False
+
+    resueltos = regla_aplicada != ''
+    df_autocorregidos = df_incompletos[resueltos].copy()
+    df_autocorregidos['Entrada'] = minutos_a_hora_str(entrada[resueltos])
+    df_autocorregidos['Salida'] = minutos_a_hora_str(salida[resueltos])
+    df_autocorregidos['Auto_Correccion'] = regla_aplicada[resueltos]
+
+    return df_autocorregidos, df_incompletos[~resueltos]
+
+
+def aplicar_tabla_correcciones(df_original: pd.DataFrame, correcciones: pd.DataFrame,
+                               columna_id: Optional[str] = None) -> pd.DataFrame:
+    """
+    Escribe una tabla de correcciones en el DataFrame original con una asignación indexada
+    por columna, sin importar cuántos registros se corrijan
+
+    Solo se copian las columnas corregidas; el resto se comparte con df_original, que no se modifica.
+
+    Args:
+        df_original: Registros a corregir
+        correcciones: Una fila por registro corregido (índice = registro en df_original) y una
+                      columna por campo con su nuevo valor; los registros que no están en
+                      df_original se ignoran
+        columna_id: Columna de df_original a la que refiere el índice de correcciones
+                    (ej: identificadores.COLUMNA_ID); por defecto, el índice de df_original
+
+    Returns:
+        DataFrame: DataFrame con las correcciones aplicadas (df_original si no hay ninguna)
+    """
+    if columna_id is not None:
+        # Llevar las correcciones de identificador de registro a índice de df_original
+        ids = df_original[columna_id]
+        filas = ids.isin(correcciones.index)
+        correcciones = correcciones.reindex(ids[filas].to_numpy()).set_axis(df_original.index[filas])
+    correcciones = correcciones[correcciones.index.isin(df_original.index)]
+    if correcciones.empty:
+        return df_original
+
+    columnas_corregidas = {}
+    for columna in correcciones.columns:
+        if columna in df_original.columns:
+            valores = df_original[columna].astype(object)
+        else:
+            valores = pd.Series(None, index=df_original.index, dtype=object)
+        valores.loc[correcciones.index] = correcciones[columna].to_numpy()
+        columnas_corregidas[columna] = valores
+    return df_original.assign(**columnas_corregidas)
+
+
+def aplicar_autocorrecciones_a_dataframe(df_original: pd.DataFrame, df_autocorregidos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Escribe las autocorrecciones en el DataFrame original con una asignación indexada
+
+    Args:
+        df_original: DataFrame con todos los registros con asistencia
+        df_autocorregidos: Resultado de aplicar_reglas_autocorreccion
+
+    Returns:
+        DataFrame: DataFrame con los horarios completados y la columna de auditoría 'Auto_Correccion'
+    """
+    return aplicar_tabla_correcciones(df_original, df_autocorregidos[['Entrada', 'Salida', 'Auto_Correccion']])
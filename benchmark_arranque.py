@@ -0,0 +1,104 @@
+"""
+Benchmark de arranque de la aplicación
+Mide, cada uno en un intérprete nuevo, el costo de importar cada módulo sobre Streamlit
+(siempre cargado) y el tiempo de la primera ejecución y de una recarga de main.py
+
+Uso:
+    python benchmark_arranque.py [--repeticiones 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Dependencias pesadas y módulos propios que importa la aplicación
+MODULOS = [
+    "pandas", "numpy", "openpyxl", "pdfplumber", "pypdfium2", "PyPDF2",
+    "ui_components", "loading_components", "data_processor", "pdf_processor",
+]
+
+# Módulos cuya carga en la página inicial indica un import que debería ser diferido
+MODULOS_DIFERIDOS = ["data_processor", "pdf_processor", "openpyxl", "pdfplumber", "pypdfium2", "PyPDF2"]
+
+_SCRIPT_IMPORTACION = """
+import time
+import streamlit
+inicio = time.perf_counter()
+import {modulo}
+print(time.perf_counter() - inicio)
+"""
+
+_SCRIPT_APLICACION = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("main.py", default_timeout=120)
+inicio = time.perf_counter()
+app.run()
+primera = time.perf_counter() - inicio
+inicio = time.perf_counter()
+app.run()
+recarga = time.perf_counter() - inicio
+cargados = [m for m in {diferidos!r} if m in sys.modules]
+print(primera, recarga, ",".join(cargados))
+"""
+
+
+def _ejecutar(script: str) -> str:
+    """Ejecuta un script en un intérprete nuevo dentro del directorio de la aplicación"""
+    resultado = subprocess.run(
+        [sys.executable, "-c", script], cwd=DIRECTORIO, capture_output=True, text=True
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr.strip().splitlines()[-1] if resultado.stderr.strip() else "error")
+    return resultado.stdout.strip().splitlines()[-1]
+
+
+def medir_importacion(modulo: str, repeticiones: int) -> float:
+    """
+    Mejor tiempo de importar un módulo en un intérprete nuevo con Streamlit ya cargado
+
+    Returns:
+        float: Segundos
+    """
+    return min(float(_ejecutar(_SCRIPT_IMPORTACION.format(modulo=modulo))) for _ in range(repeticiones))
+
+
+def medir_aplicacion(repeticiones: int) -> tuple:
+    """
+    Mejor tiempo de la primera ejecución de main.py (en frío) y de una recarga
+
+    Returns:
+        tuple: (segundos_primera, segundos_recarga, módulos diferidos cargados en la página inicial)
+    """
+    mediciones = []
+    for _ in range(repeticiones):
+        primera, recarga, *cargados = _ejecutar(_SCRIPT_APLICACION.format(diferidos=MODULOS_DIFERIDOS)).split(" ")
+        mediciones.append((float(primera), float(recarga), cargados[0] if cargados else ""))
+    return min(m[0] for m in mediciones), min(m[1] for m in mediciones), mediciones[-1][2]
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--repeticiones", type=int, default=5)
+    opciones = argumentos.parse_args()
+
+    print(f"{'módulo':<20}{'segundos':>10}")
+    for modulo in MODULOS:
+        try:
+            print(f"{modulo:<20}{medir_importacion(modulo, opciones.repeticiones):>10.3f}")
+        except RuntimeError as e:
+            print(f"{modulo:<20}{'-':>10}  ({e})")
+
+    try:
+        primera, recarga, cargados = medir_aplicacion(opciones.repeticiones)
+    except RuntimeError as e:
+        raise SystemExit(f"No se pudo ejecutar main.py con streamlit.testing: {e}")
+    print(f"\nmain.py primera ejecución: {primera:.3f} s")
+    print(f"main.py recarga:           {recarga:.3f} s")
+    print(f"Módulos diferidos cargados sin archivo subido: {cargados or 'ninguno'}")
+
+
+if __name__ == "__main__":
+    main()
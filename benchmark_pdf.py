@@ -0,0 +1,150 @@
+"""
+Benchmark de extracción de texto PDF
+Genera un corpus sintético de reportes de asistencia de tamaño creciente y mide
+páginas por segundo de cada backend instalado (ver pdf_backends)
+
+Uso:
+    python benchmark_pdf.py [--paginas 1 10 100 500] [--repeticiones 3]
+"""
+import argparse
+import os
+import random
+import re
+import time
+from datetime import date, timedelta
+from typing import List
+
+from pdf_backends import backends_disponibles, extraer_paginas_texto
+
+DIRECTORIO_CORPUS = os.path.join(os.path.dirname(__file__), "corpus_pdf")
+
+LINEAS_POR_PAGINA = 60
+
+_PATRON_MARCACION = re.compile(r'\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}')
+
+
+def generar_pdf(paginas: List[List[str]]) -> bytes:
+    """
+    Escribe un PDF mínimo (Helvetica, una línea de texto por renglón) sin dependencias externas
+
+    Args:
+        paginas: Líneas de texto de cada página
+
+    Returns:
+        bytes: Contenido del PDF
+    """
+    # Objetos: 1 catálogo, 2 árbol de páginas, 3 fuente, luego pares página/contenido
+    objetos = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    hijos = []
+    for lineas in paginas:
+        id_pagina = len(objetos) + 1
+        hijos.append(f"{id_pagina} 0 R")
+        texto = " ".join(
+            "(%s) '" % linea.replace('\\', '').replace('(', '').replace(')', '') for linea in lineas
+        )
+        contenido = f"BT /F1 9 Tf 12 TL 40 800 Td {texto} ET".encode('latin-1')
+        objetos.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {id_pagina + 1} 0 R >>".encode()
+        )
+        objetos.append(b"<< /Length %d >>\nstream\n" % len(contenido) + contenido + b"\nendstream")
+    objetos[1] = f"<< /Type /Pages /Kids [{' '.join(hijos)}] /Count {len(paginas)} >>".encode()
+
+    salida = b"%PDF-1.4\n"
+    posiciones = []
+    for numero, objeto in enumerate(objetos, 1):
+        posiciones.append(len(salida))
+        salida += b"%d 0 obj\n" % numero + objeto + b"\nendobj\n"
+
+    inicio_xref = len(salida)
+    salida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    salida += b"".join(b"%010d 00000 n \n" % posicion for posicion in posiciones)
+    salida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+    return salida
+
+
+def generar_reporte(cantidad_paginas: int, semilla: int = 0) -> List[List[str]]:
+    """
+    Genera las líneas de un reporte de asistencia sintético ("Empleado: X" + marcaciones)
+
+    Returns:
+        List[List[str]]: Líneas de cada página
+    """
+    aleatorio = random.Random(semilla)
+    inicio = date(2024, 10, 1)
+    lineas = ["REPORTE DE ASISTENCIA"]
+    empleado = 0
+    while len(lineas) < cantidad_paginas * LINEAS_POR_PAGINA:
+        empleado += 1
+        lineas.append(f"Empleado: Empleado {empleado:04d}")
+        for dia in range(30):
+            fecha = (inicio + timedelta(days=dia)).strftime('%d/%m/%Y')
+            entrada = 10 * 60 + aleatorio.randint(0, 60)
+            salida = entrada + aleatorio.randint(6 * 60, 11 * 60)
+            lineas.append(f"{fecha} {entrada // 60:02d}:{entrada % 60:02d} Entrada")
+            lineas.append(f"{fecha} {salida // 60 % 24:02d}:{salida % 60:02d} Salida")
+
+    lineas = lineas[:cantidad_paginas * LINEAS_POR_PAGINA]
+    return [lineas[i:i + LINEAS_POR_PAGINA] for i in range(0, len(lineas), LINEAS_POR_PAGINA)]
+
+
+def preparar_corpus(tamanos: List[int]) -> List[tuple]:
+    """
+    Crea (o reutiliza) los PDFs del corpus en DIRECTORIO_CORPUS
+
+    Returns:
+        List[tuple]: (ruta, cantidad_paginas, marcaciones_esperadas) por archivo
+    """
+    os.makedirs(DIRECTORIO_CORPUS, exist_ok=True)
+    corpus = []
+    for cantidad_paginas in tamanos:
+        paginas = generar_reporte(cantidad_paginas)
+        esperadas = sum(1 for pagina in paginas for linea in pagina if _PATRON_MARCACION.search(linea))
+        ruta = os.path.join(DIRECTORIO_CORPUS, f"reporte_{cantidad_paginas:04d}p.pdf")
+        if not os.path.exists(ruta):
+            with open(ruta, "wb") as f:
+                f.write(generar_pdf(paginas))
+        corpus.append((ruta, cantidad_paginas, esperadas))
+    return corpus
+
+
+def medir(backend: str, ruta: str, repeticiones: int) -> tuple:
+    """
+    Mide el mejor tiempo de extracción de un archivo con un backend
+
+    Returns:
+        tuple: (segundos, marcaciones_encontradas)
+    """
+    mejor = float("inf")
+    encontradas = 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        with open(ruta, "rb") as f:
+            textos = extraer_paginas_texto(f, backend)
+        mejor = min(mejor, time.perf_counter() - inicio)
+        encontradas = sum(len(_PATRON_MARCACION.findall(texto)) for texto in textos)
+    return mejor, encontradas
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argumentos.add_argument("--paginas", type=int, nargs="+", default=[1, 10, 100, 500])
+    argumentos.add_argument("--repeticiones", type=int, default=3)
+    opciones = argumentos.parse_args()
+
+    backends = backends_disponibles()
+    if not backends:
+        raise SystemExit("No hay ningún backend PDF instalado (pypdfium2, PyPDF2 o pdfplumber).")
+
+    corpus = preparar_corpus(opciones.paginas)
+    print(f"{'backend':<12}{'páginas':>9}{'segundos':>11}{'págs/seg':>11}  marcaciones")
+    for backend in backends:
+        for ruta, cantidad_paginas, esperadas in corpus:
+            segundos, encontradas = medir(backend, ruta, opciones.repeticiones)
+            estado = "ok" if encontradas == esperadas else f"{encontradas}/{esperadas}"
+            print(f"{backend:<12}{cantidad_paginas:>9}{segundos:>11.3f}{cantidad_paginas / segundos:>11.1f}  {estado}")
+
+
+if __name__ == "__main__":
+    main()
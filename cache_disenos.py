@@ -0,0 +1,152 @@
+"""
+Caché de diseños de reportes PDF
+Identifica cada formato de reporte con una huella (encabezados, posiciones de columnas y
+patrón de fecha/hora) y guarda el plan de extracción que funcionó para reutilizarlo
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import List, Dict, Optional
+
+ARCHIVO_DISENOS = os.path.join(os.path.dirname(__file__), "disenos_pdf.json")
+
+# Filas de la primera página que forman parte de la huella
+FILAS_HUELLA = 6
+# Redondeo (en puntos) de las posiciones horizontales para tolerar pequeñas variaciones
+REDONDEO_X = 5
+
+_PATRON_DATO = re.compile(r'\d{1,4}[/.-]\d{1,2}[/.-]\d{2,4}|\d{1,2}:\d{2}')
+
+_planes: Optional[Dict[str, Dict]] = None
+_version_planes: Optional[int] = None
+
+
+def _forma(texto: str) -> str:
+    """Reemplaza dígitos por '#' para que la huella no dependa de fechas, horas o nombres de período"""
+    return re.sub(r'\d', '#', texto)
+
+
+def huella_diseno(palabras: List[Dict]) -> Optional[str]:
+    """
+    Calcula la huella del diseño de un reporte a partir de las palabras de su primera página
+
+    Combina el texto de los encabezados con los dígitos enmascarados, las posiciones
+    horizontales de sus palabras y la forma de la primera fila con fecha/hora.
+
+    Args:
+        palabras: Palabras de la primera página (pdfplumber extract_words)
+
+    Returns:
+        str: Huella hexadecimal, o None si la página no tiene texto
+    """
+    if not palabras:
+        return None
+
+    filas = {}
+    for palabra in palabras:
+        filas.setdefault(round(palabra['top']), []).append(palabra)
+
+    # Encabezados hasta la primera fila con datos inclusive. Los valores libres (nombres,
+    # valores después de "Etiqueta:") se enmascaran y no aportan posición
+    partes = []
+    for top in sorted(filas)[:FILAS_HUELLA]:
+        fila = sorted(filas[top], key=lambda p: p['x0'])
+        es_fila_datos = any(_PATRON_DATO.search(p['text']) for p in fila)
+
+        textos = []
+        posiciones = []
+        despues_de_etiqueta = False
+        for palabra in fila:
+            if re.search(r'\d', palabra['text']):
+                textos.append(_forma(palabra['text']))
+                posiciones.append(str(int(palabra['x0'] // REDONDEO_X)))
+            elif es_fila_datos or despues_de_etiqueta:
+                textos.append('*')
+            else:
+                textos.append(palabra['text'])
+                posiciones.append(str(int(palabra['x0'] // REDONDEO_X)))
+                despues_de_etiqueta = palabra['text'].endswith(':')
+
+        partes.append(' '.join(textos))
+        partes.append(','.join(posiciones))
+        if es_fila_datos:
+            break
+
+    return hashlib.sha1('\n'.join(partes).encode('utf-8')).hexdigest()
+
+
+def _version_archivo() -> Optional[int]:
+    """Fecha de modificación de ARCHIVO_DISENOS en nanosegundos (None si no existe)"""
+    try:
+        return os.stat(ARCHIVO_DISENOS).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _cargar_planes() -> Dict[str, Dict]:
+    """
+    Carga los planes guardados; se vuelven a leer si el archivo cambió (ej: otro proceso
+    del pool guardó un plan nuevo)
+    """
+    global _planes, _version_planes
+    version = _version_archivo()
+    if _planes is None or version != _version_planes:
+        _planes = {}
+        _version_planes = version
+        if version is not None:
+            try:
+                with open(ARCHIVO_DISENOS, encoding='utf-8') as f:
+                    _planes = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                _planes = {}
+    return _planes
+
+
+def obtener_plan(huella: Optional[str]) -> Optional[Dict]:
+    """
+    Devuelve el plan de extracción guardado para una huella
+
+    Returns:
+        Dict: {"modo": "tabla", "diseno": {...}} o {"modo": "texto", "formato": "...", "estructura": {...}}
+              (ver formatos_reloj.py), o None
+    """
+    if not huella:
+        return None
+    return _cargar_planes().get(huella)
+
+
+def guardar_plan(huella: Optional[str], plan: Dict):
+    """
+    Guarda el plan de extracción que funcionó para un diseño de reporte
+
+    Args:
+        huella: Huella del diseño
+        plan: Plan de extracción a reutilizar
+    """
+    global _version_planes
+    if not huella:
+        return
+
+    planes = _cargar_planes()
+    if planes.get(huella) == plan:
+        return
+
+    planes[huella] = plan
+    # Varios procesos pueden guardar planes a la vez: se escribe un temporal y se reemplaza
+    # el archivo de una vez, así nunca queda a medio escribir
+    try:
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(ARCHIVO_DISENOS)), suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            json.dump(planes, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, ARCHIVO_DISENOS)
+        _version_planes = _version_archivo()
+    except OSError:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
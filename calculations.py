@@ -2,16 +2,25 @@
 Módulo de cálculos para la aplicación de sueldos
 Contiene funciones para cálculo de horas y conversiones
 """
-from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 
-def calcular_horas_especiales(entrada_dt, salida_dt):
+import numpy as np
+import pandas as pd
+
+MINUTOS_DIA = 24 * 60
+
+
+def calcular_horas_especiales(entrada_dt, salida_dt, desde="20:00", hasta="22:00"):
     """
     Calcula las horas normales y especiales trabajadas.
-    Horas especiales son las trabajadas entre 20:00 y 22:00
+    Horas especiales son las trabajadas dentro de la franja diaria (por defecto 20:00 a 22:00),
+    en cada uno de los días que toca el turno (incluye turnos que cruzan la medianoche)
     
     Args:
         entrada_dt (datetime): Hora de entrada
         salida_dt (datetime): Hora de salida
+        desde (str): Inicio de la franja especial "HH:MM"
+        hasta (str): Fin de la franja especial "HH:MM" (anterior a 'desde' si cruza la medianoche)
     
     Returns:
         tuple: (horas_normales, horas_especiales)
@@ -19,23 +28,82 @@ def calcular_horas_especiales(entrada_dt, salida_dt):
     # Calcular total de horas trabajadas
     total_horas = (salida_dt - entrada_dt).total_seconds() / 3600
     
-    # Calcular horas especiales (20:00 - 22:00)
-    inicio_especial = entrada_dt.replace(hour=20, minute=0, second=0)
-    fin_especial = entrada_dt.replace(hour=22, minute=0, second=0)
-    
-    inicio_interseccion = max(entrada_dt, inicio_especial)
-    fin_interseccion = min(salida_dt, fin_especial)
+    # Minutos desde la medianoche del día de entrada
+    medianoche = entrada_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    inicio = (entrada_dt - medianoche).total_seconds() / 60
+    fin = (salida_dt - medianoche).total_seconds() / 60
     
-    if inicio_interseccion >= fin_interseccion:
-        horas_especiales = 0
-    else:
-        horas_especiales = (fin_interseccion - inicio_interseccion).total_seconds() / 3600
+    horas_especiales = float(minutos_en_franja(
+        np.array([inicio]), np.array([fin]), _hora_a_minutos(desde), _hora_a_minutos(hasta)
+    )[0]) / 60
     
     # Horas normales = total - especiales
     horas_normales = total_horas - horas_especiales
     
     return horas_normales, horas_especiales
 
+
+def _hora_a_minutos(hora):
+    """Convierte "HH:MM" a minutos desde medianoche"""
+    horas, minutos = str(hora).split(':')[:2]
+    return int(horas) * 60 + int(minutos)
+
+
+def turnos_absolutos(fechas, entrada, salida, inicio_periodo=None):
+    """
+    Modelo de turnos con inicio y fin absolutos en minutos desde el comienzo del período.
+    Una salida anterior a la entrada significa que el turno termina al día siguiente.
+    
+    Args:
+        fechas (Series): Fecha (datetime) de la entrada de cada turno
+        entrada (array): Minutos desde medianoche de la entrada
+        salida (array): Minutos desde medianoche de la salida
+        inicio_periodo (Timestamp): Primer día del período (por defecto la fecha mínima)
+    
+    Returns:
+        tuple: (dia, inicio, fin) como arrays: día del turno desde el inicio del período,
+               e inicio/fin absolutos en minutos
+    """
+    fechas = fechas.dt.normalize()
+    inicio_periodo = fechas.min() if inicio_periodo is None else inicio_periodo
+    dia = ((fechas - inicio_periodo).dt.days).to_numpy()
+    entrada = np.asarray(entrada)
+    salida = np.asarray(salida)
+    
+    inicio = dia * MINUTOS_DIA + entrada
+    fin = inicio + np.where(salida < entrada, salida + MINUTOS_DIA, salida) - entrada
+    return dia, inicio, fin
+
+
+def minutos_en_franja(inicio, fin, desde, hasta):
+    """
+    Minutos de cada turno [inicio, fin) que caen dentro de una franja diaria [desde, hasta)
+    
+    La franja se repite todos los días y puede cruzar la medianoche (hasta <= desde).
+    Se consideran las apariciones de la franja en el día anterior, el del inicio y el
+    siguiente, lo que cubre turnos de hasta 24 horas.
+    
+    Args:
+        inicio (array): Inicio absoluto de cada turno en minutos
+        fin (array): Fin absoluto de cada turno en minutos
+        desde (array|int): Inicio de la franja en minutos desde medianoche
+        hasta (array|int): Fin de la franja en minutos desde medianoche
+    
+    Returns:
+        array: Minutos dentro de la franja
+    """
+    desde = np.asarray(desde)
+    hasta = np.asarray(hasta)
+    hasta_efectivo = np.where(hasta <= desde, hasta + MINUTOS_DIA, hasta)
+    dia_inicio = np.floor_divide(inicio, MINUTOS_DIA)
+    
+    total = 0
+    for desplazamiento in (-1, 0, 1):
+        base = (dia_inicio + desplazamiento) * MINUTOS_DIA
+        total = total + np.clip(np.minimum(fin, base + hasta_efectivo) - np.maximum(inicio, base + desde), 0, None)
+    return total
+
+
 def horas_a_horasminutos(horas):
     """
     Convierte horas decimales a formato horas:minutos
@@ -51,4 +119,175 @@ def horas_a_horasminutos(horas):
     if minutos >= 60:
         horas_int += minutos // 60
         minutos = minutos % 60
-    return f"{horas_int}:{minutos:02d}"
\ No newline at end of file
+    return f"{horas_int}:{minutos:02d}"
+
+
+def serie_hora_a_minutos(serie):
+    """
+    Convierte una serie de horas ("HH:MM", "HH:MM:SS" o time) a minutos desde medianoche
+    en una sola pasada vectorizada.
+    
+    Args:
+        serie (Series): Serie con horas en formato texto o datetime.time
+    
+    Returns:
+        Series: Minutos desde medianoche (float, NaN si no se pudo interpretar)
+    """
+    partes = serie.astype(str).str.strip().str.extract(r'^(\d{1,2})[:.](\d{2})')
+    horas = pd.to_numeric(partes[0], errors='coerce')
+    minutos = pd.to_numeric(partes[1], errors='coerce')
+    return horas * 60 + minutos
+
+
+def minutos_a_hora_str(serie_minutos):
+    """
+    Convierte una serie de minutos desde medianoche al formato "HH:MM"
+    
+    Args:
+        serie_minutos (Series): Minutos desde medianoche
+    
+    Returns:
+        Series: Horas en formato "HH:MM" (NaN donde no hay valor)
+    """
+    minutos = serie_minutos.round()
+    validos = minutos.notna()
+    enteros = minutos[validos].astype(int) % (24 * 60)
+    resultado = serie_minutos.astype(object).where(~validos)
+    resultado[validos] = (
+        (enteros // 60).astype(str).str.zfill(2) + ":" + (enteros % 60).astype(str).str.zfill(2)
+    )
+    return resultado
+
+
+# Escala de los factores de pago en aritmética entera (puntos básicos: 1.3 -> 13000)
+ESCALA_FACTOR = 10000
+
+
+def factor_a_puntos_basicos(factor):
+    """
+    Convierte un factor decimal (ej: 1.3) a un entero en puntos básicos sin error de redondeo
+    
+    Args:
+        factor (float|str): Factor de pago
+    
+    Returns:
+        int: Factor × ESCALA_FACTOR
+    """
+    return int((Decimal(str(factor)) * ESCALA_FACTOR).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def a_centavos(valor):
+    """
+    Convierte un importe a centavos enteros (redondeo comercial, sin pasar por float)
+    
+    Args:
+        valor (float|str|Decimal): Importe en moneda
+    
+    Returns:
+        int: Importe en centavos
+    """
+    return int((Decimal(str(valor)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _texto_a_centavos(texto, numero):
+    """Centavos de un importe desde su texto; si el texto no es decimal (ej: True), desde el número"""
+    try:
+        return a_centavos(texto)
+    except InvalidOperation:
+        return a_centavos(repr(float(numero)))
+
+
+def serie_a_centavos(serie):
+    """
+    Convierte una columna de importes a centavos enteros (int64); vacíos o inválidos cuentan 0
+    
+    Cada importe se convierte desde su texto (el escrito, o el más corto que representa al
+    float) con Decimal, sin multiplicar floats; la conversión se hace una vez por valor distinto.
+    
+    Args:
+        serie (Series): Importes en moneda
+    
+    Returns:
+        Series: Importes en centavos (int64)
+    """
+    numeros = pd.to_numeric(serie, errors='coerce')
+    validos = np.isfinite(numeros.to_numpy(dtype=float))
+    centavos = np.zeros(len(serie), dtype=np.int64)
+    if validos.any():
+        textos = serie[validos].astype(str).str.strip()
+        unicos = pd.DataFrame({"texto": textos, "numero": numeros[validos]}).drop_duplicates("texto")
+        tabla = {texto: _texto_a_centavos(texto, numero) for texto, numero in zip(unicos["texto"], unicos["numero"])}
+        centavos[validos] = textos.map(tabla).to_numpy(dtype=np.int64)
+    return pd.Series(centavos, index=serie.index)
+
+
+def escalar_redondeando(valores, multiplicador, divisor):
+    """
+    Calcula valores × multiplicador / divisor con redondeo comercial (mitad hacia arriba)
+    en aritmética entera, para arrays no negativos
+    
+    Usa int64 mientras el producto no puede desbordar y enteros de Python (exactos, sin
+    límite) en caso contrario.
+    
+    Args:
+        valores (array): Enteros no negativos
+        multiplicador (int): Multiplicador entero no negativo
+        divisor (int): Divisor positivo
+    
+    Returns:
+        array: Resultado redondeado (int64)
+    """
+    valores = np.asarray(valores, dtype=np.int64)
+    limite = (np.iinfo(np.int64).max - divisor) // 2
+    if valores.size and int(valores.max()) * int(multiplicador) > limite:
+        return np.array(
+            [(2 * int(valor) * int(multiplicador) + divisor) // (2 * divisor) for valor in valores],
+            dtype=np.int64
+        )
+    return (2 * valores * int(multiplicador) + divisor) // (2 * divisor)
+
+
+def centavos_a_decimal(centavos):
+    """
+    Convierte centavos enteros a Decimal en moneda (para mostrar o exportar)
+    
+    Args:
+        centavos (int): Importe en centavos
+    
+    Returns:
+        Decimal: Importe con dos decimales
+    """
+    return Decimal(int(centavos)).scaleb(-2)
+
+
+_SUFIJOS_MINUTOS = None
+
+
+def minutos_a_horasminutos(minutos):
+    """
+    Convierte una columna de minutos al formato "H:MM" en bloque: división entera de NumPy
+    e índices sobre tablas de textos de horas ("H:") y minutos ("MM"), sin formatear fila a fila
+    
+    Args:
+        minutos (array|Series): Minutos trabajados (los vacíos cuentan 0)
+    
+    Returns:
+        array: Textos "H:MM" ("-H:MM" para valores negativos)
+    """
+    global _SUFIJOS_MINUTOS
+    if _SUFIJOS_MINUTOS is None:
+        _SUFIJOS_MINUTOS = np.array([f"{minuto:02d}" for minuto in range(60)], dtype=object)
+    
+    minutos = np.rint(np.nan_to_num(np.asarray(minutos, dtype=float))).astype(np.int64)
+    if minutos.size == 0:
+        return np.array([], dtype=object)
+    
+    absolutos = np.abs(minutos)
+    horas = absolutos // 60
+    prefijos_horas = np.array([f"{hora}:" for hora in range(int(horas.max()) + 1)], dtype=object)
+    textos = prefijos_horas[horas] + _SUFIJOS_MINUTOS[absolutos % 60]
+    
+    negativos = minutos < 0
+    if negativos.any():
+        textos[negativos] = "-" + textos[negativos]
+    return textos
@@ -2,123 +2,162 @@
 Módulo de procesamiento de datos
 Contiene funciones para procesar archivos Excel y calcular sueldos
 """
+import numpy as np
 import pandas as pd
 import streamlit as st
 import io
-from datetime import datetime, timedelta
-from calculations import calcular_horas_especiales, horas_a_horasminutos
-from loading_components import get_progress_html
+import os
+from datetime import datetime
+from functools import lru_cache
+from calculations import (
+    minutos_a_horasminutos, serie_hora_a_minutos, minutos_a_hora_str,
+    turnos_absolutos, minutos_en_franja, MINUTOS_DIA,
+    ESCALA_FACTOR, a_centavos, serie_a_centavos, escalar_redondeando, centavos_a_decimal
+)
+from politicas import compilar_politicas, cantidad_bandas
+from identificadores import COLUMNA_ID
+from registro_empleados import COLUMNA_ID_EMPLEADO, clave_empleado
+from progreso import crear_progreso, subrango
 
-def detectar_y_resolver_marcaciones_duplicadas(df):
+@lru_cache(maxsize=4096)
+def _hora_marcacion(texto):
+    """Hora de una marcación (las mismas horas se repiten en todo el período: se interpretan una vez)"""
+    try:
+        return datetime.strptime(texto, "%H:%M").time()
+    except ValueError:
+        return pd.to_datetime(texto).time()
+
+def _fecha_marcacion(fecha):
+    """Fecha de una marcación como datetime (memorizada para los valores que se pueden usar como clave)"""
+    try:
+        return _fecha_marcacion_memo(fecha)
+    except TypeError:
+        return pd.to_datetime(fecha)
+
+@lru_cache(maxsize=4096)
+def _fecha_marcacion_memo(fecha):
+    return pd.to_datetime(fecha)
+
+def _resolver_tres_marcaciones(posiciones, entradas, salidas, fechas):
+    """
+    Elige las 2 marcas de un empleado que marcó 3 veces el mismo día
+    
+    Args:
+        posiciones (array): Posición de cada una de las 3 filas en el DataFrame original
+        entradas, salidas, fechas (array): Entrada, Salida y Fecha de cada fila
+        
+    Returns:
+        list: (posición, entrada, salida) de cada marca elegida; entrada/salida "HH:MM"
+              reemplazan a las originales (None = se conservan)
+    """
+    # Convertir las marcaciones a datetime para comparar
+    marcaciones = []
+    for posicion, entrada, salida, fecha in zip(posiciones, entradas, salidas, fechas):
+        try:
+            marcaciones.append({
+                'posicion': posicion,
+                'entrada': datetime.combine(_fecha_marcacion(fecha), _hora_marcacion(str(entrada))),
+                'salida': datetime.combine(_fecha_marcacion(fecha), _hora_marcacion(str(salida)))
+            })
+        except:
+            # Si hay error en conversión, mantener el registro
+            marcaciones.append({'posicion': posicion, 'entrada': None, 'salida': None})
+    
+    # Crear marcación óptima combinando lo mejor de todas:
+    # la entrada más temprana y la salida más tardía entre todas las marcaciones
+    entrada_mas_temprana = min(marcaciones, key=lambda x: x['entrada'])
+    salida_mas_tardia = max(marcaciones, key=lambda x: x['salida'])
+    elegidas = [(
+        entrada_mas_temprana['posicion'],
+        entrada_mas_temprana['entrada'].strftime("%H:%M"),
+        salida_mas_tardia['salida'].strftime("%H:%M")
+    )]
+    
+    # Segunda marcación: la primera que no sea duplicado de la principal (diferencia > 20 minutos)
+    for marc in marcaciones:
+        diff_entrada = abs((marc['entrada'] - entrada_mas_temprana['entrada']).total_seconds() / 60)
+        diff_salida = abs((marc['salida'] - salida_mas_tardia['salida']).total_seconds() / 60)
+        if diff_entrada > 20 or diff_salida > 20:
+            elegidas.append((marc['posicion'], None, None))
+            break
+    else:
+        # Si no hay segunda marcación válida, usar la marcación del medio
+        marcaciones_ordenadas = sorted(marcaciones, key=lambda x: x['entrada'])
+        elegidas.append((marcaciones_ordenadas[1]['posicion'], None, None))
+    return elegidas
+
+def detectar_y_resolver_marcaciones_duplicadas(df, progreso=None, resueltas=None):
     """
     Detecta cuando un empleado marcó 3 veces en un mismo día y selecciona automáticamente 
     solo 2 marcas, eliminando duplicados que estén en el mismo rango de tiempo (10-20 minutos).
     
+    Solo los grupos de 3 marcas se revisan fila a fila; el resto de los registros se
+    selecciona por posición, sin copiar cada fila. El resultado queda ordenado por
+    empleado y fecha, con el índice original.
+    
     Args:
         df (DataFrame): DataFrame con los datos originales
+        progreso: Callback de progreso por grupo empleado/día revisado (ver progreso.py)
+        resueltas (list): Si se indica, recibe los "empleado - fecha" resueltos en lugar
+                          de mostrarlos (procesamiento por particiones)
         
     Returns:
         DataFrame: DataFrame procesado con marcaciones duplicadas resueltas
     """
-    df_procesado = df.copy()
-    registros_procesados = []
+    # Grupo (empleado, Fecha) de cada fila en orden de claves; -1 si falta alguna clave.
+    # El empleado se agrupa por su Id_Empleado entero cuando los nombres ya se unificaron
+    empleado = clave_empleado(df)
+    grupo_fila = df.groupby([empleado, df['Fecha']]).ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    validas = grupo_fila >= 0
+    tamano_fila = np.zeros(len(df), dtype=np.int64)
+    tamano_fila[validas] = np.bincount(grupo_fila[validas])[grupo_fila[validas]]
+    
+    # Empleado marcó 1 o 2 veces (o 4 o más) - mantener todos los registros
+    posiciones = [np.flatnonzero(validas & (tamano_fila != 3))]
+    grupos_salida = [grupo_fila[posiciones[0]]]
+    reemplazos = []
     empleados_con_duplicados = []
     
-    # Agrupar por empleado y fecha
-    for (empleado, fecha), grupo in df_procesado.groupby(['Empleado', 'Fecha']):
-        if len(grupo) == 3:
-            # Empleado marcó 3 veces el mismo día
-            empleados_con_duplicados.append(f"{empleado} - {fecha}")
-            
-            # Convertir las marcaciones a datetime para comparar
-            marcaciones = []
-            for idx, row in grupo.iterrows():
-                try:
-                    entrada = pd.to_datetime(str(row["Entrada"])).time()
-                    salida = pd.to_datetime(str(row["Salida"])).time()
-                    fecha_dt = pd.to_datetime(row["Fecha"])
-                    
-                    entrada_dt = datetime.combine(fecha_dt, entrada)
-                    salida_dt = datetime.combine(fecha_dt, salida)
-                    
-                    marcaciones.append({
-                        'index': idx,
-                        'entrada': entrada_dt,
-                        'salida': salida_dt,
-                        'row': row
-                    })
-                except:
-                    # Si hay error en conversión, mantener el registro
-                    marcaciones.append({
-                        'index': idx,
-                        'entrada': None,
-                        'salida': None,
-                        'row': row
-                    })
-            
-            # Encontrar duplicados basados en rangos de tiempo (10-20 minutos)
-            duplicados_encontrados = []
-            for i in range(len(marcaciones)):
-                for j in range(i + 1, len(marcaciones)):
-                    marc1 = marcaciones[i]
-                    marc2 = marcaciones[j]
-                    
-                    if marc1['entrada'] and marc2['entrada']:
-                        # Calcular diferencia en minutos para entrada
-                        diff_entrada = abs((marc1['entrada'] - marc2['entrada']).total_seconds() / 60)
-                        # Calcular diferencia en minutos para salida
-                        diff_salida = abs((marc1['salida'] - marc2['salida']).total_seconds() / 60)
-                        
-                        # Si ambas diferencias están entre 10 y 20 minutos, son duplicados
-                        if (10 <= diff_entrada <= 20) and (10 <= diff_salida <= 20):
-                            duplicados_encontrados.append((i, j))
-            
-            # NUEVA LÓGICA SIMPLIFICADA: Crear marcación óptima combinando lo mejor de todas
-            # Encontrar la entrada más temprana y la salida más tardía entre todas las marcaciones
-            entrada_mas_temprana = min(marcaciones, key=lambda x: x['entrada'])
-            salida_mas_tardia = max(marcaciones, key=lambda x: x['salida'])
-            
-            # Crear primera marcación con entrada más temprana y salida más tardía
-            marcacion_principal = entrada_mas_temprana['row'].copy()
-            marcacion_principal['Entrada'] = entrada_mas_temprana['entrada'].strftime("%H:%M")
-            marcacion_principal['Salida'] = salida_mas_tardia['salida'].strftime("%H:%M")
-            
-            registros_procesados.append(marcacion_principal)
-            
-            # Buscar una segunda marcación que no sea duplicado de la principal
-            segunda_marcacion = None
-            for marc in marcaciones:
-                # Verificar que no sea duplicado de la marcación principal
-                diff_entrada = abs((marc['entrada'] - entrada_mas_temprana['entrada']).total_seconds() / 60)
-                diff_salida = abs((marc['salida'] - salida_mas_tardia['salida']).total_seconds() / 60)
-                
-                # Si no es duplicado (diferencia > 20 minutos), usar como segunda marcación
-                if diff_entrada > 20 or diff_salida > 20:
-                    segunda_marcacion = marc['row']
-                    break
-            
-            # Si encontramos una segunda marcación válida, agregarla
-            if segunda_marcacion is not None:
-                registros_procesados.append(segunda_marcacion)
-            else:
-                # Si no hay segunda marcación válida, usar la marcación del medio
-                if len(marcaciones) >= 2:
-                    # Ordenar por entrada y tomar la del medio
-                    marcaciones_ordenadas = sorted(marcaciones, key=lambda x: x['entrada'])
-                    registros_procesados.append(marcaciones_ordenadas[1]['row'])
-                    
-        else:
-            # Empleado marcó 1 o 2 veces - mantener todos los registros
-            for idx, row in grupo.iterrows():
-                registros_procesados.append(row)
+    # Empleado marcó 3 veces el mismo día
+    posiciones_tres = np.flatnonzero(tamano_fila == 3)
+    tres = df.iloc[posiciones_tres]
+    entradas, salidas, fechas, nombres = (
+        tres[columna].to_numpy() for columna in ("Entrada", "Salida", "Fecha", "Empleado")
+    )
+    grupos = tres.groupby([empleado.iloc[posiciones_tres], tres['Fecha']])
+    avance = crear_progreso(progreso, grupos.ngroups, "Revisando marcaciones")
+    elegidas = []
+    for (_, fecha), indices in grupos.indices.items():
+        avance.avanzar()
+        empleados_con_duplicados.append(f"{nombres[indices[0]]} - {fecha}")
+        elegidas.extend(_resolver_tres_marcaciones(
+            posiciones_tres[indices], entradas[indices], salidas[indices], fechas[indices]
+        ))
+    avance.terminar()
+    if elegidas:
+        elegidas_posiciones = np.array([posicion for posicion, _, _ in elegidas], dtype=np.int64)
+        posiciones.append(elegidas_posiciones)
+        grupos_salida.append(grupo_fila[elegidas_posiciones])
+        reemplazos = [(len(posiciones[0]) + fila, entrada, salida)
+                      for fila, (_, entrada, salida) in enumerate(elegidas) if entrada is not None]
     
     # Mostrar información sobre empleados con duplicados procesados
-    if empleados_con_duplicados:
+    if resueltas is not None:
+        resueltas.extend(empleados_con_duplicados)
+    elif empleados_con_duplicados:
         st.info(f"🔍 **Marcaciones duplicadas detectadas y resueltas automáticamente:**\n\n" + 
                 "\n".join([f"• {emp}" for emp in empleados_con_duplicados]))
     
-    # Crear nuevo DataFrame con los registros procesados
-    df_resultado = pd.DataFrame(registros_procesados)
+    # Ordenar por grupo (estable: dentro de cada grupo, el orden original o el elegido)
+    posiciones = np.concatenate(posiciones)
+    orden = np.argsort(np.concatenate(grupos_salida), kind='stable')
+    df_resultado = df.iloc[posiciones[orden]]
+    
+    if reemplazos:
+        filas = np.argsort(orden)[[fila for fila, _, _ in reemplazos]]
+        df_resultado = df_resultado.astype({'Entrada': object, 'Salida': object})
+        df_resultado.iloc[filas, df_resultado.columns.get_loc('Entrada')] = [e for _, e, _ in reemplazos]
+        df_resultado.iloc[filas, df_resultado.columns.get_loc('Salida')] = [s for _, _, s in reemplazos]
     
     return df_resultado
 
@@ -136,167 +175,668 @@ def validar_archivo_excel(df):
     missing_cols = [col for col in required_cols if col not in df.columns]
     return len(missing_cols) == 0, missing_cols
 
-def procesar_datos_excel(df, valor_por_hora, opcion_feriados, fechas_feriados, cantidad_feriados):
+# Filas por partición: por encima, el período se calcula por particiones de empleados y los
+# resultados se guardan por partes en disco (ver resultados_por_partes.py), sin unirlos en una
+# sola tabla (variable de entorno FILAS_POR_PARTICION)
+FILAS_POR_PARTICION = int(os.environ.get("FILAS_POR_PARTICION", 50000))
+
+def particionar_por_empleado(df, particiones):
+    """
+    Reparte los registros en particiones por huella estable del empleado: todos los registros
+    de un empleado quedan en la misma partición, así los duplicados, las horas extra diarias
+    y las políticas se resuelven dentro de cada una igual que sobre el período completo
+    
+    Args:
+        df (DataFrame): Registros del período
+        particiones (int): Cantidad de particiones
+        
+    Yields:
+        DataFrame: Registros de cada partición no vacía (se generan de a una)
+    """
+    if COLUMNA_ID_EMPLEADO in df.columns:
+        huellas = pd.util.hash_pandas_object(df[COLUMNA_ID_EMPLEADO], index=False).to_numpy()
+    else:
+        huellas = pd.util.hash_pandas_object(df["Empleado"].astype(str), index=False).to_numpy()
+    numero = huellas % np.uint64(particiones)
+    for particion in range(particiones):
+        seleccion = numero == particion
+        if seleccion.any():
+            yield df[seleccion]
+
+def _procesar_particion(df, valor_por_hora, fechas_feriados, politicas):
+    """
+    Resuelve duplicados y calcula sueldos de una partición (en un proceso del pool compartido)
+    
+    Returns:
+        tuple: (df_resultado, marcaciones_resueltas, mensajes_filas_invalidas)
+    """
+    resueltas, invalidas = [], []
+    df_procesado = detectar_y_resolver_marcaciones_duplicadas(df, resueltas=resueltas)
+    if df_procesado.empty:
+        return None, resueltas, invalidas
+    return calcular_sueldos(df_procesado, valor_por_hora, fechas_feriados, politicas, invalidas=invalidas), resueltas, invalidas
+
+def procesar_por_particiones(df, valor_por_hora, fechas_feriados, politicas=None, filas_por_particion=None,
+                             max_procesos=None, progreso=None):
+    """
+    Procesa el período por particiones de empleados, varias a la vez en el pool de procesos
+    compartido, y devuelve cada resultado en orden de finalización
+    
+    Solo hay en memoria las particiones en vuelo; el consumidor puede escribir cada
+    resultado (ej: escribir_excel_por_partes) y descartarlo.
+    
+    Args:
+        df (DataFrame): Registros del período
+        valor_por_hora (float): Valor por hora
+        fechas_feriados (set): Fechas completas específicas de feriados
+        politicas (dict): Políticas laborales (por defecto politicas_laborales.json)
+        filas_por_particion (int): Tamaño aproximado de cada partición (por defecto FILAS_POR_PARTICION)
+        max_procesos (int): Particiones en proceso a la vez (por defecto trabajos.procesos_por_trabajo())
+        progreso: Callback de progreso por partición terminada (ver progreso.py)
+        
+    Yields:
+        tuple: (df_resultado o None, marcaciones_resueltas, mensajes_filas_invalidas) por partición
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+    from trabajos import pool_procesos, procesos_por_trabajo
+    
+    cantidad = max(1, -(-len(df) // (filas_por_particion or FILAS_POR_PARTICION)))
+    particiones = particionar_por_empleado(df, cantidad)
+    avance = crear_progreso(progreso, cantidad, "Particiones procesadas", intervalo=0)
+    
+    # Una sola partición: evitar el costo de enviar los datos a otro proceso
+    if cantidad == 1:
+        for particion in particiones:
+            yield _procesar_particion(particion, valor_por_hora, fechas_feriados, politicas)
+        avance.terminar()
+        return
+    
+    # Como en la ingesta de PDFs: a lo sumo 'procesos' particiones en vuelo en el pool compartido
+    pool = pool_procesos()
+    procesos = min(cantidad, max_procesos or procesos_por_trabajo())
+    futuros = set()
+    
+    def enviar_siguiente():
+        for particion in particiones:
+            futuros.add(pool.submit(_procesar_particion, particion, valor_por_hora, fechas_feriados, politicas))
+            return
+    
+    for _ in range(procesos):
+        enviar_siguiente()
+    
+    try:
+        while futuros:
+            terminados, _ = wait(futuros, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                futuros.discard(futuro)
+                enviar_siguiente()
+                avance.avanzar()
+                yield futuro.result()
+    finally:
+        for futuro in futuros:
+            futuro.cancel()
+
+def _mostrar_avisos(resueltas, invalidas, avisos=None):
+    """
+    Informa los duplicados resueltos y las filas no válidas del cálculo: en la interfaz, o
+    como (tipo, mensaje) en 'avisos' si el cálculo corre en segundo plano
+    """
+    mensajes = []
+    if resueltas:
+        mensajes.append(("info", f"🔍 **Marcaciones duplicadas detectadas y resueltas automáticamente:**\n\n" + 
+                         "\n".join([f"• {emp}" for emp in resueltas])))
+    mensajes.extend(("error", mensaje) for mensaje in invalidas)
+    
+    if avisos is not None:
+        avisos.extend(mensajes)
+    else:
+        for tipo, mensaje in mensajes:
+            getattr(st, tipo)(mensaje)
+
+def procesar_datos_excel(df, valor_por_hora, opcion_feriados, fechas_feriados, cantidad_feriados, politicas=None, progreso=None,
+                         avisos=None):
     """
     Procesa los datos del Excel y calcula los sueldos
     
+    Los períodos de más de FILAS_POR_PARTICION registros se procesan por particiones de
+    empleados (procesar_por_particiones) y sus resultados quedan en disco por partes.
+    
     Args:
         df (DataFrame): DataFrame con los datos
         valor_por_hora (float): Valor por hora de trabajo
         opcion_feriados (str): Tipo de configuración de feriados (no usado, solo fechas específicas)
         fechas_feriados (set): Fechas completas específicas de feriados
         cantidad_feriados (int): No usado, mantener por compatibilidad
+        politicas (dict): Políticas laborales por grupo (por defecto politicas_laborales.json)
+        progreso: Callback de progreso (ver progreso.py); None para no informar
+        avisos (list): Si se indica, recibe los avisos (tipo, mensaje) en lugar de mostrarlos
+                       (cálculo en segundo plano, ver calcular_en_trabajo)
         
     Returns:
-        tuple: (resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales)
+        tuple: (resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales).
+               Cada resultado lleva el sueldo en centavos enteros (_sueldo_centavos); en los
+               períodos particionados, resultados es un ResultadosPorPartes
     """
+    from resultados_por_partes import COLUMNAS_ACUMULADAS
+    
+    resueltas, invalidas = [], []
+    if len(df) > FILAS_POR_PARTICION:
+        resultados = _procesar_particionado(df, valor_por_hora, fechas_feriados, politicas, progreso, resueltas, invalidas)
+        _mostrar_avisos(resueltas, invalidas, avisos)
+        if resultados is None:
+            return [], 0, 0, 0, 0
+        return (resultados, *_totales(resultados.totales()))
+    
     # NUEVO: Primero resolver marcaciones duplicadas
-    df_procesado = detectar_y_resolver_marcaciones_duplicadas(df)
+    df_procesado = detectar_y_resolver_marcaciones_duplicadas(df, subrango(progreso, 0, 50), resueltas)
+    df_resultado = None
+    if not df_procesado.empty:
+        df_resultado = calcular_sueldos(df_procesado, valor_por_hora, fechas_feriados, politicas,
+                                        subrango(progreso, 50, 100), invalidas)
+    _mostrar_avisos(resueltas, invalidas, avisos)
+    if df_resultado is None:
+        return [], 0, 0, 0, 0
+    
+    totales = _totales({columna: int(df_resultado[columna].sum()) for columna in COLUMNAS_ACUMULADAS})
+    df_resultado = df_resultado.drop(columns=_columnas_internas(df_resultado))
+    if df_resultado["Observaciones"].isna().all():
+        df_resultado = df_resultado.drop(columns="Observaciones")
     
-    resultados = []
-    total_horas = 0
-    total_sueldos = 0
-    total_horas_normales = 0  # NUEVO: Total de horas normales
-    total_horas_especiales = 0  # NUEVO: Total de horas especiales
+    return (df_resultado.to_dict('records'), *totales)
 
-    for idx, row in df_procesado.iterrows():
-        try:
-            resultado_fila = _procesar_fila(row, idx, valor_por_hora, fechas_feriados)
-            
-            if resultado_fila:
-                resultados.append(resultado_fila["datos"])
-                total_horas += resultado_fila["horas"]
-                total_sueldos += resultado_fila["sueldo"]
-                
-                # NUEVO: Acumular horas normales y especiales
-                total_horas_normales += resultado_fila.get("horas_normales", 0)
-                total_horas_especiales += resultado_fila.get("horas_especiales", 0)
+def _totales(sumas):
+    """
+    Totales exactos desde las sumas enteras (minutos y centavos); se convierten solo para mostrar
+    
+    Returns:
+        tuple: (total_horas, total_sueldos, total_horas_normales, total_horas_especiales)
+    """
+    return (
+        sumas["_minutos_trabajados"] / 60,
+        centavos_a_decimal(sumas["_sueldo_centavos"]),
+        sumas["_minutos_normales"] / 60,
+        sumas["_minutos_especiales"] / 60,
+    )
 
-        except Exception as e:
-            st.error(f"Error en la fila {idx+2}: {e}")
+def _columnas_internas(df_resultado):
+    """Columnas de cálculo de calcular_sueldos que no forman parte de los resultados"""
+    return [c for c in df_resultado.columns if c.startswith("_") and c != "_sueldo_centavos"]
+
+def _procesar_particionado(df, valor_por_hora, fechas_feriados, politicas, progreso, resueltas, invalidas):
+    """
+    procesar_datos_excel por particiones: cada partición terminada se vuelca al Excel de
+    resultados y a un ResultadosPorPartes (en disco, con el resumen por empleado acumulado)
+    y se descarta, sin unir las particiones en una sola tabla. Acumula además los duplicados
+    resueltos y las filas no válidas.
+    
+    Las filas quedan agrupadas por partición: cada empleado completo, en orden de fecha,
+    dentro de la suya.
+    
+    Returns:
+        ResultadosPorPartes: Resultados del período, o None si no quedaron registros
+    """
+    from resultados_por_partes import ResultadosPorPartes
+    
+    resultados = ResultadosPorPartes()
+    
+    def partes_para_excel():
+        for parte, resueltas_parte, invalidas_parte in procesar_por_particiones(
+                df, valor_por_hora, fechas_feriados, politicas, progreso=progreso):
+            resueltas.extend(resueltas_parte)
+            invalidas.extend(invalidas_parte)
+            if parte is not None:
+                yield _tabla_para_mostrar(resultados.agregar(parte, _columnas_internas(parte)))
+    
+    escribir_excel_por_partes(partes_para_excel(), resultados.ruta_excel)
+    return resultados if len(resultados) else None
 
-    return resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales
+def calcular_en_trabajo(trabajo, df, valor_por_hora, fechas_feriados, politicas=None):
+    """
+    procesar_datos_excel como trabajo en segundo plano (ver trabajos.py): informa el avance
+    al trabajo (que atiende la cancelación) y guarda los avisos para mostrarlos al terminar
+    
+    Returns:
+        dict: {"salida": tupla de procesar_datos_excel, "avisos": [(tipo, mensaje)]}
+    """
+    avisos = []
+    salida = procesar_datos_excel(
+        df, valor_por_hora, None, fechas_feriados, len(fechas_feriados or []), politicas,
+        progreso=trabajo.informar, avisos=avisos
+    )
+    return {"salida": salida, "avisos": avisos}
 
-def _procesar_fila(row, idx, valor_por_hora, fechas_feriados):
+def calcular_periodo(df, valor_por_hora, fechas_feriados, clave_sesion):
     """
-    Procesa una fila individual del Excel con lógica completa:
-    - Validación de horario laboral (10:30 AM - 22:00 PM)
-    - Horas normales × tarifa
-    - Horas especiales (20:00-22:00) × tarifa × 1.3
-    - Factor de feriado ×2 si aplica
+    Calcula los sueldos del período en segundo plano, sin bloquear la sesión
+    
+    El cálculo se envía como trabajo con la huella de sus datos: las recargas de la página
+    reutilizan el mismo trabajo (y su resultado) mientras los datos no cambien. Mientras
+    corre se muestra su progreso, que se actualiza solo (ver loading_components.seguir_trabajo).
     
     Args:
-        row: Fila del DataFrame
-        idx: Índice de la fila
-        valor_por_hora: Valor por hora
-        fechas_feriados: Fechas completas específicas de feriados
+        df (DataFrame): Registros del período ya corregidos
+        valor_por_hora (float): Valor por hora
+        fechas_feriados (set): Fechas completas específicas de feriados
+        clave_sesion (str): Clave de st.session_state donde se recuerda el trabajo
         
     Returns:
-        dict: Resultado del procesamiento de la fila
+        tuple: Salida de procesar_datos_excel cuando el cálculo terminó; None mientras sigue
+               en curso, o si se canceló o falló (ya informado en la interfaz)
     """
-    fecha = pd.to_datetime(row["Fecha"])
-    entrada = pd.to_datetime(str(row["Entrada"])).time()
-    salida = pd.to_datetime(str(row["Salida"])).time()
-
-    entrada_dt = datetime.combine(fecha, entrada)
-    salida_dt = datetime.combine(fecha, salida)
-    if salida_dt < entrada_dt:
-        salida_dt += timedelta(days=1)
+    from loading_components import seguir_trabajo
+    from politicas import ARCHIVO_POLITICAS
+    from trabajos import (
+        enviar_trabajo, obtener_trabajo, cancelar_trabajo, reiniciar_trabajo, clave_entrada,
+        CANCELADO, ERROR
+    )
+    
+    clave = clave_entrada(
+        pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy().tobytes(),
+        list(df.columns), valor_por_hora, sorted(str(f) for f in fechas_feriados or []),
+        os.path.getmtime(ARCHIVO_POLITICAS) if os.path.exists(ARCHIVO_POLITICAS) else None
+    )
+    trabajo = obtener_trabajo(st.session_state.get(clave_sesion))
+    if trabajo is None or trabajo.clave != clave:
+        # Datos distintos: el cálculo anterior de esta sesión ya no sirve
+        cancelar_trabajo(st.session_state.get(clave_sesion))
+        trabajo = enviar_trabajo(
+            calcular_en_trabajo, df, valor_por_hora, set(fechas_feriados or []),
+            clave=clave, descripcion="Cálculo de sueldos"
+        )
+        st.session_state[clave_sesion] = trabajo.id
+    
+    if trabajo.activo:
+        seguir_trabajo(trabajo.id)
+        return None
+    
+    if trabajo.estado in (CANCELADO, ERROR):
+        if trabajo.estado == CANCELADO:
+            st.markdown('<div class="custom-alert alert-warning">⏹️ Cálculo de sueldos cancelado.</div>', unsafe_allow_html=True)
+        else:
+            st.error(f" Error en el cálculo de sueldos: {trabajo.error}")
+        if st.button("Reiniciar cálculo", key=f"reiniciar_{clave_sesion}"):
+            st.session_state[clave_sesion] = reiniciar_trabajo(trabajo.id).id
+            st.rerun()
+        return None
+    
+    for tipo, mensaje in trabajo.resultado["avisos"]:
+        getattr(st, tipo)(mensaje)
+    return trabajo.resultado["salida"]
 
-    # NUEVA VALIDACIÓN: Verificar horario laboral (10:30 AM - 22:00 PM)
-    hora_inicio_laboral = datetime.combine(fecha, datetime.strptime("10:30", "%H:%M").time())
-    hora_fin_laboral = datetime.combine(fecha, datetime.strptime("22:00", "%H:%M").time())
-    
-    # Validar que la entrada esté dentro del horario laboral
-    if entrada_dt < hora_inicio_laboral or entrada_dt > hora_fin_laboral:
-        # Si está fuera del horario, no se calcula - retornar registro con 0 horas
-        return {
-            "datos": {
-                "Empleado": row["Empleado"],
-                "Fecha": fecha.strftime("%Y-%m-%d"),
-                "Entrada": entrada.strftime("%H:%M"),
-                "Salida": salida.strftime("%H:%M"),
-                "Feriado": "No",
-                "Horas Trabajadas (h:mm)": "0:00",
-                "Horas Normales": "0:00",
-                "Horas Especiales": "0:00",
-                "Descuento Inventario": 0,
-                "Descuento Caja": 0,
-                "Retiro": 0,
-                "Sueldo Final": 0,
-                "Observaciones": f"Fuera de horario laboral (10:30-22:00)"
-            },
-            "horas": 0,
-            "sueldo": 0
-        }
+def _minutos_del_dia(serie):
+    """
+    Convierte una columna de horas a minutos desde medianoche (NaN si no se puede interpretar)
     
-    # Validar que la salida también esté dentro del rango permitido
-    if salida_dt > hora_fin_laboral + timedelta(days=1 if salida_dt.date() > entrada_dt.date() else 0):
-        # Ajustar salida al máximo permitido
-        salida_dt = hora_fin_laboral
+    Las horas "HH:MM" se resuelven en una pasada vectorizada; solo los valores con otro
+    formato (ej: fecha y hora completas) se interpretan con pd.to_datetime.
+    """
+    minutos = serie_hora_a_minutos(serie)
+    pendientes = minutos.isna() & serie.notna()
+    if pendientes.any():
+        fechas_horas = pd.to_datetime(serie[pendientes].astype(str), errors='coerce')
+        minutos[pendientes] = fechas_horas.dt.hour * 60 + fechas_horas.dt.minute
+    return minutos
 
-    # Calcular horas trabajadas en decimal
-    horas_trabajadas_decimal = (salida_dt - entrada_dt).total_seconds() / 3600
+def _interpretar_fechas(serie):
+    """Convierte la columna Fecha a datetime, resolviendo uno a uno solo los formatos mixtos"""
+    fechas = pd.to_datetime(serie, errors='coerce')
+    pendientes = fechas.isna() & serie.notna()
+    if pendientes.any():
+        fechas[pendientes] = serie[pendientes].map(lambda valor: pd.to_datetime(valor, errors='coerce'))
+    return fechas
 
-    # Calcular horas especiales (20:00-22:00 con 30% extra)
-    horas_normales, horas_especiales = calcular_horas_especiales(entrada_dt, salida_dt)
+def _redondear_minutos(minutos, paso, modo):
+    """Redondea minutos enteros a múltiplos de 'paso' según el modo de cada registro ('abajo', 'arriba', 'cercano')"""
+    paso_seguro = np.where(paso > 0, paso, 1)
+    abajo = minutos // paso_seguro * paso_seguro
+    arriba = -(-minutos // paso_seguro) * paso_seguro
+    cercano = (minutos + paso_seguro // 2) // paso_seguro * paso_seguro
+    redondeados = np.select([modo == "abajo", modo == "arriba"], [abajo, arriba], cercano)
+    return np.where(paso > 0, redondeados, minutos)
+
+def calcular_sueldos(df, valor_por_hora, fechas_feriados, politicas=None, progreso=None, invalidas=None):
+    """
+    Calcula horas y sueldo de todos los registros a la vez según la política de cada empleado:
+    - Validación de la ventana laboral (por defecto 10:30 - 22:00)
+    - Horas normales × tarifa
+    - Horas en bandas especiales (por defecto 20:00-22:00) × tarifa × factor de la banda
+    - Horas extra diarias sobre el umbral × recargo (si la política lo define)
+    - Factor de feriado (por defecto ×2) si aplica
+    
+    Los turnos que cruzan la medianoche se dividen por día: cada tramo usa las bandas y el
+    factor de feriado de su propio día.
+    
+    Args:
+        df (DataFrame): Registros con Empleado, Fecha, Entrada, Salida y descuentos
+        valor_por_hora (float): Valor por hora
+        fechas_feriados (set): Fechas completas específicas de feriados
+        politicas (dict): Políticas laborales (por defecto politicas_laborales.json)
+        progreso: Callback de progreso por etapa del cálculo (ver progreso.py)
+        invalidas (list): Si se indica, recibe los mensajes de filas no válidas en lugar
+                          de mostrarlos (procesamiento por particiones)
+        
+    Returns:
+        DataFrame: Una fila por registro válido con las columnas del reporte, más
+                   _minutos_trabajados, _minutos_normales, _minutos_especiales (enteros),
+                   _sueldo_centavos (entero; el "Sueldo Final" en moneda se arma recién para
+                   mostrar, ver _tabla_para_mostrar), _inicio_absoluto/_fin_absoluto (minutos
+                   desde el inicio del período). Si los registros traen Id_Registro (ver
+                   identificadores.py) o Id_Empleado (ver registro_empleados.py), cada
+                   resultado conserva los de su registro
+    """
+    # Cálculo vectorizado: el avance se informa por etapa (cada una procesa todas las filas)
+    avance = crear_progreso(progreso, 5, "Calculando sueldos", intervalo=0)
+    
+    fechas = _interpretar_fechas(df["Fecha"])
+    entrada = _minutos_del_dia(df["Entrada"])
+    salida = _minutos_del_dia(df["Salida"])
+    
+    # Filas que no se pueden interpretar se informan y se excluyen del cálculo
+    no_validas = fechas.isna() | entrada.isna() | salida.isna()
+    for idx, fila in df.loc[no_validas, ["Fecha", "Entrada", "Salida"]].iterrows():
+        mensaje = (f"Error en la fila {idx+2}: fecha u horario no válido "
+                   f"({fila['Fecha']}, {fila['Entrada']}, {fila['Salida']})")
+        if invalidas is not None:
+            invalidas.append(mensaje)
+        else:
+            st.error(mensaje)
+    if no_validas.any():
+        df = df[~no_validas]
+        fechas = fechas[~no_validas]
+        entrada = entrada[~no_validas]
+        salida = salida[~no_validas]
+    entrada = entrada.to_numpy().astype(np.int64)
+    salida = salida.to_numpy().astype(np.int64)
+    
+    avance.avanzar()
+    
+    parametros = compilar_politicas(df["Empleado"], politicas)
+    inicio_laboral = parametros["inicio_laboral"].to_numpy()
+    fin_laboral = parametros["fin_laboral"].to_numpy()
     
-    # Comparar la fecha completa (año-mes-día) con las fechas de feriados seleccionadas
-    es_feriado = fecha.date() in fechas_feriados
+    # Turnos con inicio y fin absolutos (minutos desde el inicio del período); una salida
+    # anterior a la entrada termina al día siguiente
+    dia, inicio, fin = turnos_absolutos(fechas, entrada, salida)
     
-    # Factor de feriado: 2x si es feriado, 1x si no lo es
-    factor_feriado = 2 if es_feriado else 1
+    # La entrada debe caer dentro de la ventana laboral; si no, el registro no se paga.
+    # Una ventana con fin anterior al inicio (ej: 18:00-06:00) cruza la medianoche
+    ventana_cruza = fin_laboral <= inicio_laboral
+    dentro_de_ventana = np.where(
+        ventana_cruza,
+        (entrada >= inicio_laboral) | (entrada <= fin_laboral),
+        (entrada >= inicio_laboral) & (entrada <= fin_laboral)
+    )
+    fuera_de_horario = ~dentro_de_ventana
+    
+    # Redondeo de la duración y recorte del fin absoluto del turno al cierre de la ventana en
+    # que entró (fin_laboral del día de entrada, o del día siguiente si la ventana cruza la
+    # medianoche y la entrada es antes de ella). El recorte vale también para las salidas
+    # después de la medianoche, así salir más tarde nunca paga más de lo que permite la ventana
+    fin = inicio + _redondear_minutos(
+        fin - inicio, parametros["redondeo"].to_numpy(), parametros["modo_redondeo"].to_numpy()
+    )
+    cierra_al_dia_siguiente = ventana_cruza & (entrada >= inicio_laboral)
+    fin_ventana = dia * MINUTOS_DIA + fin_laboral + np.where(cierra_al_dia_siguiente, MINUTOS_DIA, 0)
+    fin = np.where(fuera_de_horario, inicio, np.minimum(fin, fin_ventana))
+    trabajados = fin - inicio
+    avance.avanzar()
+    
+    # Cada turno se divide en el tramo del día de entrada y el del día siguiente, para
+    # aplicar a cada tramo las bandas especiales y el factor de feriado de su propio día
+    # Todo el cálculo es entero: minutos, factores en puntos básicos (ESCALA_FACTOR) y centavos.
+    # 'unidades' acumula minutos × factor de banda × factor de feriado (escala ESCALA_FACTOR²)
+    feriados = list(fechas_feriados or [])
+    especiales = np.zeros(len(df), dtype=np.int64)
+    unidades = np.zeros(len(df), dtype=np.int64)
+    es_feriado = np.zeros(len(df), dtype=bool)
+    factor_feriado_final = np.full(len(df), ESCALA_FACTOR, dtype=np.int64)
+    for desplazamiento in (0, 1):
+        inicio_tramo = np.maximum(inicio, (dia + desplazamiento) * MINUTOS_DIA)
+        fin_tramo = np.maximum(np.minimum(fin, (dia + desplazamiento + 1) * MINUTOS_DIA), inicio_tramo)
+        minutos_tramo = fin_tramo - inicio_tramo
+        
+        # Minutos en cada banda especial y su valor ponderado por el factor de la banda
+        especiales_tramo = np.zeros(len(df), dtype=np.int64)
+        ponderados_tramo = np.zeros(len(df), dtype=np.int64)
+        for numero in range(cantidad_bandas(parametros)):
+            factor = parametros[f"banda{numero}_factor"].to_numpy()
+            en_banda = minutos_en_franja(
+                inicio_tramo, fin_tramo,
+                parametros[f"banda{numero}_desde"].to_numpy(), parametros[f"banda{numero}_hasta"].to_numpy()
+            )
+            en_banda = np.where(factor > 0, en_banda, 0)
+            especiales_tramo += en_banda
+            ponderados_tramo += en_banda * factor
+        
+        # Comparar la fecha completa (año-mes-día) del tramo con las fechas de feriados
+        feriado_tramo = (fechas + pd.Timedelta(days=desplazamiento)).dt.date.isin(feriados).to_numpy() & (minutos_tramo > 0)
+        factor_feriado = np.where(feriado_tramo, parametros["factor_feriado"].to_numpy(), ESCALA_FACTOR)
+        
+        especiales += especiales_tramo
+        unidades += ((minutos_tramo - especiales_tramo) * ESCALA_FACTOR + ponderados_tramo) * factor_feriado
+        es_feriado |= feriado_tramo
+        factor_feriado_final = np.where(minutos_tramo > 0, factor_feriado, factor_feriado_final)
+        avance.avanzar()
+    normales = trabajados - especiales
+    
+    # Horas extra: minutos del día del turno que superan el umbral del empleado
+    # (se pagan con el factor de feriado del día en que termina el turno)
+    acumulado = pd.Series(trabajados, index=df.index).groupby([clave_empleado(df), dia]).cumsum().to_numpy()
+    umbral = parametros["umbral_extra"].to_numpy()
+    extra = (np.clip(acumulado - umbral, 0, None)
+             - np.clip(acumulado - trabajados - umbral, 0, None))
+    unidades += extra * (parametros["factor_extra"].to_numpy() - ESCALA_FACTOR) * factor_feriado_final
+    
+    # Sueldo bruto en centavos: unidades × tarifa / (60 minutos × escala de ambos factores)
+    sueldo_bruto = escalar_redondeando(unidades, a_centavos(valor_por_hora), 60 * ESCALA_FACTOR * ESCALA_FACTOR)
+    
+    descuento_inventario = df["Descuento Inventario"].fillna(0)
+    descuento_caja = df["Descuento Caja"].fillna(0)
+    retiro = df["Retiro"].fillna(0)
+    descuentos = (
+        serie_a_centavos(df["Descuento Inventario"]) + serie_a_centavos(df["Descuento Caja"])
+        + serie_a_centavos(df["Retiro"])
+    ).to_numpy()
+    sueldo_final = np.where(fuera_de_horario, 0, sueldo_bruto - descuentos)
+    
+    # Observaciones: fuera de horario o registro completado por el motor de reglas
+    observaciones = pd.Series(None, index=df.index, dtype=object)
+    if "Auto_Correccion" in df.columns:
+        autocorregidos = df["Auto_Correccion"].notna() & df["Auto_Correccion"].astype(bool)
+        observaciones[autocorregidos] = "Autocorregido: " + df.loc[autocorregidos, "Auto_Correccion"].astype(str)
+    observaciones[fuera_de_horario] = "Fuera de horario laboral (" + parametros.loc[fuera_de_horario, "ventana"] + ")"
+    
+    df_resultado = pd.DataFrame({
+        "Empleado": df["Empleado"],
+        "Fecha": fechas.dt.strftime("%Y-%m-%d"),
+        "Entrada": minutos_a_hora_str(pd.Series(entrada, index=df.index)),
+        "Salida": minutos_a_hora_str(pd.Series(salida, index=df.index)),
+        "Feriado": np.where(es_feriado & ~fuera_de_horario, "Sí", "No"),
+        "Horas Trabajadas (h:mm)": minutos_a_horasminutos(trabajados),
+        "Horas Normales": minutos_a_horasminutos(normales),
+        "Horas Especiales": minutos_a_horasminutos(especiales),
+        "Descuento Inventario": descuento_inventario.where(~fuera_de_horario, 0),
+        "Descuento Caja": descuento_caja.where(~fuera_de_horario, 0),
+        "Retiro": retiro.where(~fuera_de_horario, 0),
+        "Observaciones": observaciones,
+        "_minutos_trabajados": trabajados,
+        "_minutos_normales": normales,
+        "_minutos_especiales": especiales,
+        "_inicio_absoluto": inicio,
+        "_fin_absoluto": fin,
+        "_sueldo_centavos": sueldo_final
+    }, index=df.index)
+    for columna in (COLUMNA_ID, COLUMNA_ID_EMPLEADO):
+        if columna in df.columns:
+            df_resultado[columna] = df[columna]
+    avance.terminar()
+    
+    return df_resultado
 
-    # Cálculo con horas normales y especiales
-    sueldo_normal = horas_normales * valor_por_hora
-    sueldo_especial = horas_especiales * valor_por_hora * 1.3  # 30% extra para horas especiales
-    sueldo_bruto = (sueldo_normal + sueldo_especial) * factor_feriado
+# Filas de resultados por página (por encima se muestra resumen por empleado o paginado)
+FILAS_POR_PAGINA = 200
 
-    # Aplicar descuentos
-    descuento_inventario = row["Descuento Inventario"] if not pd.isnull(row["Descuento Inventario"]) else 0
-    descuento_caja = row["Descuento Caja"] if not pd.isnull(row["Descuento Caja"]) else 0
-    retiro = row["Retiro"] if not pd.isnull(row["Retiro"]) else 0
+def _huella_resultados(df_result):
+    """Huella del contenido de los resultados, para memorizar la exportación y las claves de vista"""
+    import hashlib
+    valores = pd.util.hash_pandas_object(df_result.astype(str), index=False).to_numpy()
+    return hashlib.sha1(valores.tobytes() + ",".join(df_result.columns).encode()).hexdigest()[:16]
+
+def _excel_resultados(huella, df_result):
+    """
+    Genera el Excel de resultados, memorizado por la huella en la caché de la sesión
+    (cada usuario guarda solo sus propias exportaciones)
+    
+    Args:
+        huella (str): Huella de los resultados (_huella_resultados)
+        df_result (DataFrame): Resultados a exportar
+        
+    Returns:
+        bytes: Contenido del archivo xlsx
+    """
+    from sesion import cache_sesion, guardar_en_cache_sesion
+    
+    cache = cache_sesion("excel_resultados")
+    if huella in cache:
+        return cache[huella]
+    
+    output = io.BytesIO()
+    partes = (df_result.iloc[inicio:inicio + FILAS_POR_PARTICION] for inicio in range(0, len(df_result), FILAS_POR_PARTICION))
+    escribir_excel_por_partes(partes, output, list(df_result.columns))
+    return guardar_en_cache_sesion("excel_resultados", huella, output.getvalue())
 
-    sueldo_final = sueldo_bruto - descuento_inventario - descuento_caja - retiro
+def escribir_excel_por_partes(partes, destino, columnas=None):
+    """
+    Escribe un xlsx a medida que llegan las partes de los resultados (modo write_only de
+    openpyxl): cada parte se vuelca y se descarta, sin armar la hoja completa en memoria
+    
+    Args:
+        partes: Iterable de DataFrames con las mismas columnas (ej: particiones procesadas)
+        destino: Ruta o archivo binario (ej: io.BytesIO)
+        columnas (list): Encabezados (por defecto las columnas de la primera parte)
+        
+    Returns:
+        int: Filas escritas (sin el encabezado)
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+    
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet("Sheet1")
+    borde = Side(style="thin")
+    
+    def escribir_encabezado(nombres):
+        celdas = []
+        for nombre in nombres:
+            celda = WriteOnlyCell(hoja, value=nombre)
+            celda.font = Font(bold=True)
+            celda.border = Border(left=borde, right=borde, top=borde, bottom=borde)
+            celda.alignment = Alignment(horizontal="center", vertical="top")
+            celdas.append(celda)
+        hoja.append(celdas)
+    
+    if columnas is not None:
+        escribir_encabezado(columnas)
+    filas = 0
+    for parte in partes:
+        if columnas is None:
+            columnas = list(parte.columns)
+            escribir_encabezado(columnas)
+        valores = parte[columnas].astype(object).where(parte[columnas].notna(), None)
+        for fila in valores.itertuples(index=False, name=None):
+            hoja.append(fila)
+        filas += len(parte)
+    libro.save(destino)
+    return filas
 
-    datos_fila = {
-        "Empleado": row["Empleado"],
-        "Fecha": fecha.strftime("%Y-%m-%d"),
-        "Entrada": entrada.strftime("%H:%M"),
-        "Salida": salida.strftime("%H:%M"),
-        "Feriado": "Sí" if es_feriado else "No",
-        "Horas Trabajadas (h:mm)": horas_a_horasminutos(horas_trabajadas_decimal),
-        "Horas Normales": horas_a_horasminutos(horas_normales),
-        "Horas Especiales": horas_a_horasminutos(horas_especiales),
-        "Descuento Inventario": descuento_inventario,
-        "Descuento Caja": descuento_caja,
-        "Retiro": retiro,
-        "Sueldo Final": round(sueldo_final, 2)
-    }
+def _tabla_para_mostrar(df_result):
+    """
+    Columnas del reporte para la tabla y el Excel: el sueldo pasa de centavos enteros a
+    "Sueldo Final" en moneda (Decimal exacto) y se quitan las columnas internas y los
+    identificadores (Id_Registro e Id_Empleado se conservan en los resultados, no en el reporte)
+    
+    Returns:
+        DataFrame: Resultados listos para mostrar o exportar
+    """
+    df_result = df_result.drop(columns=[COLUMNA_ID, COLUMNA_ID_EMPLEADO], errors='ignore')
+    if "_sueldo_centavos" not in df_result.columns:
+        return df_result
+    sueldo = df_result["_sueldo_centavos"].map(centavos_a_decimal)
+    tabla = df_result.drop(columns="_sueldo_centavos")
+    posicion = tabla.columns.get_loc("Observaciones") if "Observaciones" in tabla.columns else len(tabla.columns)
+    tabla.insert(posicion, "Sueldo Final", sueldo)
+    return tabla
 
-    return {
-        "datos": datos_fila,
-        "horas": horas_trabajadas_decimal,
-        "sueldo": sueldo_final,
-        "horas_normales": horas_normales,  # NUEVO: Para los totales
-        "horas_especiales": horas_especiales  # NUEVO: Para los totales
+def _resumen_por_empleado(resultados):
+    """
+    Resume los resultados por empleado (registros, horas y sueldo total)
+    
+    Args:
+        resultados: DataFrame de resultados, o ResultadosPorPartes (usa su resumen acumulado)
+    
+    Returns:
+        DataFrame: Una fila por empleado
+    """
+    from resultados_por_partes import ResultadosPorPartes
+    
+    columnas_horas = {
+        "Horas Trabajadas (h:mm)": "_minutos_trabajados",
+        "Horas Normales": "_minutos_normales",
+        "Horas Especiales": "_minutos_especiales",
     }
+    if isinstance(resultados, ResultadosPorPartes):
+        sumas = resultados.resumen()
+    else:
+        # Agrupa por Id_Empleado (entero) si los resultados lo traen; el nombre solo se muestra
+        empleado = clave_empleado(resultados)
+        minutos = {
+            interna: serie_hora_a_minutos(resultados[columna]).fillna(0).astype('int64')
+            for columna, interna in columnas_horas.items()
+        }
+        sumas = pd.DataFrame({
+            "Registros": 1, **minutos, "_sueldo_centavos": resultados["_sueldo_centavos"].astype('int64')
+        }).groupby(empleado).sum().rename_axis(None)
+        sumas.insert(0, "Empleado", resultados["Empleado"].groupby(empleado).first())
+        sumas = sumas.sort_values("Empleado", kind='stable')
+    
+    agrupado = pd.DataFrame({"Empleado": sumas["Empleado"], "Registros": sumas["Registros"]})
+    for columna, interna in columnas_horas.items():
+        agrupado[columna] = minutos_a_horasminutos(sumas[interna])
+    agrupado["Sueldo Final"] = sumas["_sueldo_centavos"].map(centavos_a_decimal)
+    return agrupado.reset_index(drop=True)
 
 def mostrar_resultados(resultados, total_horas, total_sueldos, total_horas_normales=0, total_horas_especiales=0, valor_por_hora=None, fechas_feriados=None, nombre_archivo=None):
     """
     Muestra los resultados en la interfaz y proporciona descarga
     
     Args:
-        resultados (list): Lista de resultados procesados
+        resultados (list): Lista de resultados procesados, o ResultadosPorPartes de un período
+                           particionado (se lee de disco por páginas)
         total_horas (float): Total de horas trabajadas
-        total_sueldos (float): Total de sueldos calculados
+        total_sueldos (Decimal): Total de sueldos calculados
         total_horas_normales (float): Total de horas normales trabajadas
         total_horas_especiales (float): Total de horas especiales trabajadas
         valor_por_hora (float): Valor por hora utilizado en cálculos
         fechas_feriados (set): Fechas marcadas como feriados
         nombre_archivo (str): Nombre base para el archivo Excel (opcional)
     """
-    df_result = pd.DataFrame(resultados)
+    from resultados_por_partes import ResultadosPorPartes
+    
+    if isinstance(resultados, ResultadosPorPartes):
+        df_result = None
+        cantidad = len(resultados)
+        huella = resultados.huella
+        filas_vista = lambda desde, hasta: _tabla_para_mostrar(resultados.filas(desde, hasta))
+    else:
+        df_result = pd.DataFrame(resultados)
+        df_vista = _tabla_para_mostrar(df_result)
+        cantidad = len(df_result)
+        huella = _huella_resultados(df_result)
+        filas_vista = lambda desde, hasta: df_vista.iloc[desde:hasta]
+    texto_normales, texto_especiales, texto_total = minutos_a_horasminutos(
+        [total_horas_normales * 60, total_horas_especiales * 60, total_horas * 60]
+    )
     
     # Mensaje de éxito con estilo
     st.markdown("""
@@ -306,59 +846,46 @@ def mostrar_resultados(resultados, total_horas, total_sueldos, total_horas_norma
     </div>
     """, unsafe_allow_html=True)
     
-    # Mostrar tabla con estilo
+    # Mostrar tabla: períodos grandes se ven resumidos por empleado o por páginas, para no
+    # enviar al navegador todas las filas en cada recarga
     st.markdown("### Resultados del Cálculo")
-    st.dataframe(df_result, use_container_width=True)
+    if cantidad <= FILAS_POR_PAGINA:
+        st.dataframe(filas_vista(0, cantidad), use_container_width=True)
+    else:
+        vista = st.radio(
+            "Vista:", ["Resumen por empleado", "Detalle por registro"],
+            horizontal=True, key=f"vista_resultados_{huella}"
+        )
+        if vista == "Resumen por empleado":
+            st.dataframe(_resumen_por_empleado(resultados if df_result is None else df_result),
+                         use_container_width=True, hide_index=True)
+        else:
+            paginas = -(-cantidad // FILAS_POR_PAGINA)
+            pagina = st.number_input(
+                f"Página (de {paginas}):", min_value=1, max_value=paginas, value=1, step=1,
+                key=f"pagina_resultados_{huella}"
+            )
+            desde = (pagina - 1) * FILAS_POR_PAGINA
+            hasta = min(desde + FILAS_POR_PAGINA, cantidad)
+            st.dataframe(filas_vista(desde, hasta), use_container_width=True)
+            st.caption(f"Registros {desde + 1}-{hasta} de {cantidad}")
 
-    # Resumen visual final con métricas mejoradas
+    # Resumen visual final con métricas mejoradas (un solo bloque HTML)
     st.markdown("### 📈 Resumen General")
-    col1, col2, col3, col4, col5 = st.columns(5)
-    
-    with col1:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">Total Registros</div>
-            <div class="metric-value">{len(df_result)}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">Horas Normales</div>
-            <div class="metric-value">{horas_a_horasminutos(total_horas_normales)}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">Horas Especiales</div>
-            <div class="metric-value">{horas_a_horasminutos(total_horas_especiales)}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">Total Horas</div>
-            <div class="metric-value">{horas_a_horasminutos(total_horas)}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col5:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">Total Sueldos</div>
-            <div class="metric-value">${round(total_sueldos, 2):,.0f}</div>
-        </div>
-        """, unsafe_allow_html=True)
+    metricas = [
+        ("Total Registros", cantidad),
+        ("Horas Normales", texto_normales),
+        ("Horas Especiales", texto_especiales),
+        ("Total Horas", texto_total),
+        ("Total Sueldos", f"${round(total_sueldos, 2):,.0f}"),
+    ]
+    tarjetas = "".join(
+        f'<div class="metric-card"><div class="metric-label">{etiqueta}</div>'
+        f'<div class="metric-value">{valor}</div></div>'
+        for etiqueta, valor in metricas
+    )
+    st.markdown(f'<div class="metric-grid">{tarjetas}</div>', unsafe_allow_html=True)
 
-    # Descargar Excel final
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df_result.to_excel(writer, index=False)
-    
     # Generar nombre del archivo dinámico
     if nombre_archivo:
         # Limpiar nombre del archivo (remover extensión .pdf si existe)
@@ -367,12 +894,23 @@ def mostrar_resultados(resultados, total_horas, total_sueldos, total_horas_norma
     else:
         nombre_excel = "sueldos_calculados.xlsx"
     
-    st.download_button(
-        " Descargar Reporte Final en Excel",
-        data=output.getvalue(),
-        file_name=nombre_excel,
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    # Descargar Excel final: se arma solo cuando se pide y queda memorizado por la huella
+    # de los resultados, así las recargas posteriores no vuelven a generarlo (el de un
+    # período particionado ya se escribió en disco durante el cálculo)
+    clave_excel = f"excel_preparado_{huella}"
+    if st.session_state.get(clave_excel) or st.button(" Preparar Reporte Final en Excel", key=f"preparar_{clave_excel}"):
+        st.session_state[clave_excel] = True
+        if df_result is None:
+            with open(resultados.ruta_excel, 'rb') as archivo:
+                contenido_excel = archivo.read()
+        else:
+            contenido_excel = _excel_resultados(huella, df_vista)
+        st.download_button(
+            " Descargar Reporte Final en Excel",
+            data=contenido_excel,
+            file_name=nombre_excel,
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
     
     # Botón de consulta para calculadora de horas
     st.markdown("---")
@@ -0,0 +1,165 @@
+"""
+Extracción tabular de PDFs de relojes de asistencia
+Usa la geometría de palabras de pdfplumber para mapear celdas directamente a columnas
+(empleado, fecha, hora, entrada, salida) sin pasar por la cascada de expresiones regulares
+"""
+import re
+import unicodedata
+from typing import List, Dict, Optional
+
+from progreso import crear_progreso
+from smart_parser import SmartTimeParser
+
+# Palabras de encabezado reconocidas para cada columna lógica
+ENCABEZADOS_COLUMNAS = {
+    "empleado": ["empleado", "nombre", "apellido y nombre", "name", "employee"],
+    "fecha": ["fecha", "dia", "date"],
+    "hora": ["hora", "marca", "marcacion", "time"],
+    "entrada": ["entrada", "ingreso", "in", "check-in"],
+    "salida": ["salida", "egreso", "out", "check-out"],
+    "tipo": ["tipo", "evento", "estado", "type"]
+}
+
+# Tolerancia vertical (puntos) para considerar que dos palabras están en la misma fila
+TOLERANCIA_FILA = 3
+
+_PATRON_FECHA = re.compile(r'\d{4}-\d{2}-\d{2}|\d{1,2}[/.-]\d{1,2}[/.-]\d{4}')
+_PATRON_HORA = re.compile(r'\b\d{1,2}:\d{2}(?::\d{2})?\b')
+
+
+def _normalizar(texto: str) -> str:
+    """Minúsculas sin acentos para comparar encabezados"""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c)).strip(' :.')
+
+
+def _agrupar_en_filas(palabras: List[Dict]) -> List[List[Dict]]:
+    """Agrupa las palabras de una página en filas según su coordenada vertical"""
+    filas = []
+    for palabra in sorted(palabras, key=lambda p: (round(p['top']), p['x0'])):
+        if filas and abs(filas[-1][0]['top'] - palabra['top']) <= TOLERANCIA_FILA:
+            filas[-1].append(palabra)
+        else:
+            filas.append([palabra])
+    return [sorted(fila, key=lambda p: p['x0']) for fila in filas]
+
+
+def detectar_columnas(palabras: List[Dict]) -> Optional[Dict]:
+    """
+    Detecta el diseño de columnas a partir de la fila de encabezado de una página
+
+    Args:
+        palabras: Palabras de la página (pdfplumber extract_words)
+
+    Returns:
+        Dict: {"columnas": [(nombre, x_inicio)], "encabezado": texto} ordenadas por x,
+              o None si no hay un encabezado con fecha y hora reconocibles
+    """
+    for fila in _agrupar_en_filas(palabras):
+        columnas = []
+        for palabra in fila:
+            texto = _normalizar(palabra['text'])
+            for nombre, alias in ENCABEZADOS_COLUMNAS.items():
+                if texto in alias and nombre not in [c[0] for c in columnas]:
+                    columnas.append((nombre, palabra['x0']))
+                    break
+
+        nombres = {c[0] for c in columnas}
+        if "fecha" in nombres and nombres & {"hora", "entrada", "salida"}:
+            return {
+                "columnas": sorted(columnas, key=lambda c: c[1]),
+                "encabezado": ' '.join(p['text'] for p in fila)
+            }
+    return None
+
+
+def _celdas_de_fila(fila: List[Dict], columnas: List[tuple]) -> Dict[str, str]:
+    """Asigna cada palabra de la fila a la columna cuyo inicio es el más cercano a su izquierda"""
+    celdas = {nombre: [] for nombre, _ in columnas}
+    margen = 2
+    for palabra in fila:
+        columna = columnas[0][0]
+        for nombre, x_inicio in columnas:
+            if palabra['x0'] + margen >= x_inicio:
+                columna = nombre
+            else:
+                break
+        celdas[columna].append(palabra['text'])
+    return {nombre: ' '.join(textos).strip() for nombre, textos in celdas.items()}
+
+
+def extraer_marcaciones_tabla(pdf, diseno: Optional[Dict] = None, progreso=None) -> Optional[List[Dict]]:
+    """
+    Extrae marcaciones de un PDF tabular usando la posición horizontal de cada palabra
+
+    El diseño de columnas se detecta en la primera página y se reutiliza en las siguientes.
+
+    Args:
+        pdf: Documento abierto con pdfplumber
+        diseno: Diseño de columnas ya conocido (omite la detección)
+        progreso: Callback de progreso por página (ver progreso.py)
+
+    Returns:
+        List[Dict]: Marcaciones con empleado, fecha, hora, tipo, confianza y linea_original,
+                    o None si el documento no tiene una tabla reconocible
+    """
+    if not pdf.pages:
+        return None
+
+    if diseno is None:
+        diseno = detectar_columnas(pdf.pages[0].extract_words())
+        if diseno is None:
+            return None
+
+    parser = SmartTimeParser()
+    columnas = diseno["columnas"]
+    nombres_columnas = {c[0] for c in columnas}
+    datos = []
+    empleado_actual = None
+    avance = crear_progreso(progreso, len(pdf.pages), "Leyendo páginas")
+
+    for pagina in pdf.pages:
+        for fila in _agrupar_en_filas(pagina.extract_words()):
+            linea = ' '.join(p['text'] for p in fila)
+            if linea == diseno["encabezado"]:
+                continue
+
+            # Encabezados de sección "Empleado: Nombre" en tablas agrupadas por persona
+            if "empleado" not in nombres_columnas and re.match(r'(Empleado|Nombre):', linea, re.IGNORECASE):
+                empleado_actual = linea.split(':', 1)[1].strip()
+                continue
+
+            celdas = _celdas_de_fila(fila, columnas)
+            if celdas.get("empleado"):
+                empleado_actual = celdas["empleado"]
+
+            coincidencia_fecha = _PATRON_FECHA.search(celdas.get("fecha", ""))
+            if not coincidencia_fecha or not empleado_actual:
+                continue
+            fecha = parser.normalizar_fecha(coincidencia_fecha.group(0))
+            if not fecha:
+                continue
+
+            horas = []
+            if "hora" in celdas:
+                tipo_celda = _normalizar(celdas.get("tipo", ""))
+                tipo = 'Salida' if tipo_celda in ENCABEZADOS_COLUMNAS["salida"] else 'Entrada' if tipo_celda in ENCABEZADOS_COLUMNAS["entrada"] else None
+                horas += [(hora, tipo) for hora in _PATRON_HORA.findall(celdas["hora"])]
+            for columna, tipo in (("entrada", 'Entrada'), ("salida", 'Salida')):
+                horas += [(hora, tipo) for hora in _PATRON_HORA.findall(celdas.get(columna, ""))]
+
+            for hora, tipo in horas:
+                hora_normalizada = parser.normalizar_hora(hora)
+                if not hora_normalizada:
+                    continue
+                datos.append({
+                    "empleado": empleado_actual,
+                    "fecha": fecha,
+                    "hora": hora_normalizada,
+                    "tipo": tipo or ('Entrada' if int(hora_normalizada[:2]) < 12 else 'Salida'),
+                    "linea_original": linea,
+                    "confianza": 1.0
+                })
+        avance.avanzar()
+
+    return datos or None
@@ -0,0 +1,391 @@
+"""
+Registro de formatos de exportación de relojes de asistencia
+Cada formato declara un sniff() barato, que mira solo las primeras líneas del texto, y una
+extracción especializada. Los formatos conocidos (registros tipo ZKTeco, CSV con encabezado) se
+leen por columnas sin pasar por las heurísticas genéricas; el resto usa el análisis de texto libre.
+
+Un formato nuevo se agrega con el decorador registrar_formato:
+
+    @registrar_formato("mi_reloj", prioridad=5, sniff=_es_mi_reloj)
+    def _extraer_mi_reloj(lineas, estructura, progreso=None) -> List[Dict]:
+        ...
+"""
+import csv
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from progreso import crear_progreso
+
+# Líneas no vacías que recibe sniff()
+LINEAS_MUESTRA = 30
+
+# Archivos que se leen como texto (el resto se procesa como PDF)
+EXTENSIONES_TEXTO = (".csv", ".txt", ".dat")
+
+# nombre -> {"prioridad": int, "sniff": función(muestra) -> bool,
+#            "extraer": función(lineas, estructura, progreso) -> List[Dict]}
+_FORMATOS: Dict[str, Dict] = {}
+
+# Formato de texto libre: siempre aplica y se prueba último
+FORMATO_GENERICO = "texto"
+
+
+def registrar_formato(nombre: str, prioridad: int, sniff: Callable[[List[str]], bool]):
+    """
+    Decorador para registrar la extracción de un formato de exportación
+
+    La función decorada recibe las líneas del texto, un diccionario 'estructura' (vacío, o el
+    guardado para un diseño conocido, que puede completar) y un callback de progreso, y devuelve
+    las marcaciones (empleado, fecha, hora, tipo, linea_original, confianza).
+
+    Args:
+        nombre: Identificador del formato
+        prioridad: Menor = se prueba primero (los formatos más específicos)
+        sniff: Función que recibe una muestra de líneas e indica si son de este formato
+    """
+    def decorador(funcion: Callable) -> Callable:
+        _FORMATOS[nombre] = {"prioridad": prioridad, "sniff": sniff, "extraer": funcion}
+        return funcion
+    return decorador
+
+
+def formatos_registrados() -> List[str]:
+    """Formatos registrados, en el orden en que se prueban"""
+    return sorted(_FORMATOS, key=lambda n: _FORMATOS[n]["prioridad"])
+
+
+def _muestra(lineas: List[str]) -> List[str]:
+    """Primeras LINEAS_MUESTRA líneas con contenido (sin saltos de página)"""
+    muestra = []
+    for linea in lineas:
+        if linea.strip(" \f\r"):
+            muestra.append(linea.rstrip("\r"))
+            if len(muestra) >= LINEAS_MUESTRA:
+                break
+    return muestra
+
+
+def elegir_formato(lineas: List[str]) -> str:
+    """
+    Elige el formato del texto: el primero (por prioridad) cuyo sniff() reconoce la muestra
+
+    Args:
+        lineas: Líneas del texto extraído o del archivo
+
+    Returns:
+        str: Nombre del formato (FORMATO_GENERICO si ninguno lo reconoce)
+    """
+    muestra = _muestra(lineas)
+    for nombre in formatos_registrados():
+        try:
+            if _FORMATOS[nombre]["sniff"](muestra):
+                return nombre
+        except Exception:
+            continue
+    return FORMATO_GENERICO
+
+
+def extraer_marcaciones_lineas(lineas: List[str], plan: Optional[Dict] = None,
+                               progreso=None) -> Tuple[List[Dict], Dict]:
+    """
+    Extrae las marcaciones de un texto con el formato que corresponde
+
+    Con el plan de un diseño conocido (ver cache_disenos) se usa su formato y estructura sin
+    volver a detectarlos. Si un formato específico no obtiene marcaciones, se recurre al
+    análisis de texto libre.
+
+    Args:
+        lineas: Líneas del texto
+        plan: Plan guardado del diseño ({"modo": "texto", "formato", "estructura"}); los planes
+              anteriores sin "formato" corresponden al texto libre
+        progreso: Callback de progreso por línea (ver progreso.py)
+
+    Returns:
+        Tuple[List[Dict], Dict]: (marcaciones, plan del diseño para guardar)
+    """
+    formato = plan.get("formato", FORMATO_GENERICO) if plan else None
+    if formato in _FORMATOS:
+        estructura = dict(plan.get("estructura") or {})
+    else:
+        formato = elegir_formato(lineas)
+        estructura = {}
+
+    datos = _FORMATOS[formato]["extraer"](lineas, estructura, progreso)
+
+    if not datos and formato != FORMATO_GENERICO:
+        formato = FORMATO_GENERICO
+        estructura = {}
+        datos = _FORMATOS[formato]["extraer"](lineas, estructura, progreso)
+
+    return datos, {"modo": "texto", "formato": formato, "estructura": estructura}
+
+
+def decodificar_texto(contenido: bytes) -> str:
+    """
+    Decodifica un archivo de texto exportado: UTF-16 con BOM (habitual en relojes ZKTeco),
+    UTF-8 (con o sin BOM) o, si no, Windows-1252
+    """
+    if contenido.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return contenido.decode("utf-16")
+    try:
+        return contenido.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return contenido.decode("cp1252", errors="replace")
+
+
+def extraer_marcaciones(archivo, progreso=None, avisos=None) -> List[Dict]:
+    """
+    Extrae las marcaciones individuales de un archivo subido: PDF o exportación de texto
+    (.csv, .txt, .dat)
+
+    Args:
+        archivo: Archivo subido (objeto con name y read/seek)
+        progreso: Callback de progreso (ver progreso.py)
+        avisos: Si se indica, recibe los avisos de la lectura (tipo, mensaje) en lugar de
+                mostrarlos (ver pdf_processor._avisar)
+
+    Returns:
+        List[Dict]: Marcaciones con empleado, fecha, hora, tipo, confianza y archivo de origen
+    """
+    nombre_archivo = getattr(archivo, 'name', str(archivo))
+    if not nombre_archivo.lower().endswith(EXTENSIONES_TEXTO):
+        from pdf_processor import extraer_marcaciones_pdf
+        return extraer_marcaciones_pdf(archivo, progreso, avisos)
+
+    if hasattr(archivo, 'seek'):
+        archivo.seek(0)
+    contenido = archivo.read() if hasattr(archivo, 'read') else open(archivo, 'rb').read()
+    datos, _ = extraer_marcaciones_lineas(decodificar_texto(contenido).splitlines(), progreso=progreso)
+
+    for dato in datos:
+        dato['archivo'] = nombre_archivo
+    return datos
+
+
+# --- Normalización compartida por los formatos por columnas ---
+
+_FECHA = re.compile(r'(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})$|(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})$')
+_HORA = re.compile(r'(\d{1,2})[:.](\d{2})(?::\d{2})?$')
+
+
+@lru_cache(maxsize=4096)
+def _normalizar_fecha(texto: str) -> Optional[str]:
+    """YYYY-MM-DD a partir de YYYY-MM-DD, YYYY/MM/DD o DD/MM/YYYY (también con - o .)"""
+    encontrado = _FECHA.match(texto.strip())
+    if not encontrado:
+        return None
+    if encontrado.group(1):
+        año, mes, dia = encontrado.group(1, 2, 3)
+    else:
+        dia, mes, año = encontrado.group(4, 5, 6)
+    return f"{año}-{mes.zfill(2)}-{dia.zfill(2)}"
+
+
+@lru_cache(maxsize=4096)
+def _normalizar_hora(texto: str) -> Optional[str]:
+    """HH:MM a partir de H:MM, HH:MM:SS o HH.MM"""
+    encontrado = _HORA.match(texto.strip())
+    if not encontrado:
+        return None
+    return f"{encontrado.group(1).zfill(2)}:{encontrado.group(2)}"
+
+
+def _tipo_por_hora(hora: str) -> str:
+    """Tipo estimado cuando la exportación no lo informa (el agrupado final usa el orden del día)"""
+    return 'Entrada' if hora < '12:00' else 'Salida'
+
+
+def _marcacion(empleado: str, fecha: str, hora: str, tipo: Optional[str], linea: str) -> Dict:
+    """Marcación en el formato que devuelven todos los parsers"""
+    return {
+        "empleado": empleado,
+        "fecha": fecha,
+        "hora": hora,
+        "tipo": tipo or _tipo_por_hora(hora),
+        "linea_original": linea,
+        # Columnas explícitas: no hay ambigüedad de lectura
+        "confianza": 1.0
+    }
+
+
+# --- ZKTeco: registros de asistencia sin encabezado (attlog.dat y volcados de texto) ---
+
+# Legajo, nombre opcional, fecha y hora y, opcionalmente, modo de verificación y estado
+_LINEA_ZKTECO = re.compile(
+    r'^\s*(?P<legajo>\d+)\s+(?:(?P<nombre>[^\d\s][^\d\t]*?)\s+)?'
+    r'(?P<fecha>\d{4}[-/]\d{1,2}[-/]\d{1,2})\s+(?P<hora>\d{1,2}:\d{2}(?::\d{2})?)'
+    r'(?:\s+\d+\s+(?P<estado>\d+))?'
+)
+
+# Estado de la marcación: 0 entrada, 1 salida, 2 salida a descanso, 3 regreso, 4/5 horas extra
+_ESTADOS_ZKTECO = {"0": 'Entrada', "1": 'Salida', "2": 'Salida', "3": 'Entrada', "4": 'Entrada', "5": 'Salida'}
+
+
+def _es_zkteco(muestra: List[str]) -> bool:
+    """La mayoría de las líneas de la muestra son registros legajo + fecha y hora"""
+    coincidencias = sum(1 for linea in muestra if _LINEA_ZKTECO.match(linea))
+    return coincidencias >= 3 and coincidencias >= 0.8 * len(muestra)
+
+
+@registrar_formato("zkteco", prioridad=0, sniff=_es_zkteco)
+def _extraer_zkteco(lineas: List[str], estructura: Dict, progreso=None) -> List[Dict]:
+    """
+    Una marcación por línea. Sin nombre en la línea, el empleado es su número de legajo
+    (puede asociarse al nombre con alias_empleados.json)
+    """
+    datos = []
+    avance = crear_progreso(progreso, len(lineas), "Leyendo marcaciones")
+    for linea in lineas:
+        avance.avanzar()
+        encontrado = _LINEA_ZKTECO.match(linea)
+        if not encontrado:
+            continue
+        fecha = _normalizar_fecha(encontrado.group('fecha'))
+        hora = _normalizar_hora(encontrado.group('hora'))
+        if not fecha or not hora:
+            continue
+        empleado = (encontrado.group('nombre') or "").strip() or encontrado.group('legajo')
+        tipo = _ESTADOS_ZKTECO.get(encontrado.group('estado'))
+        datos.append(_marcacion(empleado, fecha, hora, tipo, linea.strip()))
+    return datos
+
+
+# --- CSV / TSV con encabezado (incluye las exportaciones de software de relojes) ---
+
+_DELIMITADORES = ",;\t|"
+
+# Campo -> nombres de columna reconocidos (se comparan normalizados)
+_SINONIMOS_COLUMNAS = {
+    "empleado": ["Empleado", "Nombre", "Apellido y Nombre", "Name", "Employee", "Nombre Empleado"],
+    "legajo": ["Legajo", "ID", "EnNo", "AC-No", "No. Empleado", "User ID", "Employee ID"],
+    "fecha_hora": ["Fecha y Hora", "Fecha/Hora", "FechaHora", "DateTime", "Date Time", "Marcacion", "Marcación", "Time Stamp"],
+    "fecha": ["Fecha", "Date", "Dia", "Día"],
+    "hora": ["Hora", "Time"],
+    "tipo": ["Tipo", "Estado", "Evento", "In/Out", "IOMd", "State", "Check Type", "Status"],
+}
+
+_VALORES_ENTRADA = {"entrada", "in", "check in", "checkin", "c/in", "i", "e", "0", "ingreso"}
+_VALORES_SALIDA = {"salida", "out", "check out", "checkout", "c/out", "o", "s", "1", "egreso"}
+
+
+def _clave_columna(texto: str) -> str:
+    """Nombre de columna normalizado (sin acentos, mayúsculas ni signos)"""
+    from registro_empleados import normalizar_nombre
+    return normalizar_nombre(texto)
+
+
+@lru_cache(maxsize=1)
+def _sinonimos() -> Dict[str, str]:
+    """Nombre de columna normalizado -> campo"""
+    return {
+        _clave_columna(sinonimo): campo
+        for campo, sinonimos in _SINONIMOS_COLUMNAS.items() for sinonimo in sinonimos
+    }
+
+
+def _detectar_delimitador(muestra: List[str]) -> Optional[str]:
+    """Delimitador que aparece la misma cantidad de veces (al menos una) en todas las líneas"""
+    for delimitador in _DELIMITADORES:
+        cantidades = {linea.count(delimitador) for linea in muestra}
+        if len(cantidades) == 1 and cantidades.pop() > 0:
+            return delimitador
+    return None
+
+
+def _mapear_columnas(encabezado: List[str]) -> Optional[Dict[str, int]]:
+    """
+    Campo -> posición de columna, si el encabezado identifica al empleado y a la fecha y hora
+
+    Returns:
+        Dict o None si faltan columnas imprescindibles
+    """
+    sinonimos = _sinonimos()
+    columnas = {}
+    for posicion, nombre in enumerate(encabezado):
+        campo = sinonimos.get(_clave_columna(nombre))
+        if campo and campo not in columnas:
+            columnas[campo] = posicion
+    tiene_empleado = "empleado" in columnas or "legajo" in columnas
+    tiene_momento = "fecha_hora" in columnas or ("fecha" in columnas and "hora" in columnas)
+    return columnas if tiene_empleado and tiene_momento else None
+
+
+def _es_csv(muestra: List[str]) -> bool:
+    """La muestra es una tabla delimitada con un encabezado reconocible"""
+    if len(muestra) < 2:
+        return False
+    delimitador = _detectar_delimitador(muestra[:10])
+    if delimitador is None:
+        return False
+    encabezado = next(csv.reader([muestra[0]], delimiter=delimitador))
+    return _mapear_columnas(encabezado) is not None
+
+
+@registrar_formato("csv", prioridad=1, sniff=_es_csv)
+def _extraer_csv(lineas: List[str], estructura: Dict, progreso=None) -> List[Dict]:
+    """
+    Una marcación por fila, leyendo las columnas por nombre. La columna de fecha y hora puede
+    venir junta ("2024-10-01 08:02") o separada en Fecha y Hora
+    """
+    filas = [linea for linea in lineas if linea.strip(" \f\r")]
+    if len(filas) < 2:
+        return []
+
+    delimitador = estructura.get("delimitador") or _detectar_delimitador(filas[:10])
+    if delimitador is None:
+        return []
+    lector = csv.reader(filas, delimiter=delimitador)
+    columnas = _mapear_columnas(next(lector))
+    if columnas is None:
+        return []
+    estructura.update({"delimitador": delimitador, "columnas": columnas})
+
+    col_empleado = columnas.get("empleado")
+    col_legajo = columnas.get("legajo")
+    col_fecha_hora = columnas.get("fecha_hora")
+    col_fecha = columnas.get("fecha")
+    col_hora = columnas.get("hora")
+    col_tipo = columnas.get("tipo")
+
+    def celda(fila, posicion):
+        return fila[posicion].strip() if posicion is not None and posicion < len(fila) else ""
+
+    datos = []
+    avance = crear_progreso(progreso, len(filas) - 1, "Leyendo marcaciones")
+    for linea, fila in zip(filas[1:], lector):
+        avance.avanzar()
+        empleado = celda(fila, col_empleado) or celda(fila, col_legajo)
+        if not empleado:
+            continue
+
+        if col_fecha_hora is not None:
+            partes = celda(fila, col_fecha_hora).split()
+            texto_fecha, texto_hora = (partes[0], partes[1]) if len(partes) >= 2 else ("", "")
+        else:
+            texto_fecha, texto_hora = celda(fila, col_fecha), celda(fila, col_hora)
+
+        fecha = _normalizar_fecha(texto_fecha)
+        hora = _normalizar_hora(texto_hora)
+        if not fecha or not hora:
+            continue
+
+        valor_tipo = celda(fila, col_tipo).casefold()
+        tipo = 'Entrada' if valor_tipo in _VALORES_ENTRADA else 'Salida' if valor_tipo in _VALORES_SALIDA else None
+        datos.append(_marcacion(empleado, fecha, hora, tipo, linea.strip()))
+    return datos
+
+
+# --- Texto libre: heurísticas generales (formato por defecto) ---
+
+@registrar_formato(FORMATO_GENERICO, prioridad=100, sniff=lambda muestra: True)
+def _extraer_texto_libre(lineas: List[str], estructura: Dict, progreso=None) -> List[Dict]:
+    """
+    Análisis de estructura y parser inteligente línea por línea. La estructura de un diseño
+    conocido (con sus patrones de fecha y hora) evita repetir el análisis
+    """
+    from pdf_processor import analizar_estructura_pdf, extraer_datos_segun_estructura
+
+    if not estructura:
+        estructura.update(analizar_estructura_pdf(lineas))
+    return extraer_datos_segun_estructura(lineas, estructura, progreso)
@@ -0,0 +1,70 @@
+"""
+Identificadores estables de registros
+Cada registro (empleado, fecha y marcas) recibe al ingresar un Id_Registro entero de 64 bits
+que lo acompaña en todas las etapas: filtrado, autocorrección, correcciones manuales,
+resolución de duplicados y cálculo. A diferencia del índice del DataFrame, no cambia al
+filtrar, ordenar o reconstruir el DataFrame, así las correcciones y las claves de los widgets
+siempre apuntan al mismo registro.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+COLUMNA_ID = "Id_Registro"
+
+# Campos del registro que forman su identificador (junto con el archivo de origen)
+_CAMPOS_ID = ["Empleado", "Fecha", "Entrada", "Salida"]
+
+
+def asignar_id_registro(df: pd.DataFrame, origen: str = "") -> pd.DataFrame:
+    """
+    Agrega la columna Id_Registro: huella de 64 bits del origen, del nombre normalizado del
+    empleado (registro_empleados.normalizar_nombre) y de Fecha, Entrada y Salida tal como se
+    leyeron. El nombre normalizado no depende de con qué forma se muestre al empleado, así un
+    mismo archivo recibe siempre los mismos identificadores. Los registros idénticos de un
+    mismo origen se distinguen por su número de aparición, así cada registro tiene un
+    identificador único.
+
+    Si el DataFrame ya trae Id_Registro completo (ej: período guardado), se conserva.
+
+    Args:
+        df: Registros recién leídos (Excel, PDFs o período guardado)
+        origen: Archivo(s) de origen
+
+    Returns:
+        DataFrame: df con la columna Id_Registro (int64); las demás columnas no se copian
+    """
+    import numpy as np
+    import pandas as pd
+
+    from registro_empleados import normalizar_nombre
+
+    if COLUMNA_ID in df.columns and df[COLUMNA_ID].notna().all():
+        return df
+
+    campos = pd.DataFrame({"origen": str(origen)}, index=df.index)
+    for campo in _CAMPOS_ID:
+        campos[campo] = df[campo].astype(str) if campo in df.columns else ""
+    if "Empleado" in df.columns:
+        codigos, nombres = pd.factorize(campos["Empleado"])
+        campos["Empleado"] = np.array([normalizar_nombre(nombre) for nombre in nombres] + [""], dtype=object)[codigos]
+    huella = pd.util.hash_pandas_object(campos, index=False)
+    aparicion = huella.groupby(huella.to_numpy()).cumcount()
+    ids = pd.util.hash_pandas_object(pd.DataFrame({"huella": huella, "aparicion": aparicion}), index=False)
+    return df.assign(**{COLUMNA_ID: ids.to_numpy().view(np.int64)})
+
+
+def ids_registro(df: pd.DataFrame) -> pd.Series:
+    """
+    Id_Registro de cada fila (con el índice de df)
+
+    Los DataFrames armados sin pasar por la ingesta (sin la columna) usan su índice.
+    """
+    import pandas as pd
+
+    if COLUMNA_ID in df.columns:
+        return df[COLUMNA_ID]
+    return pd.Series(df.index, index=df.index)
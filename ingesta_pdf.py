@@ -0,0 +1,152 @@
+"""
+Ingesta paralela de múltiples PDFs
+Procesa los archivos en el pool de procesos compartido (ver trabajos.pool_procesos) y entrega
+cada resultado apenas termina
+"""
+import io
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import List, Dict, Iterator, Optional, Tuple
+
+from trabajos import pool_procesos, procesos_por_trabajo
+
+
+def _extraer_marcaciones_archivo(nombre: str, contenido: bytes,
+                                 progreso=None) -> Tuple[List[Dict], Optional[str], List[Tuple[str, str]]]:
+    """
+    Extrae las marcaciones de un PDF o de una exportación de texto (.csv, .txt, .dat) a partir
+    de sus bytes (ejecutado en un proceso del pool, sin acceso a la interfaz: los avisos
+    de la lectura vuelven con el resultado)
+
+    Args:
+        nombre: Nombre del archivo (su extensión decide cómo se lee)
+        contenido: Bytes del archivo
+        progreso: Callback de progreso por página (solo en el proceso actual)
+
+    Returns:
+        Tuple: (marcaciones, mensaje_error, avisos [(tipo, mensaje)])
+    """
+    from formatos_reloj import extraer_marcaciones
+
+    archivo = io.BytesIO(contenido)
+    archivo.name = nombre
+    avisos = []
+    try:
+        return extraer_marcaciones(archivo, progreso, avisos), None, avisos
+    except Exception as e:
+        return [], str(e), avisos
+
+
+def procesar_pdfs_en_paralelo(archivos, max_procesos: Optional[int] = None,
+                              progreso=None) -> Iterator[Tuple[int, str, List[Dict], Optional[str], List]]:
+    """
+    Procesa varios PDFs en paralelo y devuelve cada resultado en orden de finalización,
+    de modo que el tiempo total depende del archivo más grande y no de la suma de todos
+
+    Args:
+        archivos: Archivos subidos (objetos con .name y .getvalue())
+        max_procesos: Archivos en proceso a la vez en el pool compartido
+                      (por defecto trabajos.procesos_por_trabajo())
+        progreso: Callback de progreso por página; solo se usa con un único archivo, que se
+                  procesa en el proceso actual (con varios, el avance es por archivo terminado)
+
+    Yields:
+        Tuple: (posicion, nombre, marcaciones, mensaje_error, avisos [(tipo, mensaje)])
+    """
+    if not archivos:
+        return
+
+    trabajos = [(posicion, archivo.name, archivo.getvalue()) for posicion, archivo in enumerate(archivos, 1)]
+
+    # Un solo archivo: evitar el costo de levantar procesos
+    if len(trabajos) == 1:
+        posicion, nombre, contenido = trabajos[0]
+        marcaciones, error, avisos = _extraer_marcaciones_archivo(nombre, contenido, progreso)
+        yield posicion, nombre, marcaciones, error, avisos
+        return
+
+    # Pool compartido por todas las sesiones: cada llamada mantiene a lo sumo 'procesos'
+    # archivos en vuelo, así un lote grande no acapara los procesos de los demás usuarios
+    pool = pool_procesos()
+    procesos = min(len(trabajos), max_procesos or procesos_por_trabajo())
+    por_enviar = iter(trabajos)
+    futuros = {}
+
+    def enviar_siguiente():
+        for posicion, nombre, contenido in por_enviar:
+            futuros[pool.submit(_extraer_marcaciones_archivo, nombre, contenido)] = (posicion, nombre)
+            return
+
+    for _ in range(procesos):
+        enviar_siguiente()
+
+    try:
+        while futuros:
+            terminados, _ = wait(futuros, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                posicion, nombre = futuros.pop(futuro)
+                enviar_siguiente()
+                try:
+                    marcaciones, error, avisos = futuro.result()
+                except Exception as e:
+                    marcaciones, error, avisos = [], str(e), []
+                yield posicion, nombre, marcaciones, error, avisos
+    finally:
+        # Si el consumidor abandona la iteración (ej: cancelación), no procesar los pendientes
+        for futuro in futuros:
+            futuro.cancel()
+
+
+def ingerir_pdfs(trabajo, archivos: List[Tuple[str, bytes]]) -> Dict:
+    """
+    Procesa y fusiona varios PDFs como trabajo en segundo plano (ver trabajos.enviar_trabajo)
+
+    Informa el progreso por archivo terminado (por página si es uno solo), con un resumen
+    parcial de lo procesado. Los archivos terminan en cualquier orden, pero se fusionan en
+    orden de carga (se retienen los que llegan antes que uno anterior), así la marcación
+    repetida que se conserva y el sentido de cada solapamiento no dependen de los tiempos.
+
+    Args:
+        trabajo: Trabajo en ejecución (para informar progreso y atender la cancelación)
+        archivos: Lista de (nombre, bytes) en orden de carga
+
+    Returns:
+        Dict: marcaciones (únicas), solapamientos, archivos (resumen por archivo en orden
+              de carga: posicion, nombre, marcaciones, error y avisos [(tipo, mensaje)] de la
+              lectura, para mostrarlos en la interfaz)
+    """
+    from pdf_processor import FusionMarcaciones
+    from progreso import Progreso
+
+    fusion = FusionMarcaciones()
+    resumen = []
+    trabajo.informar(0, f"Procesando {len(archivos)} PDF{'s' if len(archivos) > 1 else ''}...")
+    avance = Progreso(trabajo.informar, len(archivos), "PDFs procesados", intervalo=0)
+
+    subidos = []
+    for nombre, contenido in archivos:
+        archivo = io.BytesIO(contenido)
+        archivo.name = nombre
+        subidos.append(archivo)
+
+    # Terminados a la espera de que se fusionen los anteriores: posicion -> (nombre, marcaciones)
+    en_espera = {}
+    siguiente = 1
+
+    # Con un único archivo el avance es por página, informado por el propio parser
+    for posicion, nombre, marcaciones, error, avisos in procesar_pdfs_en_paralelo(subidos, progreso=trabajo.informar):
+        en_espera[posicion] = (nombre, marcaciones)
+        while siguiente in en_espera:
+            nombre_siguiente, marcaciones_siguiente = en_espera.pop(siguiente)
+            if marcaciones_siguiente:
+                fusion.agregar(nombre_siguiente, marcaciones_siguiente)
+            siguiente += 1
+        resumen.append({"posicion": posicion, "nombre": nombre, "marcaciones": len(marcaciones), "error": error,
+                        "avisos": avisos})
+        trabajo.parcial = {"archivos": list(resumen), "marcaciones_unicas": len(fusion.marcaciones)}
+        avance.avanzar()
+
+    return {
+        "marcaciones": fusion.marcaciones,
+        "solapamientos": fusion.solapamientos,
+        "archivos": sorted(resumen, key=lambda r: r["posicion"])
+    }
@@ -202,3 +202,53 @@ def get_progress_html(porcentaje, texto="Procesando"):
         </div>
     </div>
     """
+
+def mostrar_progreso_trabajo(trabajo):
+    """
+    Muestra el progreso de un trabajo en segundo plano (ver trabajos.py): barra con
+    porcentaje y etapa actual, y el resumen parcial por archivo
+    
+    Args:
+        trabajo: Trabajo activo
+    
+    Returns:
+        bool: True si el usuario pidió cancelar el trabajo
+    """
+    import pandas as pd
+    
+    st.markdown(get_progress_html(trabajo.progreso, trabajo.mensaje), unsafe_allow_html=True)
+    
+    parcial = trabajo.parcial or {}
+    if parcial.get("archivos"):
+        st.caption(f"Marcaciones únicas hasta ahora: {parcial.get('marcaciones_unicas', 0)}")
+        st.dataframe(
+            pd.DataFrame(parcial["archivos"]).rename(columns={
+                "posicion": "N°", "nombre": "Archivo", "marcaciones": "Marcaciones", "error": "Error"
+            }),
+            hide_index=True
+        )
+    
+    return st.button("Cancelar procesamiento", key=f"cancelar_{trabajo.id}")
+
+# Segundos entre consultas al progreso de un trabajo en segundo plano
+INTERVALO_CONSULTA_TRABAJO = 0.5
+
+@st.fragment(run_every=INTERVALO_CONSULTA_TRABAJO)
+def seguir_trabajo(trabajo_id):
+    """
+    Muestra el progreso de un trabajo en segundo plano (ver trabajos.py). Es un fragmento
+    que se redibuja solo cada INTERVALO_CONSULTA_TRABAJO segundos, sin recargar la página
+    ni bloquear la sesión; cuando el trabajo termina (o se cancela) recarga la página para
+    mostrar su resultado
+    
+    Args:
+        trabajo_id: Identificador del trabajo activo
+    """
+    from trabajos import obtener_trabajo, cancelar_trabajo
+    
+    trabajo = obtener_trabajo(trabajo_id)
+    if trabajo is None or not trabajo.activo:
+        st.rerun()
+    if mostrar_progreso_trabajo(trabajo):
+        cancelar_trabajo(trabajo.id)
+        st.rerun()
@@ -3,25 +3,20 @@ Aplicación principal para cálculo de sueldos
 Versión modularizada para mejor organización del código
 """
 import streamlit as st
-import pandas as pd
 from ui_components import (
     mostrar_descarga_plantilla, 
     mostrar_input_valor_hora, 
     configurar_feriados, 
-    mostrar_subida_archivo
-)
-from data_processor import (
-    validar_archivo_excel, 
-    procesar_datos_excel, 
-    mostrar_resultados
+    mostrar_subida_archivo,
+    mostrar_periodos_guardados
 )
 from loading_components import (
     mostrar_loading_excel,
-    mostrar_loading_pdf,
-    mostrar_loading_calculos,
     mostrar_loading_validacion,
-    loading_context
+    seguir_trabajo
 )
+# pandas, data_processor y los lectores de PDF/Excel se importan recién cuando se sube un
+# archivo: la página inicial se dibuja sin esperarlos (ver benchmark_arranque.py)
 
 def _limpiar_session_state_correcciones():
     """
@@ -32,14 +27,39 @@ def _limpiar_session_state_correcciones():
         if key in st.session_state:
             del st.session_state[key]
 
+def _boton_guardar_periodo(df_marcaciones, resultados, valor_por_hora, dias_feriados, nombre, origen, key):
+    """
+    Guarda el período calculado en el almacén local (para reabrirlo o recalcularlo) y
+    alimenta los perfiles históricos de horario, solo cuando el usuario lo confirma
+    (no en cada recarga de la página)
+    """
+    if not st.button("💾 Guardar período", key=key):
+        return
+
+    from almacen_periodos import guardar_periodo
+    from perfiles_empleados import registrar_periodo_procesado
+    import sqlite3
+    try:
+        guardar_periodo(df_marcaciones, resultados, valor_por_hora, dias_feriados, nombre)
+    except (sqlite3.Error, OSError) as e:
+        st.warning(f" No se pudo guardar el período en el almacén local: {str(e)}")
+        return
+    registrar_periodo_procesado(df_marcaciones, origen)
+    st.success("✅ Período guardado")
+
+@st.cache_resource(show_spinner=False)
+def _leer_css():
+    """Lee styles.css una sola vez por proceso (no en cada recarga del script)"""
+    import os
+    css_path = os.path.join(os.path.dirname(__file__), "styles.css")
+    with open(css_path, encoding='utf-8') as f:
+        return f"<style>{f.read()}</style>"
+
 # Función para cargar CSS
 def load_css():
     """Carga los estilos CSS personalizados"""
-    import os
     try:
-        css_path = os.path.join(os.path.dirname(__file__), "styles.css")
-        with open(css_path, encoding='utf-8') as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+        st.markdown(_leer_css(), unsafe_allow_html=True)
     except FileNotFoundError:
         st.warning(" Archivo de estilos no encontrado. Usando estilos por defecto.")
     except UnicodeDecodeError:
@@ -130,6 +150,9 @@ st.markdown('</div>', unsafe_allow_html=True)
 
 # Procesamiento de datos
 if uploaded_file:
+    import pandas as pd
+    from data_processor import validar_archivo_excel, calcular_periodo, mostrar_resultados
+    
     st.markdown('<div class="section-card fade-in-up">', unsafe_allow_html=True)
     st.markdown('<div class="section-header"> Procesamiento de Datos</div>', unsafe_allow_html=True)
     
@@ -141,7 +164,16 @@ if uploaded_file:
             mostrar_loading_excel()
         
         try:
+            from identificadores import asignar_id_registro
+            
+            from registro_empleados import obtener_registro
+            
             df = pd.read_excel(uploaded_file)
+            # Un mismo empleado escrito de distintas formas se unifica con su nombre canónico
+            if 'Empleado' in df.columns:
+                df = obtener_registro().unificar(df)
+            # Identificador estable de cada registro para correcciones y claves de la interfaz
+            df = asignar_id_registro(df, getattr(uploaded_file, 'name', ''))
             loading_placeholder.empty()  # Limpiar loading
             
             # Mostrar loading de validación
@@ -158,10 +190,12 @@ if uploaded_file:
                 # NUEVA FUNCIONALIDAD: Detectar y corregir registros incompletos en Excel
                 from pdf_processor import detectar_registros_incompletos, filtrar_registros_sin_asistencia, detectar_horarios_ambiguos
                 from ui_components import (
+                    mostrar_autocorreccion_registros,
                     mostrar_editor_registros_incompletos, 
                     aplicar_correcciones_a_dataframe,
                     mostrar_editor_horarios_ambiguos,
-                    aplicar_correcciones_ambiguos_a_dataframe
+                    aplicar_correcciones_ambiguos_a_dataframe,
+                    mostrar_anomalias
                 )
                 
                 # Primero, filtrar registros sin asistencia (sin entrada ni salida = no trabajó)
@@ -182,6 +216,9 @@ if uploaded_file:
                 # Ahora detectar registros que necesitan corrección (falta solo entrada o solo salida)
                 df_incompletos_excel = detectar_registros_incompletos(df_con_asistencia)
                 
+                # Autocompletar en bloque con reglas; solo las excepciones pasan al editor manual
+                df_con_asistencia, df_incompletos_excel = mostrar_autocorreccion_registros(df_con_asistencia, df_incompletos_excel)
+                
                 if not df_incompletos_excel.empty:
                     # Mostrar interfaz de corrección
                     correcciones_aplicadas_excel = mostrar_editor_registros_incompletos(df_incompletos_excel)
@@ -219,24 +256,28 @@ if uploaded_file:
                         df = aplicar_correcciones_ambiguos_a_dataframe(df, df_ambiguos_excel)
                         st.success(f"✅ Se corrigieron {len(df_ambiguos_excel)} registro(s) con horarios ambiguos")
                 
-                # Mostrar loading de cálculos
-                calc_placeholder = st.empty()
-                with calc_placeholder:
-                    mostrar_loading_calculos()
-
-                resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales = procesar_datos_excel(
-                    df, valor_por_hora, opcion_feriados, dias_feriados, cantidad_feriados
-                )
-                calc_placeholder.empty()  # Limpiar loading de cálculos
+                # Anomalías del período (informativo, no detiene el cálculo)
+                mostrar_anomalias(df)
                 
-                mostrar_resultados(resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales, valor_por_hora, dias_feriados)
+                # Cálculo en segundo plano con barra de progreso real
+                salida_calculo = calcular_periodo(df, valor_por_hora, dias_feriados, "trabajo_calculo_excel")
+                if salida_calculo is not None:
+                    resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales = salida_calculo
+                    mostrar_resultados(resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales, valor_por_hora, dias_feriados)
+                    _boton_guardar_periodo(df, resultados, valor_por_hora, dias_feriados, getattr(uploaded_file, 'name', None),
+                                           getattr(uploaded_file, 'name', ''), "guardar_periodo_excel")
         except Exception as e:
             loading_placeholder.empty()
             st.error(f" Error al procesar el archivo: {str(e)}")
     
     elif tipo_archivo == "pdf":
         # Procesamiento inteligente de PDF (soporta múltiples archivos)
-        from pdf_processor import procesar_pdf_a_dataframe, validar_datos_pdf
+        from pdf_processor import marcaciones_a_dataframe, validar_datos_pdf
+        from ingesta_pdf import ingerir_pdfs
+        from trabajos import (
+            enviar_trabajo, obtener_trabajo, cancelar_trabajo, reiniciar_trabajo, clave_entrada,
+            CANCELADO, ERROR
+        )
         
         # Verificar si uploaded_file es una lista (múltiples archivos) o un solo archivo
         archivos_pdf = uploaded_file if isinstance(uploaded_file, list) else [uploaded_file] if uploaded_file else []
@@ -244,55 +285,93 @@ if uploaded_file:
         if not archivos_pdf:
             st.markdown('<div class="custom-alert alert-warning"> No se han cargado archivos PDF.</div>', unsafe_allow_html=True)
         else:
-            # Mostrar loading de PDFs
-            pdf_loading_placeholder = st.empty()
-            with pdf_loading_placeholder:
-                mostrar_loading_pdf(len(archivos_pdf))
+            # La lectura de los PDFs corre como trabajo en segundo plano: su progreso se
+            # actualiza solo (seguir_trabajo) y puede cancelarse sin bloquear la sesión
+            contenidos_pdf = [(archivo.name, archivo.getvalue()) for archivo in archivos_pdf]
+            clave_pdfs = clave_entrada(*[parte for par in contenidos_pdf for parte in par])
             
-            # Lista para almacenar todos los DataFrames y nombres de archivos
-            dataframes_list = []
-            nombres_archivos_pdf = []
+            trabajo_pdf = obtener_trabajo(st.session_state.get('trabajo_pdf'))
+            if trabajo_pdf is None or trabajo_pdf.clave != clave_pdfs:
+                # Archivos distintos: el trabajo anterior de esta sesión ya no sirve
+                cancelar_trabajo(st.session_state.get('trabajo_pdf'))
+                trabajo_pdf = enviar_trabajo(
+                    ingerir_pdfs, contenidos_pdf, clave=clave_pdfs,
+                    descripcion=f"{len(archivos_pdf)} PDF{'s' if len(archivos_pdf) > 1 else ''}"
+                )
+                st.session_state.trabajo_pdf = trabajo_pdf.id
             
-            # Procesar cada PDF
-            for idx, archivo_pdf in enumerate(archivos_pdf, 1):
-                # Mostrar progreso de procesamiento para cada PDF
-                pdf_process_placeholder = st.empty()
-                with pdf_process_placeholder:
-                    mostrar_loading_pdf(1)
-                
-                df_temp = procesar_pdf_a_dataframe(archivo_pdf)
-                pdf_process_placeholder.empty()  # Limpiar loading de PDF
+            if trabajo_pdf.activo:
+                seguir_trabajo(trabajo_pdf.id)
+                st.stop()
+            
+            if trabajo_pdf.estado in (CANCELADO, ERROR):
+                if trabajo_pdf.estado == CANCELADO:
+                    st.markdown('<div class="custom-alert alert-warning">⏹️ Procesamiento de PDFs cancelado.</div>', unsafe_allow_html=True)
+                else:
+                    st.error(f" Error procesando los PDFs: {trabajo_pdf.error}")
+                if st.button("Reiniciar procesamiento", key="reiniciar_trabajo_pdf"):
+                    st.session_state.trabajo_pdf = reiniciar_trabajo(trabajo_pdf.id).id
+                    st.rerun()
+                st.stop()
+            
+            resultado_pdf = trabajo_pdf.resultado
+            nombres_archivos_pdf = []
+            for archivo in resultado_pdf["archivos"]:
+                idx, nombre_pdf = archivo["posicion"], archivo["nombre"]
+                if archivo["error"]:
+                    st.error(f" Error procesando PDF {idx} ({nombre_pdf}): {archivo['error']}")
+                # Avisos de la lectura (OCR, texto ilegible): se generaron fuera de la interfaz
+                for tipo, mensaje in archivo["avisos"]:
+                    getattr(st, tipo)(f"PDF {idx} ({nombre_pdf}):{mensaje}")
                 
-                if df_temp.empty:
-                    st.warning(f" No se pudieron extraer datos del PDF {idx}: {archivo_pdf.name}")
+                if not archivo["marcaciones"]:
+                    st.warning(f" No se pudieron extraer datos del PDF {idx}: {nombre_pdf}")
                 else:
-                    # Validar datos extraídos
-                    validation_pdf_placeholder = st.empty()
-                    with validation_pdf_placeholder:
-                        mostrar_loading_validacion(f"Validando PDF {idx}...")
-                    
-                    es_valido, errores = validar_datos_pdf(df_temp)
-                    validation_pdf_placeholder.empty()
-                    
-                    if not es_valido:
-                        st.warning(f"Errores en PDF {idx} ({archivo_pdf.name}):")
-                        for error in errores:
-                            st.markdown(f'<div class="custom-alert alert-warning">• {error}</div>', unsafe_allow_html=True)
-                    else:
-                        st.success(f"✅ PDF {idx} procesado: {archivo_pdf.name} ({len(df_temp)} registros)")
-                        dataframes_list.append(df_temp)
-                        nombres_archivos_pdf.append(archivo_pdf.name)
+                    st.success(f"✅ PDF {idx} procesado: {nombre_pdf} ({archivo['marcaciones']} marcaciones)")
+                    nombres_archivos_pdf.append(nombre_pdf)
+            
+            marcaciones_unicas, solapamientos = resultado_pdf["marcaciones"], resultado_pdf["solapamientos"]
+            
+            if solapamientos:
+                detalle_solapamientos = "<br>".join(
+                    f"• {s['archivo']} repite {s['marcaciones']} marcación(es) de {s['archivo_original']} ({s['desde']} a {s['hasta']})"
+                    for s in solapamientos
+                )
+                st.markdown(f"""
+                <div class="custom-alert alert-info">
+                    🔁 <strong>Períodos superpuestos detectados</strong><br>
+                    Las marcaciones repetidas se contaron una sola vez.<br>
+                    {detalle_solapamientos}
+                </div>
+                """, unsafe_allow_html=True)
+            
+            df_combinado = marcaciones_a_dataframe(marcaciones_unicas)
+            if not df_combinado.empty:
+                # Nombres ya unificados al fusionar los PDFs: agregar su Id_Empleado y el
+                # identificador estable de cada registro
+                from identificadores import asignar_id_registro
+                from registro_empleados import obtener_registro
+                df_combinado = obtener_registro().unificar(df_combinado)
+                df_combinado = asignar_id_registro(df_combinado, ", ".join(nombres_archivos_pdf))
             
-            # Limpiar loading de PDFs
-            pdf_loading_placeholder.empty()
+            # Validar datos combinados
+            if not df_combinado.empty:
+                validation_pdf_placeholder = st.empty()
+                with validation_pdf_placeholder:
+                    mostrar_loading_validacion("Validando datos de los PDFs...")
+                
+                es_valido, errores = validar_datos_pdf(df_combinado)
+                validation_pdf_placeholder.empty()
+                
+                if not es_valido:
+                    st.warning("Errores en los datos extraídos de los PDFs:")
+                    for error in errores:
+                        st.markdown(f'<div class="custom-alert alert-warning">• {error}</div>', unsafe_allow_html=True)
+                    df_combinado = pd.DataFrame()
             
-            # Combinar todos los DataFrames
-            if not dataframes_list:
+            if df_combinado.empty:
                 st.markdown('<div class="custom-alert alert-error">No se pudieron extraer datos de ningún PDF. Verifica que los archivos contengan información de asistencia.</div>', unsafe_allow_html=True)
             else:
-                # Concatenar todos los DataFrames
-                df_combinado = pd.concat(dataframes_list, ignore_index=True)
-                
                 # Asegurar que las fechas estén en formato datetime
                 df_combinado['Fecha'] = pd.to_datetime(df_combinado['Fecha'], errors='coerce')
                 
@@ -316,10 +395,12 @@ if uploaded_file:
                 # NUEVA FUNCIONALIDAD: Detectar y corregir registros incompletos
                 from pdf_processor import detectar_registros_incompletos, filtrar_registros_sin_asistencia, detectar_horarios_ambiguos
                 from ui_components import (
+                    mostrar_autocorreccion_registros,
                     mostrar_editor_registros_incompletos, 
                     aplicar_correcciones_a_dataframe,
                     mostrar_editor_horarios_ambiguos,
-                    aplicar_correcciones_ambiguos_a_dataframe
+                    aplicar_correcciones_ambiguos_a_dataframe,
+                    mostrar_anomalias
                 )
                 
                 # Primero, filtrar registros sin asistencia (sin entrada ni salida = no trabajó)
@@ -340,6 +421,9 @@ if uploaded_file:
                 # Ahora detectar registros que necesitan corrección (falta solo entrada o solo salida)
                 df_incompletos = detectar_registros_incompletos(df_con_asistencia)
                 
+                # Autocompletar en bloque con reglas; solo las excepciones pasan al editor manual
+                df_con_asistencia, df_incompletos = mostrar_autocorreccion_registros(df_con_asistencia, df_incompletos)
+                
                 if not df_incompletos.empty:
                     # Mostrar interfaz de corrección
                     correcciones_aplicadas = mostrar_editor_registros_incompletos(df_incompletos)
@@ -377,29 +461,35 @@ if uploaded_file:
                         df_combinado = aplicar_correcciones_ambiguos_a_dataframe(df_combinado, df_ambiguos_pdf)
                         st.success(f"✅ Se corrigieron {len(df_ambiguos_pdf)} registro(s) con horarios ambiguos")
                 
-                # Procesar con la lógica existente
-                calc_pdf_placeholder = st.empty()
-                with calc_pdf_placeholder:
-                    mostrar_loading_calculos()
-
-                resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales = procesar_datos_excel(
-                    df_combinado, valor_por_hora, opcion_feriados, dias_feriados, cantidad_feriados
-                )
-                calc_pdf_placeholder.empty()  # Limpiar loading
-                
-                # Generar nombre para el archivo Excel (usar el primer PDF o combinar nombres)
-                if len(nombres_archivos_pdf) == 1:
-                    nombre_excel = nombres_archivos_pdf[0]
-                elif len(nombres_archivos_pdf) > 1:
-                    # Si hay múltiples PDFs, usar un nombre combinado
-                    nombre_excel = f"combinado_{len(nombres_archivos_pdf)}_pdfs"
-                else:
-                    nombre_excel = None
+                # Anomalías del período (informativo, no detiene el cálculo)
+                mostrar_anomalias(df_combinado)
                 
-                mostrar_resultados(resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales, valor_por_hora, dias_feriados, nombre_excel)
+                # Procesar con la lógica existente, en segundo plano
+                salida_calculo = calcular_periodo(df_combinado, valor_por_hora, dias_feriados, "trabajo_calculo_pdf")
+                if salida_calculo is not None:
+                    resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales = salida_calculo
+                    
+                    # Generar nombre para el archivo Excel (usar el primer PDF o combinar nombres)
+                    if len(nombres_archivos_pdf) == 1:
+                        nombre_excel = nombres_archivos_pdf[0]
+                    elif len(nombres_archivos_pdf) > 1:
+                        # Si hay múltiples PDFs, usar un nombre combinado
+                        nombre_excel = f"combinado_{len(nombres_archivos_pdf)}_pdfs"
+                    else:
+                        nombre_excel = None
+                    
+                    mostrar_resultados(resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales, valor_por_hora, dias_feriados, nombre_excel)
+                    _boton_guardar_periodo(df_combinado, resultados, valor_por_hora, dias_feriados, nombre_excel,
+                                           "+".join(sorted(nombres_archivos_pdf)), "guardar_periodo_pdf")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# Períodos guardados en el almacén local
+st.markdown('<div class="section-card fade-in-up">', unsafe_allow_html=True)
+st.markdown('<div class="section-header">🗄️ Períodos Guardados</div>', unsafe_allow_html=True)
+mostrar_periodos_guardados(valor_por_hora, dias_feriados)
+st.markdown('</div>', unsafe_allow_html=True)
+
 # Botón para salir de la app
 st.markdown("---")
 st.markdown('<div class="section-card fade-in-up">', unsafe_allow_html=True)
@@ -0,0 +1,104 @@
+"""
+OCR opcional para páginas escaneadas
+Usa el binario local de Tesseract solo en las páginas sin texto extraíble y guarda el
+resultado en caché por hash de la imagen de la página
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+from typing import List, Optional
+
+DIRECTORIO_CACHE_OCR = os.path.join(os.path.dirname(__file__), ".cache_ocr")
+
+# Idioma de Tesseract (requiere el paquete de idioma instalado; "eng" como alternativa)
+IDIOMA_OCR = os.environ.get("OCR_IDIOMA", "spa")
+
+# Resolución de renderizado de las páginas escaneadas
+RESOLUCION_OCR = 300
+
+
+def ruta_tesseract() -> Optional[str]:
+    """
+    Ubica el binario de Tesseract (variable TESSERACT_CMD o PATH)
+
+    Returns:
+        str: Ruta del ejecutable, o None si no está instalado
+    """
+    return os.environ.get("TESSERACT_CMD") or shutil.which("tesseract")
+
+
+def _ocr_imagen(imagen_png: bytes, binario: str, idioma: str) -> str:
+    """
+    Ejecuta Tesseract sobre una imagen PNG
+
+    Returns:
+        str: Texto reconocido ("" si falla)
+    """
+    try:
+        resultado = subprocess.run(
+            [binario, "stdin", "stdout", "-l", idioma, "--psm", "6"],
+            input=imagen_png,
+            capture_output=True,
+            timeout=120
+        )
+        return resultado.stdout.decode("utf-8", errors="ignore")
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def ocr_imagenes(imagenes_png: List[bytes]) -> Optional[List[str]]:
+    """
+    Reconoce el texto de varias imágenes de página, reutilizando la caché en disco
+
+    Las páginas se reconocen una tras otra: esto corre dentro de un proceso del pool
+    compartido (ver trabajos.py), que ya reparte los archivos entre los núcleos, y abrir
+    otro pool aquí solo agregaría procesos compitiendo por los mismos núcleos.
+
+    Args:
+        imagenes_png: Imágenes PNG de las páginas escaneadas
+
+    Returns:
+        List[str]: Texto de cada imagen en el mismo orden, o None si Tesseract no está disponible
+    """
+    binario = ruta_tesseract()
+    if not binario:
+        return None
+
+    os.makedirs(DIRECTORIO_CACHE_OCR, exist_ok=True)
+
+    textos: List[str] = []
+    for imagen in imagenes_png:
+        ruta_cache = os.path.join(DIRECTORIO_CACHE_OCR, f"{hashlib.sha256(imagen).hexdigest()}_{IDIOMA_OCR}.txt")
+        if os.path.exists(ruta_cache):
+            with open(ruta_cache, encoding="utf-8") as f:
+                textos.append(f.read())
+            continue
+
+        texto = _ocr_imagen(imagen, binario, IDIOMA_OCR)
+        textos.append(texto)
+        if texto:
+            try:
+                with open(ruta_cache, "w", encoding="utf-8") as f:
+                    f.write(texto)
+            except OSError:
+                pass
+
+    return textos
+
+
+def renderizar_pagina_png(pagina) -> bytes:
+    """
+    Renderiza una página de pdfplumber como PNG para OCR
+
+    Args:
+        pagina: Página de pdfplumber
+
+    Returns:
+        bytes: Imagen PNG de la página
+    """
+    import io
+
+    buffer = io.BytesIO()
+    pagina.to_image(resolution=RESOLUCION_OCR).original.save(buffer, format="PNG")
+    return buffer.getvalue()
@@ -0,0 +1,147 @@
+"""
+Registro de backends de extracción de texto PDF
+Elige el backend preferido instalado y falla de forma explícita si no hay ninguno
+
+pdfplumber es el predeterminado: las heurísticas de texto (patrones de estructura, nombres,
+entrada/salida) se ajustaron sobre su salida. pypdfium2 es más rápido pero ordena y separa el
+texto de otra forma, así que se usa solo si se pide con PDF_BACKEND=pypdfium2 o si es el único
+instalado (ver benchmark_pdf.py para comparar)
+"""
+import os
+from typing import Callable, Dict, List, Optional
+
+from progreso import CallbackProgreso, crear_progreso
+
+
+class BackendPDFNoDisponible(RuntimeError):
+    """No hay ningún backend de lectura de PDF instalado"""
+
+
+# nombre -> {"prioridad": int, "modulo": str, "extraer": función(archivo, progreso) -> List[str]}
+_BACKENDS: Dict[str, Dict] = {}
+
+
+def registrar_backend(nombre: str, prioridad: int, modulo: str):
+    """
+    Decorador para registrar un backend de extracción de texto por página
+
+    Args:
+        nombre: Identificador del backend
+        prioridad: Menor = se prefiere primero
+        modulo: Módulo que debe poder importarse para que el backend esté disponible
+    """
+    def decorador(funcion: Callable) -> Callable:
+        _BACKENDS[nombre] = {"prioridad": prioridad, "modulo": modulo, "extraer": funcion}
+        return funcion
+    return decorador
+
+
+def _disponible(nombre: str) -> bool:
+    """Indica si el módulo del backend puede importarse"""
+    import importlib.util
+    return importlib.util.find_spec(_BACKENDS[nombre]["modulo"]) is not None
+
+
+def backends_disponibles() -> List[str]:
+    """
+    Backends instalados, del preferido al menos preferido
+
+    Returns:
+        List[str]: Nombres de backends disponibles
+    """
+    return [
+        nombre for nombre in sorted(_BACKENDS, key=lambda n: _BACKENDS[n]["prioridad"])
+        if _disponible(nombre)
+    ]
+
+
+def elegir_backend(preferido: Optional[str] = None) -> str:
+    """
+    Elige el backend a usar: el indicado (o la variable PDF_BACKEND) si está instalado,
+    si no el de mayor prioridad disponible (pdfplumber)
+
+    Raises:
+        BackendPDFNoDisponible: Si no hay ningún backend instalado
+    """
+    preferido = preferido or os.environ.get("PDF_BACKEND")
+    disponibles = backends_disponibles()
+    if not disponibles:
+        raise BackendPDFNoDisponible(
+            "No hay ninguna librería para leer PDFs instalada. Instala pdfplumber, pypdfium2 o PyPDF2 "
+            "(pip install -r requirements.txt)."
+        )
+    if preferido in disponibles:
+        return preferido
+    return disponibles[0]
+
+
+def extraer_paginas_texto(archivo_pdf, backend: Optional[str] = None,
+                          progreso: Optional[CallbackProgreso] = None) -> List[str]:
+    """
+    Extrae el texto de cada página con el backend elegido
+
+    Args:
+        archivo_pdf: Ruta o archivo PDF (objeto con read/seek)
+        backend: Backend a usar (por defecto el preferido disponible)
+        progreso: Callback de progreso por página (ver progreso.py)
+
+    Returns:
+        List[str]: Texto de cada página ("" para páginas sin texto)
+
+    Raises:
+        BackendPDFNoDisponible: Si no hay ningún backend instalado
+    """
+    nombre = elegir_backend(backend)
+    if hasattr(archivo_pdf, 'seek'):
+        archivo_pdf.seek(0)
+    try:
+        return _BACKENDS[nombre]["extraer"](archivo_pdf, progreso)
+    finally:
+        if hasattr(archivo_pdf, 'seek'):
+            archivo_pdf.seek(0)
+
+
+def _textos_con_progreso(paginas, progreso) -> List[str]:
+    """Texto de cada página (objetos con extract_text), informando el avance por página"""
+    avance = crear_progreso(progreso, len(paginas), "Leyendo páginas")
+    textos = []
+    for pagina in paginas:
+        textos.append(pagina.extract_text() or "")
+        avance.avanzar()
+    return textos
+
+
+@registrar_backend("pypdfium2", prioridad=2, modulo="pypdfium2")
+def _extraer_pypdfium2(archivo_pdf, progreso=None) -> List[str]:
+    import pypdfium2
+
+    fuente = archivo_pdf.read() if hasattr(archivo_pdf, 'read') else archivo_pdf
+    documento = pypdfium2.PdfDocument(fuente)
+    try:
+        avance = crear_progreso(progreso, len(documento), "Leyendo páginas")
+        textos = []
+        for pagina in documento:
+            pagina_texto = pagina.get_textpage()
+            textos.append(pagina_texto.get_text_range().replace('\r\n', '\n').replace('\r', '\n'))
+            pagina_texto.close()
+            pagina.close()
+            avance.avanzar()
+        return textos
+    finally:
+        documento.close()
+
+
+@registrar_backend("PyPDF2", prioridad=1, modulo="PyPDF2")
+def _extraer_pypdf2(archivo_pdf, progreso=None) -> List[str]:
+    from PyPDF2 import PdfReader
+
+    lector = PdfReader(archivo_pdf)
+    return _textos_con_progreso(lector.pages, progreso)
+
+
+@registrar_backend("pdfplumber", prioridad=0, modulo="pdfplumber")
+def _extraer_pdfplumber(archivo_pdf, progreso=None) -> List[str]:
+    import pdfplumber
+
+    with pdfplumber.open(archivo_pdf) as pdf:
+        return _textos_con_progreso(pdf.pages, progreso)
@@ -2,11 +2,23 @@
 Módulo para procesamiento inteligente de PDFs
 Convierte PDFs con formatos diversos a estructura estándar para cálculo de sueldos
 """
+import math
 import pandas as pd
 import re
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Optional
 import streamlit as st
+from progreso import crear_progreso, subrango
+
+def _avisar(avisos: Optional[List[Tuple[str, str]]], tipo: str, mensaje: str):
+    """
+    Informa un aviso de la lectura: en la interfaz, o como (tipo, mensaje) en 'avisos' si la
+    lectura corre en un trabajo o en un proceso del pool, donde Streamlit no puede mostrarlo
+    """
+    if avisos is not None:
+        avisos.append((tipo, mensaje))
+    else:
+        getattr(st, tipo)(mensaje)
 
 def procesar_pdf_a_dataframe(archivo_pdf) -> pd.DataFrame:
     """
@@ -19,83 +31,329 @@ def procesar_pdf_a_dataframe(archivo_pdf) -> pd.DataFrame:
         DataFrame: Datos procesados en formato estándar
     """
     try:
-        # Aquí necesitaremos una librería como PyPDF2 o pdfplumber
-        # Por ahora simulo la extracción
-        texto_pdf = extraer_texto_pdf(archivo_pdf)
+        marcaciones = extraer_marcaciones_pdf(archivo_pdf)
+        return marcaciones_a_dataframe(marcaciones)
+        
+    except Exception as e:
+        st.error(f" Error procesando PDF: {str(e)}")
+        return pd.DataFrame()
+
+def extraer_marcaciones_pdf(archivo_pdf, progreso=None, avisos=None) -> List[Dict]:
+    """
+    Extrae las marcaciones individuales (sin agrupar) de un PDF
+    
+    Args:
+        archivo_pdf: Archivo PDF subido
+        progreso: Callback de progreso por página/línea (ver progreso.py)
+        avisos: Si se indica, recibe los avisos (tipo, mensaje) en lugar de mostrarlos
+        
+    Returns:
+        List[Dict]: Marcaciones con empleado, fecha, hora, tipo, confianza y archivo de origen
+    """
+    from cache_disenos import guardar_plan
+    from formatos_reloj import extraer_marcaciones_lineas
+    
+    # Exportaciones tabulares: mapear celdas a columnas por geometría, sin heurísticas de texto.
+    # Si el diseño del reporte ya es conocido, se usa directamente su plan guardado.
+    datos_brutos, huella, plan = extraer_marcaciones_tabulares_pdf(archivo_pdf, progreso)
+    
+    if datos_brutos is None:
+        # Lectura de páginas hasta el 80 %, análisis de líneas el resto
+        texto_pdf = extraer_texto_pdf(archivo_pdf, subrango(progreso, 0, 80), avisos)
         lineas = texto_pdf.split('\n')
         
-        # Identificar estructura del PDF
-        estructura = analizar_estructura_pdf(lineas)
+        # Diseño conocido: su formato y estructura se usan sin volver a detectarlos.
+        # Si no, el registro de formatos elige el parser (ver formatos_reloj.py)
+        plan_texto = plan if plan and plan.get("modo") == "texto" else None
+        datos_brutos, plan_nuevo = extraer_marcaciones_lineas(lineas, plan_texto, subrango(progreso, 80, 100))
         
-        # Extraer datos según la estructura identificada
-        datos_brutos = extraer_datos_segun_estructura(lineas, estructura)
+        # Diseño nuevo, o plan ampliado con patrones que el guardado no cubría
+        if datos_brutos and plan_nuevo != plan_texto:
+            guardar_plan(huella, plan_nuevo)
+    
+    nombre_archivo = getattr(archivo_pdf, 'name', str(archivo_pdf))
+    for dato in datos_brutos:
+        dato['archivo'] = nombre_archivo
+    
+    return datos_brutos
+
+def marcaciones_a_dataframe(marcaciones: List[Dict], avisos=None) -> pd.DataFrame:
+    """
+    Agrupa marcaciones individuales por empleado y fecha y las convierte al formato estándar
+    
+    Args:
+        marcaciones: Marcaciones individuales (de uno o varios archivos)
+        avisos: Si se indica, recibe los avisos (tipo, mensaje) en lugar de mostrarlos
         
-        # Procesar datos inteligentemente
-        datos_procesados = procesar_datos_inteligente(datos_brutos)
+    Returns:
+        DataFrame: Datos procesados en formato estándar
+    """
+    # Procesar datos inteligentemente
+    datos_procesados = procesar_datos_inteligente(marcaciones, avisos)
+    
+    # Convertir a DataFrame estándar
+    return convertir_a_dataframe_estandar(datos_procesados)
+
+class FusionMarcaciones:
+    """
+    Une marcaciones de varios archivos a medida que llegan, eliminando las repetidas entre ellos.
+    
+    Usa un índice hash sobre (clave del empleado, fecha, hora): cada marcación se revisa una sola
+    vez, por lo que el costo es lineal en el total de marcaciones. Se conserva la primera aparición.
+    El empleado se identifica con el registro de empleados, así "PEREZ JUAN" en un archivo y
+    "Juan Pérez" en otro son la misma persona; cada marcación queda con el nombre canónico
+    (el del alias, o la primera forma en que aparece en los archivos agregados).
+    """
+    
+    def __init__(self, registro=None):
+        """
+        Args:
+            registro: RegistroEmpleados (por defecto el del proceso, ver registro_empleados.py)
+        """
+        from registro_empleados import obtener_registro
         
-        # Convertir a DataFrame estándar
-        df_final = convertir_a_dataframe_estandar(datos_procesados)
+        self._registro = registro or obtener_registro()
+        self._vistas = {}
+        self._nombres = {}
+        self._solapamientos = {}
+        self.marcaciones = []
+    
+    def agregar(self, nombre_archivo: str, marcaciones: List[Dict]):
+        """
+        Incorpora las marcaciones de un archivo
         
-        return df_final
+        Args:
+            nombre_archivo: Nombre del archivo de origen
+            marcaciones: Marcaciones individuales extraídas del archivo
+        """
+        for marcacion in marcaciones:
+            clave = (self._registro.clave(marcacion['empleado']), marcacion['fecha'], marcacion['hora'])
+            marcacion['empleado'] = self._registro.nombre_canonico(marcacion['empleado'], self._nombres)
+            origen = self._vistas.get(clave)
+            
+            if origen is None:
+                self._vistas[clave] = nombre_archivo
+                self.marcaciones.append(marcacion)
+            elif origen != nombre_archivo:
+                # Repetida en otro archivo: solapamiento de períodos
+                resumen = self._solapamientos.setdefault((nombre_archivo, origen), {
+                    "archivo": nombre_archivo,
+                    "archivo_original": origen,
+                    "marcaciones": 0,
+                    "desde": marcacion['fecha'],
+                    "hasta": marcacion['fecha']
+                })
+                resumen["marcaciones"] += 1
+                resumen["desde"] = min(resumen["desde"], marcacion['fecha'])
+                resumen["hasta"] = max(resumen["hasta"], marcacion['fecha'])
+            else:
+                # Repetida dentro del mismo archivo: DataGrouper ya la descarta
+                self.marcaciones.append(marcacion)
+    
+    @property
+    def solapamientos(self) -> List[Dict]:
+        """Solapamientos detectados: archivo, archivo_original, marcaciones, desde, hasta"""
+        return list(self._solapamientos.values())
+
+def fusionar_marcaciones(marcaciones_por_archivo: List[Tuple[str, List[Dict]]]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Une las marcaciones de varios archivos eliminando las repetidas entre ellos
+    
+    Args:
+        marcaciones_por_archivo: Lista de (nombre_archivo, marcaciones) en orden de carga
         
-    except Exception as e:
-        st.error(f" Error procesando PDF: {str(e)}")
-        return pd.DataFrame()
+    Returns:
+        Tuple[List[Dict], List[Dict]]: (marcaciones_unicas, solapamientos)
+            Cada solapamiento indica archivo, archivo_original, cantidad de marcaciones
+            repetidas y el rango de fechas afectado.
+    """
+    fusion = FusionMarcaciones()
+    for nombre_archivo, marcaciones in marcaciones_por_archivo:
+        fusion.agregar(nombre_archivo, marcaciones)
+    return fusion.marcaciones, fusion.solapamientos
 
-def extraer_texto_pdf(archivo_pdf) -> str:
+def extraer_marcaciones_tabulares_pdf(archivo_pdf, progreso=None) -> Tuple[Optional[List[Dict]], Optional[str], Optional[Dict]]:
     """
-    Extrae texto del PDF usando pdfplumber
+    Intenta la extracción por columnas (modo tabular) con pdfplumber, consultando antes
+    la caché de diseños con la huella de la primera página
+    
+    Args:
+        archivo_pdf: Archivo PDF
+        progreso: Callback de progreso por página (ver progreso.py)
+    
+    Returns:
+        Tuple: (marcaciones o None si no aplica el modo tabular, huella del diseño, plan guardado)
     """
     try:
-        # Importar pdfplumber dinámicamente
         import pdfplumber
-        
-        texto_completo = ""
-        
+        from extraccion_tabular import extraer_marcaciones_tabla, detectar_columnas
+        from cache_disenos import huella_diseno, obtener_plan, guardar_plan
+    except ImportError:
+        return None, None, None
+    
+    huella = None
+    plan = None
+    try:
         with pdfplumber.open(archivo_pdf) as pdf:
-            for pagina in pdf.pages:
-                texto_pagina = pagina.extract_text()
-                if texto_pagina:
-                    texto_completo += texto_pagina + "\n"
+            if not pdf.pages:
+                return None, None, None
+            
+            palabras = pdf.pages[0].extract_words()
+            huella = huella_diseno(palabras)
+            plan = obtener_plan(huella)
+            
+            if plan and plan.get("modo") == "texto":
+                return None, huella, plan
+            
+            diseno = plan["diseno"] if plan else detectar_columnas(palabras)
+            if diseno is None:
+                return None, huella, plan
+            
+            datos = extraer_marcaciones_tabla(pdf, diseno, progreso)
+            if datos is not None and not plan:
+                guardar_plan(huella, {"modo": "tabla", "diseno": diseno})
+            return datos, huella, plan
+    except Exception:
+        return None, huella, plan
+    finally:
+        # Dejar el archivo listo para la extracción de texto
+        if hasattr(archivo_pdf, 'seek'):
+            archivo_pdf.seek(0)
+
+def _ocr_paginas_escaneadas(archivo_pdf, numeros: List[int], avisos=None) -> List[str]:
+    """
+    Reconoce con OCR el texto de páginas escaneadas si Tesseract está instalado
+    
+    Args:
+        archivo_pdf: Archivo PDF
+        numeros: Índices de las páginas sin texto extraíble
+        avisos: Si se indica, recibe los avisos (tipo, mensaje) en lugar de mostrarlos
         
-        return texto_completo
+    Returns:
+        List[str]: Texto de cada página ("" si no hay OCR disponible)
+    """
+    from ocr_fallback import ocr_imagenes, renderizar_pagina_png, ruta_tesseract
+    
+    if not ruta_tesseract():
+        _avisar(avisos, "warning", f" {len(numeros)} página(s) parecen escaneadas (sin texto). Instala Tesseract OCR para procesarlas.")
+        return [""] * len(numeros)
+    
+    try:
+        import pdfplumber
         
-    except ImportError:
-        st.warning(" pdfplumber no está instalado. Usando datos de ejemplo.")
-        # Fallback con datos de ejemplo
-        return """
-        REPORTE DE ASISTENCIA - OCTUBRE 2024
+        with pdfplumber.open(archivo_pdf) as pdf:
+            imagenes = [renderizar_pagina_png(pdf.pages[numero]) for numero in numeros]
+    except Exception as e:
+        _avisar(avisos, "warning", f" No se pudieron renderizar las páginas escaneadas para OCR: {str(e)}")
+        return [""] * len(numeros)
+    finally:
+        if hasattr(archivo_pdf, 'seek'):
+            archivo_pdf.seek(0)
+    
+    return [texto or "" for texto in ocr_imagenes(imagenes) or [""] * len(numeros)]
+
+def extraer_texto_pdf(archivo_pdf, progreso=None, avisos=None) -> str:
+    """
+    Extrae texto del PDF con el backend preferido instalado (ver pdf_backends)
+    
+    Cada página termina con una línea de salto de página ("\\f") para que el análisis
+    de estructura pueda muestrear por página.
+    
+    Args:
+        archivo_pdf: Archivo PDF
+        progreso: Callback de progreso por página (ver progreso.py)
+        avisos: Si se indica, recibe los avisos (tipo, mensaje) en lugar de mostrarlos
+    
+    Raises:
+        BackendPDFNoDisponible: Si no hay ninguna librería de PDF instalada
+    """
+    from pdf_backends import extraer_paginas_texto, BackendPDFNoDisponible
+    
+    try:
+        textos_paginas = extraer_paginas_texto(archivo_pdf, progreso=progreso)
         
-        Empleado: Juan Pérez
-        01/10/2024 08:00 - Entrada
-        01/10/2024 17:00 - Salida
-        02/10/2024 08:30 - Entrada
-        02/10/2024 17:30 - Salida
+        # Páginas sin texto (escaneadas): OCR opcional solo sobre ellas
+        paginas_escaneadas = [
+            numero for numero, texto_pagina in enumerate(textos_paginas)
+            if not texto_pagina or not texto_pagina.strip()
+        ]
+        if paginas_escaneadas:
+            textos_ocr = _ocr_paginas_escaneadas(archivo_pdf, paginas_escaneadas, avisos)
+            for numero, texto_ocr in zip(paginas_escaneadas, textos_ocr):
+                textos_paginas[numero] = texto_ocr
         
-        Empleado: María González  
-        01/10/2024 09:00 - Entrada
-        01/10/2024 18:00 - Salida
-        02/10/2024 08:45 - Entrada
-        02/10/2024 17:45 - Salida
+        return "".join(
+            texto_pagina + "\n" + SEPARADOR_PAGINA + "\n"
+            for texto_pagina in textos_paginas if texto_pagina
+        )
         
-        Empleado: Carlos López
-        01/10/2024 08:15 - Entrada
-        01/10/2024 17:15 - Salida
-        """
+    except BackendPDFNoDisponible:
+        raise
         
     except Exception as e:
-        st.error(f" Error extrayendo texto del PDF: {str(e)}")
+        _avisar(avisos, "error", f" Error extrayendo texto del PDF: {str(e)}")
         return ""
 
-def analizar_estructura_pdf(lineas: List[str]) -> Dict:
+# Patrones de estructura, en orden de prioridad ante empate de votos (más específico primero)
+PATRONES_ESTRUCTURA = {
+    "patron_empleado": [
+        ("empleado_prefijo", re.compile(r'Empleado:', re.IGNORECASE), "match"),
+    ],
+    "patron_fecha_hora": [
+        ("fecha_hora_completa", re.compile(r'\d{4}-\d{2}-\d{2}\s+\d{1,2}:\d{2}:\d{2}'), "search"),
+        ("fecha_hora_barras", re.compile(r'\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2}'), "search"),
+        ("fecha_hora_separada", re.compile(r'\d{4}-\d{2}-\d{2}\s+\d{1,2}:\d{2}(?!:\d)'), "search"),
+    ],
+    "tipo": [
+        ("tabular", re.compile(r'\t|\||  '), "search"),
+    ],
+}
+
+# Votos necesarios para dar por resuelta cada propiedad
+VOTOS_CONCLUYENTES = {
+    "patron_empleado": 1,
+    "patron_fecha_hora": 5,
+    "tipo": 3,
+}
+
+SEPARADOR_PAGINA = "\f"
+
+# Duración máxima de un turno nocturno para considerarlo válido (no ambiguo)
+DURACION_MAXIMA_TURNO_MINUTOS = 14 * 60
+
+def _muestrear_lineas(lineas: List[str], lineas_por_pagina: int) -> List[str]:
+    """
+    Toma las primeras y últimas líneas de cada página (separadas por SEPARADOR_PAGINA)
+    """
+    muestra = []
+    pagina = []
+    for linea in lineas + [SEPARADOR_PAGINA]:
+        if linea.strip(' ') == SEPARADOR_PAGINA:
+            if len(pagina) <= 2 * lineas_por_pagina:
+                muestra.extend(pagina)
+            else:
+                muestra.extend(pagina[:lineas_por_pagina])
+                muestra.extend(pagina[-lineas_por_pagina:])
+            pagina = []
+        else:
+            pagina.append(linea)
+    return muestra
+
+def analizar_estructura_pdf(lineas: List[str], lineas_por_pagina: int = 20) -> Dict:
     """
     Analiza la estructura del PDF para identificar patrones
     
+    Trabaja sobre una muestra acotada (primeras y últimas líneas de cada página) y se
+    detiene en cuanto todas las propiedades están resueltas. Cada patrón suma votos; gana
+    el más votado (no el último encontrado) y se informa la confianza de cada propiedad.
+    
     Args:
         lineas: Lista de líneas del texto extraído
+        lineas_por_pagina: Líneas muestreadas al inicio y al final de cada página
         
     Returns:
-        Dict: Información sobre la estructura identificada
+        Dict: Información sobre la estructura identificada, con "confianza" (0 a 1 por
+              propiedad), "votos" y "lineas_analizadas"
     """
     estructura = {
         "tipo": "desconocido",
@@ -105,42 +363,66 @@ def analizar_estructura_pdf(lineas: List[str]) -> Dict:
         "separador": None
     }
     
-    # Detectar patrones comunes
-    for linea in lineas:
-        linea = linea.strip()
-        if not linea:
+    votos = {propiedad: {nombre: 0 for nombre, _, _ in patrones} for propiedad, patrones in PATRONES_ESTRUCTURA.items()}
+    pendientes = set(PATRONES_ESTRUCTURA)
+    lineas_analizadas = 0
+    
+    for linea in _muestrear_lineas(lineas, lineas_por_pagina):
+        linea_limpia = linea.strip()
+        if not linea_limpia:
             continue
+        lineas_analizadas += 1
+        
+        for propiedad in list(pendientes):
+            for nombre, patron, modo in PATRONES_ESTRUCTURA[propiedad]:
+                texto = linea_limpia if modo == "match" else linea
+                encontrado = patron.match(texto) if modo == "match" else patron.search(texto)
+                if encontrado:
+                    votos[propiedad][nombre] += 1
+                    # Un mismo renglón vota por un solo valor de cada propiedad
+                    break
             
-        # Patrón: Empleado: Nombre
-        if re.match(r'Empleado:', linea, re.IGNORECASE):
-            estructura["patron_empleado"] = "empleado_prefijo"
-            
-        # Patrón: Fecha y hora juntas (YYYY-MM-DD HH:MM:SS)
-        if re.search(r'\d{4}-\d{2}-\d{2}\s+\d{1,2}:\d{2}:\d{2}', linea):
-            estructura["patron_fecha_hora"] = "fecha_hora_completa"
-            
-        # Patrón: Fecha y hora juntas (YYYY-MM-DD HH:MM)
-        if re.search(r'\d{4}-\d{2}-\d{2}\s+\d{1,2}:\d{2}', linea):
-            estructura["patron_fecha_hora"] = "fecha_hora_separada"
-            
-        # Patrón: Fecha y hora juntas (DD/MM/YYYY HH:MM)
-        if re.search(r'\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2}', linea):
-            estructura["patron_fecha_hora"] = "fecha_hora_barras"
-            
-        # Detectar si hay columnas tabulares
-        if '\t' in linea or '|' in linea or '  ' in linea:
-            estructura["tipo"] = "tabular"
-            
+            if max(votos[propiedad].values()) >= VOTOS_CONCLUYENTES[propiedad]:
+                pendientes.discard(propiedad)
+        
+        if not pendientes:
+            break
+    
+    confianza = {}
+    for propiedad, votos_propiedad in votos.items():
+        total = sum(votos_propiedad.values())
+        if total == 0:
+            confianza[propiedad] = 0.0
+            continue
+        # max() conserva el primero ante empate: el patrón más específico
+        ganador = max(votos_propiedad, key=votos_propiedad.get)
+        estructura[propiedad] = ganador
+        confianza[propiedad] = round(votos_propiedad[ganador] / total * min(1.0, total / VOTOS_CONCLUYENTES[propiedad]), 2)
+    
+    estructura["confianza"] = confianza
+    estructura["votos"] = votos
+    estructura["lineas_analizadas"] = lineas_analizadas
+    
     return estructura
 
-def extraer_datos_segun_estructura(lineas: List[str], estructura: Dict) -> List[Dict]:
+def extraer_datos_segun_estructura(lineas: List[str], estructura: Dict, progreso=None) -> List[Dict]:
     """
     Extrae datos según la estructura identificada usando el parser inteligente
+    
+    Si la estructura incluye "patrones_fecha_hora" (plan de un diseño conocido), se usan primero
+    esos patrones; si en una línea encuentran menos marcas que el conjunto completo, esa línea se
+    vuelve a leer con todos los patrones y los que funcionaron se suman al plan. Sin plan, se
+    agregan a la estructura los patrones que produjeron resultados.
+    Con un callback de progreso (ver progreso.py) se informa el avance por líneas.
     """
     from smart_parser import SmartTimeParser, EntradaSalidaDetector
+    from perfiles_empleados import obtener_perfiles
     
-    parser = SmartTimeParser()
-    detector = EntradaSalidaDetector()
+    # Con un plan de diseño conocido se prueban primero los patrones que funcionaron en ese diseño
+    patrones_plan = estructura.get("patrones_fecha_hora")
+    parser = SmartTimeParser(patrones_fecha_hora=patrones_plan)
+    parser_completo = None
+    detector = EntradaSalidaDetector(perfiles=obtener_perfiles())
     
     datos = []
     empleado_actual = None
@@ -148,7 +430,10 @@ def extraer_datos_segun_estructura(lineas: List[str], estructura: Dict) -> List[
     # Buscar nombres en todo el documento primero
     posibles_nombres = _buscar_nombres_en_documento(lineas)
     
+    avance = crear_progreso(progreso, len(lineas), "Analizando líneas")
+    
     for i, linea in enumerate(lineas):
+        avance.avanzar()
         linea = linea.strip()
         if not linea:
             continue
@@ -179,6 +464,10 @@ def extraer_datos_segun_estructura(lineas: List[str], estructura: Dict) -> List[
         
         # Extraer fechas y horas de la línea
         fechas_horas = parser.extraer_fecha_hora(linea)
+        if patrones_plan and len({fh['posicion'] for fh in fechas_horas}) < SmartTimeParser.cantidad_fecha_hora(linea):
+            # Marcas que el plan no cubre (otro documento del mismo diseño): todos los patrones
+            parser_completo = parser_completo or SmartTimeParser()
+            fechas_horas = parser_completo.extraer_fecha_hora(linea)
         
         for fh in fechas_horas:
             # Si no hay empleado actual, usar el primer nombre encontrado o "Empleado 1"
@@ -189,7 +478,9 @@ def extraer_datos_segun_estructura(lineas: List[str], estructura: Dict) -> List[
             
             # Detectar tipo (entrada/salida)
             contexto = lineas[max(0, i-2):i+3] if i > 0 else [linea]
-            tipo = detector.detectar_tipo(linea, fh['hora'], contexto)
+            # El perfil se busca por el nombre normalizado (PerfilesHorario.clave_perfil), así
+            # el nombre tal como figura en el PDF encuentra el historial guardado
+            tipo = detector.detectar_tipo(linea, fh['hora'], contexto, empleado=nombre_empleado)
             
             datos.append({
                 "empleado": nombre_empleado,
@@ -200,6 +491,13 @@ def extraer_datos_segun_estructura(lineas: List[str], estructura: Dict) -> List[
                 "confianza": _calcular_confianza(linea, fh)
             })
     
+    # Registrar en la estructura los patrones que funcionaron (plan reutilizable del diseño)
+    usados = parser.patrones_usados | (parser_completo.patrones_usados if parser_completo else set())
+    if usados and not usados <= set(patrones_plan or []):
+        estructura["patrones_fecha_hora"] = [
+            p for p in SmartTimeParser().patrones_fecha_hora if p in usados or p in (patrones_plan or [])
+        ]
+    
     return datos
 
 def _buscar_nombres_en_documento(lineas: List[str]) -> List[str]:
@@ -282,11 +580,16 @@ def _calcular_confianza(linea: str, fecha_hora: Dict) -> float:
     
     return min(confianza, 1.0)
 
-def procesar_datos_inteligente(datos_brutos: List[Dict]) -> List[Dict]:
+def procesar_datos_inteligente(datos_brutos: List[Dict], avisos=None) -> List[Dict]:
     """
     Procesa los datos de manera inteligente usando el DataGrouper
+    
+    Args:
+        datos_brutos: Marcaciones individuales
+        avisos: Si se indica, recibe los avisos (tipo, mensaje) en lugar de mostrarlos
     """
     from smart_parser import DataGrouper
+    from perfiles_empleados import obtener_perfiles
     
     if not datos_brutos:
         return []
@@ -295,12 +598,12 @@ def procesar_datos_inteligente(datos_brutos: List[Dict]) -> List[Dict]:
     datos_confiables = [d for d in datos_brutos if d.get('confianza', 0) > 0.6]
     
     if not datos_confiables:
-        st.warning(" Datos extraídos tienen baja confianza. Usando todos los datos disponibles.")
+        _avisar(avisos, "warning", " Datos extraídos tienen baja confianza. Usando todos los datos disponibles.")
         datos_confiables = datos_brutos
     
     # Usar DataGrouper para agrupar inteligentemente
     grouper = DataGrouper()
-    datos_agrupados = grouper.agrupar_por_empleado_fecha(datos_confiables)
+    datos_agrupados = grouper.agrupar_por_empleado_fecha(datos_confiables, perfiles=obtener_perfiles())
     
     return datos_agrupados
 
@@ -445,7 +748,7 @@ def detectar_registros_incompletos(df: pd.DataFrame) -> pd.DataFrame:
 # Función de análisis automático eliminada - administrador tiene control total
 
 
-def detectar_horarios_ambiguos(df: pd.DataFrame) -> pd.DataFrame:
+def detectar_horarios_ambiguos(df: pd.DataFrame, perfiles=None, politicas=None) -> pd.DataFrame:
     """
     Detecta registros con horarios que podrían ser ambiguos
     (por ejemplo, marcar a las 22:00 - ¿es entrada o salida?)
@@ -453,68 +756,116 @@ def detectar_horarios_ambiguos(df: pd.DataFrame) -> pd.DataFrame:
     Esta función complementa detectar_registros_incompletos para casos especiales
     donde hay entrada Y salida, pero parecen estar mal asignadas.
     
+    Si el empleado tiene perfil histórico suficiente, la decisión se toma por
+    verosimilitud del par (entrada, salida) frente al par intercambiado en lugar
+    de los umbrales fijos. Los umbrales se derivan de la ventana laboral de la
+    política del empleado. Como en calcular_sueldos, una salida anterior a la
+    entrada es un turno que termina al día siguiente: si la entrada cae en la
+    ventana y el turno no supera la duración máxima, es válido y no se marca.
+    
     Args:
         df: DataFrame con datos completos
+        perfiles: PerfilesHorario opcional (por defecto el índice persistido)
+        politicas: Políticas laborales (por defecto politicas_laborales.json)
         
     Returns:
         DataFrame: Registros con posibles asignaciones incorrectas
     """
-    import pandas as pd
-    from datetime import datetime
+    import numpy as np
+    from calculations import serie_hora_a_minutos, MINUTOS_DIA
+    from perfiles_empleados import obtener_perfiles
+    from politicas import compilar_politicas
     
-    horarios_ambiguos = []
+    if df.empty:
+        return pd.DataFrame()
     
-    for idx, row in df.iterrows():
-        try:
-            # Verificar que ambos horarios existan
-            if pd.isna(row['Entrada']) or pd.isna(row['Salida']):
-                continue
-                
-            entrada_str = str(row['Entrada']).strip()
-            salida_str = str(row['Salida']).strip()
-            
-            # Verificar que no sean valores inválidos
-            if entrada_str in ['', 'nan', '0:00', '00:00'] or salida_str in ['', 'nan', '0:00', '00:00']:
-                continue
-            
-            # Convertir a horas
-            entrada = datetime.strptime(entrada_str, "%H:%M").time()
-            salida = datetime.strptime(salida_str, "%H:%M").time()
-            
-            # Detectar patrones anómalos
-            entrada_decimal = entrada.hour + entrada.minute/60
-            salida_decimal = salida.hour + salida.minute/60
-            
-            # Casos sospechosos:
-            sospechoso = False
-            razon = ""
-            
-            # 1. Entrada muy tarde (después de las 20:00)
-            if entrada_decimal >= 20:
-                sospechoso = True
-                razon = f"Entrada registrada a las {entrada_str} (muy tarde - ¿podría ser salida?)"
-            
-            # 2. Salida muy temprano (antes de las 10:00)
-            elif salida_decimal <= 10:
-                sospechoso = True
-                razon = f"Salida registrada a las {salida_str} (muy temprano - ¿podría ser entrada?)"
-            
-            # 3. Entrada después de salida (mismo día)
-            elif entrada_decimal > salida_decimal:
-                sospechoso = True
-                razon = f"Entrada ({entrada_str}) después de salida ({salida_str}) - posible error de asignación"
-            
-            if sospechoso:
-                row_dict = row.to_dict()
-                row_dict['Razon_Sospecha'] = razon
-                row_dict['Entrada_Original'] = entrada_str
-                row_dict['Salida_Original'] = salida_str
-                horarios_ambiguos.append(row_dict)
-                
-        except Exception as e:
-            continue
+    if perfiles is None:
+        perfiles = obtener_perfiles()
+    
+    # Log-razón a partir de la cual el historial considera probable el intercambio
+    umbral_intercambio = math.log(4)
+    
+    entrada_str = df['Entrada'].astype(str).str.strip()
+    salida_str = df['Salida'].astype(str).str.strip()
+    entrada = serie_hora_a_minutos(entrada_str)
+    salida = serie_hora_a_minutos(salida_str)
+    
+    # Ambos horarios deben existir y no ser valores vacíos
+    invalidos = ['', 'nan', 'None', '0:00', '00:00']
+    validos = (
+        df['Entrada'].notna() & df['Salida'].notna()
+        & ~entrada_str.isin(invalidos) & ~salida_str.isin(invalidos)
+        & entrada.notna() & salida.notna()
+    )
+    if not validos.any():
+        return pd.DataFrame()
+    
+    parametros = compilar_politicas(df['Empleado'], politicas)
+    inicio_laboral = parametros['inicio_laboral']
+    fin_laboral = parametros['fin_laboral']
+    ventana_cruza = fin_laboral <= inicio_laboral
+    
+    # Turno nocturno válido: la entrada cae en la ventana (con la misma regla que
+    # calcular_sueldos, que lo paga hasta el cierre de la ventana) y el turno no supera la
+    # duración máxima
+    entrada_en_ventana = np.where(
+        ventana_cruza,
+        (entrada >= inicio_laboral) | (entrada <= fin_laboral),
+        (entrada >= inicio_laboral) & (entrada <= fin_laboral)
+    )
+    duracion_cruzando = salida + MINUTOS_DIA - entrada
+    nocturno_valido = entrada_en_ventana & (duracion_cruzando <= DURACION_MAXIMA_TURNO_MINUTOS)
+    
+    # 0. Historial del empleado disponible: decide por verosimilitud
+    razon_historial = pd.Series(np.nan, index=df.index)
+    tiene_perfil = {empleado: perfiles.tiene_perfil(empleado) for empleado in df['Empleado'].dropna().unique()}
+    con_perfil = validos & df['Empleado'].map(tiene_perfil).fillna(False).astype(bool)
+    if con_perfil.any():
+        razon_historial[con_perfil] = [
+            perfiles.razon_verosimilitud_intercambio(empleado, hora_entrada, hora_salida)
+            for empleado, hora_entrada, hora_salida in zip(
+                df.loc[con_perfil, 'Empleado'], entrada_str[con_perfil], salida_str[con_perfil]
+            )
+        ]
+    usa_historial = razon_historial.notna()
+    
+    # 1. Entrada muy tarde (2 horas antes del cierre o después; 20:00 con la ventana por defecto)
+    entrada_tarde = ~ventana_cruza & (entrada >= fin_laboral - 120)
+    # 2. Salida muy temprano (30 minutos antes de la apertura o antes; 10:00 por defecto),
+    # salvo que sea el fin de un turno que pasa la medianoche
+    salida_temprana = ~ventana_cruza & (salida <= inicio_laboral - 30) & ~nocturno_valido
+    # 3. Entrada después de salida que no corresponde a un turno nocturno válido
+    invertido = (entrada > salida) & ~nocturno_valido
+    
+    condiciones = [
+        usa_historial & (razon_historial >= umbral_intercambio),
+        ~usa_historial & entrada_tarde,
+        ~usa_historial & salida_temprana,
+        ~usa_historial & invertido,
+    ]
+    empleados = df['Empleado'].astype(str)
+    razones = [
+        "Según su historial, " + empleados + " suele entrar cerca de las " + salida_str
+        + " y salir cerca de las " + entrada_str + " - ¿horarios invertidos?",
+        "Entrada registrada a las " + entrada_str + " (muy tarde - ¿podría ser salida?)",
+        "Salida registrada a las " + salida_str + " (muy temprano - ¿podría ser entrada?)",
+        "Entrada (" + entrada_str + ") después de salida (" + salida_str + ") - posible error de asignación",
+    ]
+    
+    razon_sospecha = pd.Series(None, index=df.index, dtype=object)
+    for condicion, razon in reversed(list(zip(condiciones, razones))):
+        razon_sospecha[condicion & validos] = razon[condicion & validos]
+    
+    sospechosos = razon_sospecha.notna()
+    if not sospechosos.any():
+        return pd.DataFrame()
     
-    return pd.DataFrame(horarios_ambiguos) if horarios_ambiguos else pd.DataFrame()
+    df_ambiguos = df[sospechosos].copy()
+    df_ambiguos['Razon_Sospecha'] = razon_sospecha[sospechosos]
+    df_ambiguos['Entrada_Original'] = entrada_str[sospechosos]
+    df_ambiguos['Salida_Original'] = salida_str[sospechosos]
+    # Se conserva el índice original para aplicar los intercambios sobre el registro correcto
+    return df_ambiguos
 
 
 def filtrar_registros_sin_asistencia(df: pd.DataFrame) -> tuple:
@@ -548,7 +899,8 @@ def filtrar_registros_sin_asistencia(df: pd.DataFrame) -> tuple:
     # Registros sin asistencia (faltan ambos)
     sin_asistencia = entrada_faltante & salida_faltante
     
-    df_sin_asistencia = df[sin_asistencia].copy()
-    df_con_asistencia = df[~sin_asistencia].copy()
+    # La selección booleana ya devuelve DataFrames nuevos; quien los modifique hace su propia copia
+    df_sin_asistencia = df[sin_asistencia]
+    df_con_asistencia = df[~sin_asistencia]
     
     return df_con_asistencia, df_sin_asistencia
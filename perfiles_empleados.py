@@ -0,0 +1,312 @@
+"""
+Perfiles históricos de horario por empleado
+Guarda histogramas compactos de entradas y salidas para clasificar marcas con O(1) por consulta.
+Los perfiles se guardan por la clave normalizada del empleado (RegistroEmpleados.clave), así
+"PEREZ JUAN" y "Juan Pérez" comparten perfil sin importar cómo se escribió el nombre.
+"""
+import json
+import math
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from calculations import serie_hora_a_minutos
+from registro_empleados import obtener_registro
+
+ARCHIVO_PERFILES = os.path.join(os.path.dirname(__file__), "perfiles_empleados.json")
+
+MINUTOS_POR_BIN = 30
+CANTIDAD_BINS = 24 * 60 // MINUTOS_POR_BIN
+
+# Períodos cuyo aporte se conserva; al superarlo, el más antiguo se descuenta de los perfiles
+MAX_PERIODOS_REGISTRADOS = 24
+
+
+class PerfilesHorario:
+    """Índice de perfiles de entrada/salida por empleado basado en períodos ya procesados"""
+
+    def __init__(self, minimo_muestras: int = 5, suavizado: float = 1.0):
+        """
+        Args:
+            minimo_muestras: Marcas mínimas de un empleado para confiar en su perfil
+            suavizado: Constante de Laplace para bins sin observaciones
+        """
+        self.minimo_muestras = minimo_muestras
+        self.suavizado = suavizado
+        # {clave de empleado: {"Entrada": [conteos por bin], "Salida": [conteos por bin]}}
+        self.histogramas: Dict[str, Dict[str, List[int]]] = {}
+        # Aporte de cada período registrado, del más antiguo al más reciente:
+        # {clave: {clave de empleado: {"Entrada": {bin: conteo}, "Salida": {bin: conteo}}}}
+        self.periodos: Dict[str, Dict[str, Dict[str, Dict[str, int]]]] = {}
+
+    @staticmethod
+    def _bin(hora: str) -> Optional[int]:
+        """Devuelve el bin de una hora "HH:MM" o None si no es válida"""
+        try:
+            horas, minutos = str(hora).strip().split(':')[:2]
+            return ((int(horas) * 60 + int(minutos)) // MINUTOS_POR_BIN) % CANTIDAD_BINS
+        except (ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def clave_perfil(empleado) -> str:
+        """Clave con que se guarda el perfil de un empleado (su nombre normalizado)"""
+        return obtener_registro().clave(empleado)
+
+    def tiene_perfil(self, empleado) -> bool:
+        """True si el empleado tiene histogramas registrados (con cualquier escritura del nombre)"""
+        return self.clave_perfil(empleado) in self.histogramas
+
+    @staticmethod
+    def clave_periodo(df: pd.DataFrame, origen: str = "") -> str:
+        """
+        Clave de un período: archivo(s) de origen y rango de fechas. Un período corregido o
+        editado conserva su clave, así su nuevo aporte reemplaza al anterior
+        """
+        fechas = pd.to_datetime(df['Fecha'], errors='coerce').dropna()
+        if fechas.empty:
+            return f"{origen}|"
+        return f"{origen}|{fechas.min():%Y-%m-%d}|{fechas.max():%Y-%m-%d}"
+
+    @staticmethod
+    def _aporte(df: pd.DataFrame) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """
+        Conteos por clave de empleado, tipo de marca y bin de las marcas completas de un período
+
+        Se agrupa por la clave normalizada (calculada una vez por nombre distinto) y no por
+        Id_Empleado, porque los Id solo valen dentro del proceso.
+        """
+        nombres = df['Empleado'].dropna().unique()
+        empleado = df['Empleado'].map({nombre: PerfilesHorario.clave_perfil(nombre) for nombre in nombres})
+        aporte = {}
+        for columna in ['Entrada', 'Salida']:
+            minutos = serie_hora_a_minutos(df[columna])
+            validos = minutos.notna() & (minutos > 0)
+            bins = (minutos[validos] // MINUTOS_POR_BIN).astype(int) % CANTIDAD_BINS
+            conteos = bins.groupby([empleado[validos], bins]).size()
+
+            for (clave, numero_bin), cantidad in conteos.items():
+                aporte.setdefault(clave, {"Entrada": {}, "Salida": {}})[columna][str(numero_bin)] = int(cantidad)
+        return aporte
+
+    def _sumar_aporte(self, aporte: Dict, signo: int):
+        """Suma (signo 1) o descuenta (signo -1) el aporte de un período de los histogramas"""
+        for empleado, columnas in aporte.items():
+            perfil = self.histogramas.setdefault(
+                empleado, {"Entrada": [0] * CANTIDAD_BINS, "Salida": [0] * CANTIDAD_BINS}
+            )
+            for columna, conteos in columnas.items():
+                for numero_bin, cantidad in conteos.items():
+                    perfil[columna][int(numero_bin)] = max(0, perfil[columna][int(numero_bin)] + signo * cantidad)
+            if signo < 0 and not any(perfil["Entrada"]) and not any(perfil["Salida"]):
+                del self.histogramas[empleado]
+
+    def registrar_periodo(self, df: pd.DataFrame, clave: Optional[str] = None) -> bool:
+        """
+        Agrega las marcas completas de un período confirmado a los histogramas
+
+        Un período ya registrado con la misma clave se reemplaza (su aporte anterior se
+        descuenta). Se conservan los últimos MAX_PERIODOS_REGISTRADOS períodos.
+
+        Args:
+            df: DataFrame con columnas Empleado, Fecha, Entrada, Salida
+            clave: Clave del período (por defecto clave_periodo(df))
+
+        Returns:
+            bool: True si los perfiles cambiaron
+        """
+        if df.empty:
+            return False
+
+        clave = clave or self.clave_periodo(df)
+        aporte = self._aporte(df)
+        if self.periodos.get(clave) == aporte:
+            return False
+
+        if clave in self.periodos:
+            self._sumar_aporte(self.periodos.pop(clave), -1)
+        self._sumar_aporte(aporte, 1)
+        self.periodos[clave] = aporte
+
+        while len(self.periodos) > MAX_PERIODOS_REGISTRADOS:
+            mas_antiguo = next(iter(self.periodos))
+            self._sumar_aporte(self.periodos.pop(mas_antiguo), -1)
+        return True
+
+    def probabilidad_entrada(self, empleado: str, hora: str) -> Optional[float]:
+        """
+        Probabilidad de que una marca a esa hora sea una entrada según el historial del empleado
+
+        Returns:
+            float: Probabilidad entre 0 y 1, o None si el empleado no tiene perfil suficiente
+        """
+        perfil = self.histogramas.get(self.clave_perfil(empleado))
+        numero_bin = self._bin(hora)
+        if perfil is None or numero_bin is None:
+            return None
+
+        total_entradas = sum(perfil["Entrada"])
+        total_salidas = sum(perfil["Salida"])
+        if total_entradas + total_salidas < self.minimo_muestras:
+            return None
+
+        verosimilitud_entrada = (perfil["Entrada"][numero_bin] + self.suavizado) / (total_entradas + self.suavizado * CANTIDAD_BINS)
+        verosimilitud_salida = (perfil["Salida"][numero_bin] + self.suavizado) / (total_salidas + self.suavizado * CANTIDAD_BINS)
+        return verosimilitud_entrada / (verosimilitud_entrada + verosimilitud_salida)
+
+    def clasificar(self, empleado: str, hora: str, umbral: float = 0.7) -> Optional[str]:
+        """
+        Clasifica una marca única como entrada o salida
+
+        Args:
+            empleado: Nombre del empleado
+            hora: Hora "HH:MM"
+            umbral: Probabilidad mínima para decidir
+
+        Returns:
+            str: 'Entrada', 'Salida' o None si el perfil no permite decidir
+        """
+        probabilidad = self.probabilidad_entrada(empleado, hora)
+        if probabilidad is None:
+            return None
+        if probabilidad >= umbral:
+            return 'Entrada'
+        if probabilidad <= 1 - umbral:
+            return 'Salida'
+        return None
+
+    def razon_verosimilitud_intercambio(self, empleado: str, entrada: str, salida: str) -> Optional[float]:
+        """
+        Log-razón de verosimilitud entre el par intercambiado y el par registrado
+
+        Valores positivos indican que el historial favorece intercambiar entrada y salida.
+
+        Returns:
+            float: Log-razón, o None si el empleado no tiene perfil suficiente
+        """
+        p_entrada = self.probabilidad_entrada(empleado, entrada)
+        p_salida = self.probabilidad_entrada(empleado, salida)
+        if p_entrada is None or p_salida is None:
+            return None
+
+        epsilon = 1e-9
+        registrado = math.log(p_entrada + epsilon) + math.log(1 - p_salida + epsilon)
+        intercambiado = math.log(p_salida + epsilon) + math.log(1 - p_entrada + epsilon)
+        return intercambiado - registrado
+
+    def guardar(self, ruta: Optional[str] = None):
+        """
+        Persiste los perfiles en disco en formato JSON
+
+        Se escribe un archivo temporal y se reemplaza el anterior de una vez, así una
+        escritura interrumpida o simultánea nunca deja el archivo a medias.
+        """
+        ruta = ruta or ARCHIVO_PERFILES
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(ruta)), suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "minutos_por_bin": MINUTOS_POR_BIN,
+                    "histogramas": self.histogramas,
+                    "periodos": self.periodos
+                }, f, ensure_ascii=False)
+            os.replace(temporal, ruta)
+        except BaseException:
+            os.unlink(temporal)
+            raise
+
+    @classmethod
+    def cargar(cls, ruta: Optional[str] = None) -> "PerfilesHorario":
+        """Carga los perfiles desde disco; devuelve un índice vacío si no existen"""
+        ruta = ruta or ARCHIVO_PERFILES
+        perfiles = cls()
+        if not os.path.exists(ruta):
+            return perfiles
+
+        try:
+            with open(ruta, encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return perfiles
+
+        if datos.get("minutos_por_bin") != MINUTOS_POR_BIN:
+            return perfiles
+
+        # Los archivos anteriores solo guardaban firmas de contenido: sus histogramas se
+        # conservan, pero esos períodos ya no pueden reemplazarse. Los guardados por nombre
+        # se pasan a la clave normalizada, sumando las distintas escrituras de un empleado
+        for clave, aporte in datos.get("periodos", {}).items():
+            perfiles.periodos[clave] = cls._aporte_por_clave(aporte)
+        for empleado, columnas in datos.get("histogramas", {}).items():
+            perfil = perfiles.histogramas.setdefault(
+                cls.clave_perfil(empleado), {"Entrada": [0] * CANTIDAD_BINS, "Salida": [0] * CANTIDAD_BINS}
+            )
+            for columna, conteos in columnas.items():
+                perfil[columna] = [actual + cantidad for actual, cantidad in zip(perfil[columna], conteos)]
+        return perfiles
+
+    @classmethod
+    def _aporte_por_clave(cls, aporte: Dict) -> Dict:
+        """Aporte de un período con los empleados por clave normalizada (une escrituras)"""
+        por_clave = {}
+        for empleado, columnas in aporte.items():
+            destino = por_clave.setdefault(cls.clave_perfil(empleado), {"Entrada": {}, "Salida": {}})
+            for columna, conteos in columnas.items():
+                for numero_bin, cantidad in conteos.items():
+                    destino[columna][numero_bin] = destino[columna].get(numero_bin, 0) + cantidad
+        return por_clave
+
+
+_perfiles_cargados: Optional[PerfilesHorario] = None
+_version_cargada: Optional[int] = None
+
+
+def _version_archivo(ruta: str) -> Optional[int]:
+    """Fecha de modificación del archivo en nanosegundos (None si no existe)"""
+    try:
+        return os.stat(ruta).st_mtime_ns
+    except OSError:
+        return None
+
+
+def obtener_perfiles() -> PerfilesHorario:
+    """
+    Devuelve el índice de perfiles del proceso, que se vuelve a cargar si el archivo cambió
+
+    Los procesos del pool de parseo viven mucho tiempo: así ven los perfiles que otro
+    proceso guardó después (registrar_periodo_procesado) sin tener que recrear el pool.
+    """
+    global _perfiles_cargados, _version_cargada
+    version = _version_archivo(ARCHIVO_PERFILES)
+    if _perfiles_cargados is None or version != _version_cargada:
+        _perfiles_cargados = PerfilesHorario.cargar()
+        _version_cargada = version
+    return _perfiles_cargados
+
+
+def registrar_periodo_procesado(df: pd.DataFrame, origen: str = "") -> bool:
+    """
+    Incorpora un período confirmado por el usuario a los perfiles y los persiste si hubo
+    cambios. Confirmar de nuevo el mismo período (mismo origen y fechas) tras corregirlo
+    reemplaza su aporte anterior en lugar de sumarlo otra vez.
+
+    Args:
+        df: DataFrame final usado para el cálculo de sueldos
+        origen: Archivo(s) de origen del período
+
+    Returns:
+        bool: True si los perfiles se actualizaron
+    """
+    global _version_cargada
+    perfiles = obtener_perfiles()
+    if perfiles.registrar_periodo(df, PerfilesHorario.clave_periodo(df, origen)):
+        try:
+            perfiles.guardar()
+            # El índice en memoria ya es el guardado: no hace falta volver a leerlo
+            _version_cargada = _version_archivo(ARCHIVO_PERFILES)
+        except OSError:
+            pass
+        return True
+    return False
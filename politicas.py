@@ -0,0 +1,154 @@
+"""
+Políticas laborales por grupo de empleados
+Define ventana de trabajo, bandas de horas especiales, factores, horas extra y redondeo,
+cargadas desde un archivo de configuración y compiladas a columnas para el cálculo vectorizado
+"""
+import json
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from calculations import factor_a_puntos_basicos
+
+# Campos de una política:
+#   inicio_laboral / fin_laboral: ventana (HH:MM) en la que debe caer la entrada; la salida
+#       se recorta al cierre de esa ventana, también si es después de la medianoche (con
+#       10:30-22:00, un turno 18:00-00:30 se paga hasta las 22:00). Si fin_laboral <=
+#       inicio_laboral la ventana cruza la medianoche (turno nocturno, ej: 18:00-06:00) y
+#       cierra en fin_laboral del día siguiente
+#   bandas_especiales: lista de {"desde", "hasta", "factor"} pagadas con recargo; una banda
+#       con hasta <= desde cruza la medianoche
+#   factor_feriado: multiplicador del sueldo del día en fechas feriadas
+#   umbral_horas_extra: horas diarias a partir de las cuales se paga factor_horas_extra
+#       (None = sin horas extra)
+#   redondeo_minutos / modo_redondeo: redondeo de los minutos trabajados de cada registro
+#       a múltiplos de N minutos ('abajo', 'arriba' o 'cercano'; 0 = sin redondeo)
+POLITICA_POR_DEFECTO = {
+    "inicio_laboral": "10:30",
+    "fin_laboral": "22:00",
+    "bandas_especiales": [
+        {"desde": "20:00", "hasta": "22:00", "factor": 1.3}
+    ],
+    "factor_feriado": 2,
+    "umbral_horas_extra": None,
+    "factor_horas_extra": 1.5,
+    "redondeo_minutos": 0,
+    "modo_redondeo": "cercano"
+}
+
+GRUPO_POR_DEFECTO = "general"
+
+# Umbral de horas extra (minutos) equivalente a "sin horas extra"
+SIN_UMBRAL_EXTRA = 10 ** 9
+
+ARCHIVO_POLITICAS = os.path.join(os.path.dirname(__file__), "politicas_laborales.json")
+
+
+def _a_minutos(hora: str) -> int:
+    """Convierte "HH:MM" a minutos desde medianoche"""
+    horas, minutos = hora.split(':')
+    return int(horas) * 60 + int(minutos)
+
+
+def cargar_politicas(ruta: Optional[str] = None) -> Dict:
+    """
+    Carga las políticas laborales desde un archivo JSON si existe
+
+    El archivo puede contener las claves "grupos" ({nombre: política parcial}),
+    "empleados" ({empleado: grupo}) y "grupo_por_defecto". Cada grupo hereda de
+    POLITICA_POR_DEFECTO los campos que no define.
+
+    Args:
+        ruta: Ruta del archivo (por defecto politicas_laborales.json)
+
+    Returns:
+        Dict: {"grupos": {nombre: política}, "empleados": {...}, "grupo_por_defecto": str}
+    """
+    ruta = ruta or ARCHIVO_POLITICAS
+    config = {}
+    if os.path.exists(ruta):
+        with open(ruta, encoding='utf-8') as f:
+            config = json.load(f)
+
+    grupos = {GRUPO_POR_DEFECTO: dict(POLITICA_POR_DEFECTO)}
+    for nombre, politica in config.get("grupos", {}).items():
+        grupos[nombre] = {**POLITICA_POR_DEFECTO, **politica}
+
+    grupo_por_defecto = config.get("grupo_por_defecto", GRUPO_POR_DEFECTO)
+    if grupo_por_defecto not in grupos:
+        raise ValueError(f"El grupo por defecto '{grupo_por_defecto}' no está definido en {ruta}")
+
+    empleados = config.get("empleados", {})
+    desconocidos = sorted(set(empleados.values()) - set(grupos))
+    if desconocidos:
+        raise ValueError(f"Grupos no definidos en {ruta}: {', '.join(desconocidos)}")
+
+    return {"grupos": grupos, "empleados": empleados, "grupo_por_defecto": grupo_por_defecto}
+
+
+def _compilar_grupo(politica: Dict) -> Dict:
+    """
+    Traduce una política a enteros: minutos desde medianoche y factores en puntos básicos
+    (ESCALA_FACTOR), para que el cálculo no acumule error de punto flotante
+    """
+    umbral = politica["umbral_horas_extra"]
+    compilada = {
+        "inicio_laboral": _a_minutos(politica["inicio_laboral"]),
+        "fin_laboral": _a_minutos(politica["fin_laboral"]),
+        "factor_feriado": factor_a_puntos_basicos(politica["factor_feriado"]),
+        "umbral_extra": int(round(float(umbral) * 60)) if umbral is not None else SIN_UMBRAL_EXTRA,
+        "factor_extra": factor_a_puntos_basicos(politica["factor_horas_extra"]),
+        "redondeo": int(politica["redondeo_minutos"] or 0),
+        "modo_redondeo": politica["modo_redondeo"],
+        "ventana": f"{politica['inicio_laboral']}-{politica['fin_laboral']}"
+    }
+    for numero, banda in enumerate(politica["bandas_especiales"]):
+        compilada[f"banda{numero}_desde"] = _a_minutos(banda["desde"])
+        compilada[f"banda{numero}_hasta"] = _a_minutos(banda["hasta"])
+        compilada[f"banda{numero}_factor"] = factor_a_puntos_basicos(banda["factor"])
+    return compilada
+
+
+def compilar_politicas(empleados: pd.Series, politicas: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Resuelve la política de cada registro según su empleado, en columnas alineadas al índice
+
+    Args:
+        empleados: Serie con el empleado de cada registro
+        politicas: Políticas cargadas (por defecto cargar_politicas())
+
+    Returns:
+        DataFrame: Una fila por registro con 'grupo' y los parámetros enteros de su política
+                   (minutos y factores en puntos básicos). Las bandas se exponen como
+                   banda{N}_desde/hasta/factor; los grupos con menos bandas quedan con
+                   factor 0 en las restantes.
+    """
+    politicas = politicas or cargar_politicas()
+    compiladas = pd.DataFrame.from_dict(
+        {nombre: _compilar_grupo(politica) for nombre, politica in politicas["grupos"].items()},
+        orient='index'
+    )
+    # Grupos con menos bandas: las bandas faltantes quedan con factor 0 (no aplican)
+    columnas_enteras = [c for c in compiladas.columns if c not in ("modo_redondeo", "ventana")]
+    compiladas[columnas_enteras] = compiladas[columnas_enteras].fillna(0).astype('int64')
+
+    # Cruce por nombre normalizado (registro_empleados): el archivo de políticas puede nombrar
+    # al empleado con otras mayúsculas, acentos u orden; cada nombre distinto se resuelve una vez
+    from registro_empleados import obtener_registro
+    registro = obtener_registro()
+    grupo_por_clave = {registro.clave(nombre): grupo for nombre, grupo in politicas["empleados"].items()}
+    codigos, nombres = pd.factorize(empleados)
+    grupos_nombres = [grupo_por_clave.get(registro.clave(nombre), politicas["grupo_por_defecto"]) for nombre in nombres]
+    grupos = pd.Series(
+        np.array(grupos_nombres + [politicas["grupo_por_defecto"]], dtype=object)[codigos], index=empleados.index
+    )
+    parametros = compiladas.loc[grupos.values].set_index(empleados.index)
+    parametros.insert(0, "grupo", grupos.values)
+    return parametros
+
+
+def cantidad_bandas(parametros: pd.DataFrame) -> int:
+    """Cantidad de bandas especiales presentes en los parámetros compilados"""
+    return sum(1 for c in parametros.columns if c.startswith("banda") and c.endswith("_factor"))
@@ -0,0 +1,126 @@
+"""
+Reporte de progreso
+Protocolo común para que los parsers y el motor de cálculo informen su avance real.
+Un callback de progreso es cualquier función progreso(porcentaje, mensaje); los parsers
+lo llaman cada N páginas/filas a través de Progreso, que limita la frecuencia de los textos
+para no saturar a Streamlit de redibujados. Entre dos informes el callback se sigue llamando,
+con mensaje None (solo el avance), para que un trabajo atienda la cancelación aunque no toque
+informar (ver trabajos.Trabajo.informar). Sin callback (uso por código o scripts) no se informa nada.
+"""
+import time
+from typing import Callable, Optional
+
+CallbackProgreso = Callable[[float, Optional[str]], None]
+
+# Segundos mínimos entre dos informes (el primero y el último siempre se informan)
+INTERVALO_MINIMO = 0.25
+
+# Informes máximos por tarea (determina cada cuántas unidades se evalúa si informar)
+INFORMES_MAXIMOS = 100
+
+# Segundos transcurridos antes de mostrar una estimación del tiempo restante
+ESPERA_ESTIMACION = 1.0
+
+
+class Progreso:
+    """Avance de una tarea de 'total' unidades (páginas, filas, grupos) hacia un callback"""
+
+    def __init__(self, callback: CallbackProgreso, total: int, mensaje: str = "Procesando",
+                 cada: Optional[int] = None, intervalo: float = INTERVALO_MINIMO):
+        """
+        Args:
+            callback: Función progreso(porcentaje, mensaje)
+            total: Unidades de trabajo de la tarea
+            mensaje: Texto de la tarea (se completa con "hechas/total" y el tiempo restante)
+            cada: Unidades entre evaluaciones (por defecto total / INFORMES_MAXIMOS)
+            intervalo: Segundos mínimos entre informes
+        """
+        self.callback = callback
+        self.total = max(int(total), 1)
+        self.mensaje = mensaje
+        self.cada = cada or max(1, self.total // INFORMES_MAXIMOS)
+        self.intervalo = intervalo
+        self.hechas = 0
+        self.inicio = time.perf_counter()
+        self._proximo = 0
+        self._ultimo_informe = None
+
+    def avanzar(self, cantidad: int = 1):
+        """Suma unidades hechas e informa si corresponde"""
+        self.hechas += cantidad
+        if self.hechas >= self._proximo:
+            self._proximo = self.hechas + self.cada
+            self._informar(forzar=self.hechas >= self.total)
+
+    def terminar(self):
+        """Informa la tarea completa"""
+        self.hechas = self.total
+        self._informar(forzar=True)
+
+    def restante(self) -> Optional[float]:
+        """Segundos restantes estimados por el ritmo observado (None si aún no hay datos)"""
+        transcurrido = time.perf_counter() - self.inicio
+        if self.hechas <= 0 or transcurrido < ESPERA_ESTIMACION:
+            return None
+        return transcurrido * (self.total - self.hechas) / self.hechas
+
+    def _informar(self, forzar: bool = False):
+        hechas = min(self.hechas, self.total)
+        ahora = time.perf_counter()
+        if not forzar and self._ultimo_informe is not None and ahora - self._ultimo_informe < self.intervalo:
+            # Sin texto nuevo: el callback solo recibe el avance (y atiende la cancelación)
+            self.callback(hechas * 100 / self.total, None)
+            return
+        self._ultimo_informe = ahora
+
+        texto = f"{self.mensaje}: {hechas}/{self.total}"
+        restante = self.restante()
+        if restante is not None and hechas < self.total:
+            texto += f" (quedan ~{int(restante) + 1} s)"
+        self.callback(hechas * 100 / self.total, texto)
+
+
+class _SinProgreso:
+    """Progreso nulo: mismas operaciones que Progreso, sin ningún trabajo"""
+
+    def avanzar(self, cantidad: int = 1):
+        pass
+
+    def terminar(self):
+        pass
+
+    def restante(self):
+        return None
+
+
+SIN_PROGRESO = _SinProgreso()
+
+
+def crear_progreso(callback: Optional[CallbackProgreso], total: int, mensaje: str = "Procesando",
+                   cada: Optional[int] = None, intervalo: float = INTERVALO_MINIMO):
+    """
+    Crea el seguimiento de una tarea; sin callback devuelve SIN_PROGRESO
+
+    Returns:
+        Progreso o SIN_PROGRESO
+    """
+    if callback is None:
+        return SIN_PROGRESO
+    return Progreso(callback, total, mensaje, cada, intervalo)
+
+
+def subrango(callback: Optional[CallbackProgreso], desde: float, hasta: float) -> Optional[CallbackProgreso]:
+    """
+    Adapta un callback para que una subtarea informe de 0 a 100 dentro de [desde, hasta]
+    del total (ej: lectura 0-80 %, análisis 80-100 %)
+
+    Returns:
+        CallbackProgreso o None si no hay callback
+    """
+    if callback is None:
+        return None
+
+    def informar(porcentaje: float, mensaje: Optional[str]):
+        callback(desde + (hasta - desde) * porcentaje / 100, mensaje)
+
+    return informar
@@ -0,0 +1,207 @@
+"""
+Registro de empleados
+Unifica los nombres con que aparece un mismo empleado en distintos archivos (mayúsculas,
+acentos, espacios u orden de nombre y apellido) y le asigna un identificador entero, para que
+agrupar, deduplicar y cruzar datos no parta a una persona en varias.
+
+Las variantes que la normalización no resuelve (apodos, abreviaturas) se declaran en
+alias_empleados.json:
+    {"alias": {"Juanca": "Juan Carlos Pérez", "JC Perez": "Juan Carlos Pérez"}}
+
+El nombre que se muestra depende solo de los datos: el canónico del alias si está declarado, o
+la primera forma en que aparece en el archivo (o en los archivos, en orden de carga). Nunca
+depende de lo que el proceso vio antes, así un mismo archivo se muestra siempre igual.
+
+Los Id_Empleado se asignan en orden de aparición y valen solo dentro del proceso: sirven para
+agrupar y cruzar los datos de un cálculo, pero no se guardan. Lo persistido (almacén de
+períodos, perfiles de horario) se identifica por la clave normalizada del empleado
+(RegistroEmpleados.clave), que no cambia entre procesos.
+"""
+import json
+import os
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Optional
+
+ARCHIVO_ALIAS = os.path.join(os.path.dirname(__file__), "alias_empleados.json")
+
+# Id entero del empleado en el registro del proceso (no persistir, ver arriba)
+COLUMNA_ID_EMPLEADO = "Id_Empleado"
+
+_SEPARADORES = re.compile(r"[\W_]+")
+
+
+@lru_cache(maxsize=65536)
+def normalizar_nombre(nombre) -> str:
+    """
+    Clave de comparación de un nombre: sin acentos, en minúsculas, sin signos y con las
+    palabras ordenadas ("PÉREZ,  Juan" y "juan perez" dan "juan perez")
+
+    Args:
+        nombre: Nombre tal como aparece en el archivo
+
+    Returns:
+        str: Nombre normalizado
+    """
+    texto = unicodedata.normalize("NFKD", str(nombre))
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).casefold()
+    return " ".join(sorted(palabra for palabra in _SEPARADORES.split(texto) if palabra))
+
+
+def cargar_alias(ruta: Optional[str] = None) -> Dict[str, str]:
+    """
+    Carga los alias de empleados desde un archivo JSON si existe
+
+    Args:
+        ruta: Ruta del archivo (por defecto alias_empleados.json)
+
+    Returns:
+        Dict[str, str]: Variante -> nombre canónico
+    """
+    ruta = ruta or ARCHIVO_ALIAS
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f).get("alias", {})
+
+
+class RegistroEmpleados:
+    """Índice de empleados: nombre normalizado -> Id entero del proceso"""
+
+    def __init__(self, alias: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            alias: Variante -> nombre canónico (ver cargar_alias)
+        """
+        self._ids: Dict[str, int] = {}
+        self._bloqueo = threading.Lock()
+        self.actualizar_alias(alias)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def actualizar_alias(self, alias: Optional[Dict[str, str]]):
+        """Reemplaza los alias declarados; los Id ya asignados se conservan"""
+        alias = alias or {}
+        self._alias = {normalizar_nombre(variante): normalizar_nombre(canonico) for variante, canonico in alias.items()}
+        self._nombres_alias = {normalizar_nombre(canonico): canonico for canonico in alias.values()}
+
+    def clave(self, nombre) -> str:
+        """Nombre normalizado, resolviendo los alias"""
+        clave = normalizar_nombre(nombre)
+        return self._alias.get(clave, clave)
+
+    def id_empleado(self, nombre) -> int:
+        """Id del empleado en el proceso; una clave nueva recibe el siguiente Id"""
+        clave = self.clave(nombre)
+        with self._bloqueo:
+            return self._ids.setdefault(clave, len(self._ids))
+
+    def nombre_canonico(self, nombre, visto: Optional[Dict[str, str]] = None) -> str:
+        """
+        Nombre para mostrar: el canónico del alias si está declarado o, si no, la primera
+        forma del empleado registrada en 'visto' (que se completa con este nombre si es nuevo)
+
+        Args:
+            nombre: Nombre tal como aparece en el archivo
+            visto: Clave -> nombre de los empleados ya vistos en los mismos datos
+
+        Returns:
+            str: Nombre canónico
+        """
+        clave = self.clave(nombre)
+        canonico = self._nombres_alias.get(clave)
+        if canonico is not None:
+            return canonico
+        if visto is None:
+            return " ".join(str(nombre).split())
+        return visto.setdefault(clave, " ".join(str(nombre).split()))
+
+    def unificar(self, df, columna: str = "Empleado"):
+        """
+        Reemplaza cada nombre por el canónico de su empleado y agrega la columna Id_Empleado
+
+        El canónico es el del alias o la primera forma del empleado en df (ver
+        nombre_canonico), así el resultado depende solo de df. Cada nombre distinto se
+        resuelve una sola vez; las filas toman su Id con una indexación vectorizada. Los
+        nombres vacíos quedan como están, con Id -1.
+
+        Args:
+            df: DataFrame con la columna de empleados
+            columna: Columna con el nombre del empleado
+
+        Returns:
+            DataFrame: df con los nombres unificados e Id_Empleado (int64)
+        """
+        import numpy as np
+        import pandas as pd
+
+        # factorize numera los nombres en orden de aparición: el primero visto de cada
+        # empleado es su forma canónica
+        codigos, nombres = pd.factorize(df[columna])
+        visto = {}
+        ids_nombres = [self.id_empleado(nombre) for nombre in nombres]
+        canonicos_nombres = [self.nombre_canonico(nombre, visto) for nombre in nombres]
+        # Código -1 (nombre vacío) toma el último elemento: el centinela
+        ids = np.array(ids_nombres + [-1], dtype=np.int64)[codigos]
+        canonicos = np.array(canonicos_nombres + [None], dtype=object)[codigos]
+        return df.assign(**{
+            columna: pd.Series(np.where(codigos >= 0, canonicos, df[columna].to_numpy()), index=df.index),
+            COLUMNA_ID_EMPLEADO: ids
+        })
+
+
+def clave_empleado(df, columna: str = "Empleado"):
+    """
+    Clave para agrupar o cruzar registros por empleado: el Id_Empleado entero si df ya pasó
+    por RegistroEmpleados.unificar, o el nombre tal cual si no
+
+    Los registros sin empleado (Id -1, o nombre vacío) quedan sin clave (NA), así groupby
+    los descarta igual que a un nombre vacío.
+
+    Args:
+        df: DataFrame con los registros
+        columna: Columna con el nombre del empleado
+
+    Returns:
+        Series: Clave por fila (Int64 con NA, o los nombres), con el índice de df
+    """
+    if COLUMNA_ID_EMPLEADO not in df.columns:
+        return df[columna]
+    ids = df[COLUMNA_ID_EMPLEADO].astype("Int64")
+    return ids.mask(ids < 0)
+
+
+_registro: Optional[RegistroEmpleados] = None
+_version_alias: Optional[int] = None
+_bloqueo_registro = threading.Lock()
+
+
+def _version_archivo_alias() -> Optional[int]:
+    """Fecha de modificación de alias_empleados.json en nanosegundos (None si no existe)"""
+    try:
+        return os.stat(ARCHIVO_ALIAS).st_mtime_ns
+    except OSError:
+        return None
+
+
+def obtener_registro() -> RegistroEmpleados:
+    """
+    Registro de empleados del proceso, creado al primer uso con los alias de alias_empleados.json
+
+    Si el archivo de alias cambia, sus alias se vuelven a leer (también en los procesos del
+    pool de parseo, que viven mucho tiempo). Los Id se asignan en orden de aparición y
+    valen mientras vive el proceso: un reinicio del servidor los vuelve a numerar, por eso
+    no se guardan en disco.
+    """
+    global _registro, _version_alias
+    version = _version_archivo_alias()
+    with _bloqueo_registro:
+        if _registro is None:
+            _registro = RegistroEmpleados(cargar_alias())
+        elif version != _version_alias:
+            _registro.actualizar_alias(cargar_alias())
+        _version_alias = version
+        return _registro
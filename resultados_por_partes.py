@@ -0,0 +1,106 @@
+"""
+Resultados de períodos grandes guardados por partes
+El cálculo por particiones (data_processor.procesar_por_particiones) vuelca cada partición
+terminada a un archivo temporal y a los totales y el resumen por empleado acumulados, y la
+descarta: nunca se arma la tabla completa de resultados en memoria. La tabla, el Excel y el
+almacén de períodos leen después las partes de a una.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import weakref
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from registro_empleados import clave_empleado
+
+# Columnas enteras de calcular_sueldos que se acumulan por empleado
+COLUMNAS_ACUMULADAS = ["_minutos_trabajados", "_minutos_normales", "_minutos_especiales", "_sueldo_centavos"]
+
+
+class ResultadosPorPartes:
+    """Resultados de un cálculo particionado: una parte en disco por partición procesada"""
+
+    def __init__(self):
+        self.directorio = tempfile.mkdtemp(prefix="resultados_")
+        # El directorio se borra cuando se descarta el objeto (ej: trabajo terminado olvidado)
+        self._finalizador = weakref.finalize(self, shutil.rmtree, self.directorio, True)
+        self.ruta_excel = os.path.join(self.directorio, "resultados.xlsx")
+        self.filas_por_parte = []
+        # Sumas por clave de empleado (Id_Empleado si los resultados lo traen) y su nombre
+        self._resumen: Optional[pd.DataFrame] = None
+        self._nombres = {}
+        self._huella = hashlib.sha1()
+
+    def __len__(self) -> int:
+        return sum(self.filas_por_parte)
+
+    @property
+    def huella(self) -> str:
+        """Huella del contenido de las partes agregadas (claves de vista y de exportación)"""
+        return self._huella.hexdigest()[:16]
+
+    def agregar(self, df_resultado: pd.DataFrame, columnas_internas) -> pd.DataFrame:
+        """
+        Acumula una partición calculada y la guarda en disco sin sus columnas internas
+
+        Args:
+            df_resultado: Resultado de calcular_sueldos de la partición
+            columnas_internas: Columnas que no se conservan en las filas guardadas
+
+        Returns:
+            DataFrame: Filas guardadas de la partición (para volcarlas al Excel)
+        """
+        empleado = clave_empleado(df_resultado)
+        sumas = df_resultado[COLUMNAS_ACUMULADAS].astype('int64').groupby(empleado).sum()
+        sumas.insert(0, "Registros", empleado.groupby(empleado).size())
+        self._nombres.update(df_resultado["Empleado"].groupby(empleado).first())
+        self._resumen = sumas if self._resumen is None else self._resumen.add(sumas, fill_value=0).astype('int64')
+
+        filas = df_resultado.drop(columns=columnas_internas)
+        filas.to_pickle(os.path.join(self.directorio, f"parte_{len(self.filas_por_parte)}.pkl"))
+        self.filas_por_parte.append(len(filas))
+        self._huella.update(pd.util.hash_pandas_object(filas.astype(str), index=False).to_numpy().tobytes())
+        return filas
+
+    def partes(self) -> Iterator[pd.DataFrame]:
+        """Lee las partes guardadas de a una, en el orden en que se agregaron"""
+        for numero in range(len(self.filas_por_parte)):
+            yield pd.read_pickle(os.path.join(self.directorio, f"parte_{numero}.pkl"))
+
+    def filas(self, desde: int, hasta: int) -> pd.DataFrame:
+        """
+        Filas [desde, hasta) del resultado, leyendo solo las partes que las contienen
+
+        Returns:
+            DataFrame: Filas pedidas
+        """
+        seleccion = []
+        inicio_parte = 0
+        for numero, cantidad in enumerate(self.filas_por_parte):
+            fin_parte = inicio_parte + cantidad
+            if fin_parte > desde and inicio_parte < hasta:
+                parte = pd.read_pickle(os.path.join(self.directorio, f"parte_{numero}.pkl"))
+                seleccion.append(parte.iloc[max(desde - inicio_parte, 0):hasta - inicio_parte])
+            inicio_parte = fin_parte
+        return pd.concat(seleccion) if seleccion else pd.DataFrame()
+
+    def resumen(self) -> pd.DataFrame:
+        """
+        Totales enteros acumulados por empleado, ordenados por nombre
+
+        Returns:
+            DataFrame: Empleado, Registros y COLUMNAS_ACUMULADAS (índice: clave del empleado)
+        """
+        if self._resumen is None:
+            return pd.DataFrame(columns=["Empleado", "Registros", *COLUMNAS_ACUMULADAS])
+        resumen = self._resumen.rename_axis(None)
+        resumen.insert(0, "Empleado", resumen.index.map(self._nombres))
+        return resumen.sort_values("Empleado", kind='stable')
+
+    def totales(self) -> dict:
+        """Sumas enteras de COLUMNAS_ACUMULADAS en todo el período"""
+        resumen = self.resumen()
+        return {columna: int(resumen[columna].sum()) for columna in COLUMNAS_ACUMULADAS}
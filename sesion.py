@@ -0,0 +1,70 @@
+"""
+Aislamiento por sesión
+Identifica la sesión de Streamlit de cada usuario y guarda en ella sus cachés, para que
+varios usuarios simultáneos no compartan ni se borren resultados entre sí
+"""
+from typing import Dict, Optional
+
+import streamlit as st
+
+# Sesión usada fuera de Streamlit (scripts, benchmarks)
+SESION_LOCAL = "local"
+
+# Entradas máximas por espacio de caché de una sesión
+MAX_ENTRADAS_CACHE = 4
+
+_CLAVE_CACHES = "_caches_sesion"
+
+
+def id_sesion() -> str:
+    """
+    Identificador de la sesión de Streamlit actual
+
+    Returns:
+        str: Id de la sesión, o SESION_LOCAL si no se ejecuta dentro de Streamlit
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    contexto = get_script_run_ctx()
+    return contexto.session_id if contexto else SESION_LOCAL
+
+
+def cache_sesion(espacio: str) -> Dict:
+    """
+    Caché de la sesión actual para un espacio (ej: "excel_resultados")
+
+    Vive en st.session_state: se libera al cerrar la sesión y no es visible para otros usuarios.
+
+    Args:
+        espacio: Nombre del espacio de caché
+
+    Returns:
+        Dict: Diccionario clave -> valor de ese espacio
+    """
+    return st.session_state.setdefault(_CLAVE_CACHES, {}).setdefault(espacio, {})
+
+
+def guardar_en_cache_sesion(espacio: str, clave, valor, max_entradas: int = MAX_ENTRADAS_CACHE):
+    """Guarda un valor en la caché de la sesión, descartando las entradas más antiguas del espacio"""
+    cache = cache_sesion(espacio)
+    cache.pop(clave, None)
+    cache[clave] = valor
+    while len(cache) > max_entradas:
+        cache.pop(next(iter(cache)))
+    return valor
+
+
+def limpiar_cache_sesion(espacio: Optional[str] = None):
+    """
+    Vacía las cachés de la sesión actual (todas o las de un espacio), sin afectar a otros usuarios
+
+    Args:
+        espacio: Espacio a vaciar (None = todos)
+    """
+    caches = st.session_state.get(_CLAVE_CACHES)
+    if not caches:
+        return
+    if espacio is None:
+        caches.clear()
+    else:
+        caches.pop(espacio, None)
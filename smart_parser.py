@@ -7,10 +7,21 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Optional
 import pandas as pd
 
+# Cualquier fecha seguida de una hora, en los formatos de patrones_fecha_hora. Sirve para
+# saber cuántas marcas tiene una línea sin probar cada patrón por separado
+_CUALQUIER_FECHA_HORA = re.compile(
+    r'(?:\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4}|\d{1,2}-\d{1,2}-\d{4})\s+\d{1,2}:\d{2}'
+)
+
 class SmartTimeParser:
     """Clase para parsing inteligente de fechas y horas"""
     
-    def __init__(self):
+    def __init__(self, patrones_fecha_hora: Optional[List[str]] = None):
+        """
+        Args:
+            patrones_fecha_hora: Subconjunto de patrones fecha+hora a usar (plan de un diseño conocido).
+                Por defecto se prueban todos.
+        """
         self.patrones_fecha = [
             r'(\d{4}-\d{2}-\d{2})',  # YYYY-MM-DD
             r'(\d{1,2}/\d{1,2}/\d{4})',  # DD/MM/YYYY o MM/DD/YYYY
@@ -32,6 +43,12 @@ class SmartTimeParser:
             r'(\d{1,2}-\d{1,2}-\d{4})\s+(\d{1,2}:\d{2}:\d{2})',  # DD-MM-YYYY HH:MM:SS
             r'(\d{1,2}-\d{1,2}-\d{4})\s+(\d{1,2}:\d{2})',  # DD-MM-YYYY HH:MM
         ]
+        if patrones_fecha_hora:
+            self.patrones_fecha_hora = [p for p in self.patrones_fecha_hora if p in patrones_fecha_hora]
+        
+        self._compilados_fecha_hora = [(patron, re.compile(patron)) for patron in self.patrones_fecha_hora]
+        # Patrones que produjeron resultados (para guardar el plan de extracción del diseño)
+        self.patrones_usados = set()
     
     def extraer_fecha_hora(self, texto: str) -> List[Dict]:
         """
@@ -46,8 +63,8 @@ class SmartTimeParser:
         resultados = []
         
         # Buscar patrones de fecha y hora juntas
-        for patron in self.patrones_fecha_hora:
-            matches = re.finditer(patron, texto)
+        for patron, compilado in self._compilados_fecha_hora:
+            matches = compilado.finditer(texto)
             for match in matches:
                 fecha_str = match.group(1)
                 hora_str = match.group(2)
@@ -56,6 +73,7 @@ class SmartTimeParser:
                 hora_normalizada = self.normalizar_hora(hora_str)
                 
                 if fecha_normalizada and hora_normalizada:
+                    self.patrones_usados.add(patron)
                     resultados.append({
                         'fecha': fecha_normalizada,
                         'hora': hora_normalizada,
@@ -65,6 +83,19 @@ class SmartTimeParser:
         
         return resultados
     
+    @staticmethod
+    def cantidad_fecha_hora(texto: str) -> int:
+        """
+        Cantidad de fechas con hora que contiene un texto según el conjunto completo de patrones
+        
+        Args:
+            texto: Texto a procesar
+            
+        Returns:
+            int: Marcas fecha+hora presentes en el texto
+        """
+        return len(_CUALQUIER_FECHA_HORA.findall(texto))
+    
     def normalizar_fecha(self, fecha_str: str) -> Optional[str]:
         """
         Normaliza diferentes formatos de fecha a YYYY-MM-DD
@@ -138,7 +169,12 @@ class SmartTimeParser:
 class EntradaSalidaDetector:
     """Clase para detectar automáticamente entrada y salida"""
     
-    def __init__(self):
+    def __init__(self, perfiles=None):
+        """
+        Args:
+            perfiles: PerfilesHorario opcional con el historial de cada empleado
+        """
+        self.perfiles = perfiles
         self.palabras_entrada = [
             'entrada', 'entry', 'in', 'inicio', 'start', 'llegada', 'ingreso'
         ]
@@ -146,7 +182,7 @@ class EntradaSalidaDetector:
             'salida', 'exit', 'out', 'fin', 'end', 'partida', 'egreso'
         ]
     
-    def detectar_tipo(self, texto: str, hora: str, context: List[str] = None) -> str:
+    def detectar_tipo(self, texto: str, hora: str, context: List[str] = None, empleado: str = None) -> str:
         """
         Detecta si una hora es entrada o salida
         
@@ -154,6 +190,7 @@ class EntradaSalidaDetector:
             texto: Texto que contiene la hora
             hora: Hora en formato HH:MM
             context: Contexto adicional (líneas anteriores/posteriores)
+            empleado: Empleado de la marca, para usar su perfil histórico si existe
             
         Returns:
             str: 'Entrada' o 'Salida'
@@ -169,6 +206,12 @@ class EntradaSalidaDetector:
             if palabra in texto_lower:
                 return 'Salida'
         
+        # Perfil histórico del empleado (si tiene suficientes datos)
+        if self.perfiles is not None and empleado:
+            tipo_perfil = self.perfiles.clasificar(empleado, hora)
+            if tipo_perfil:
+                return tipo_perfil
+        
         # Detección por hora (heurística)
         try:
             hora_obj = datetime.strptime(hora, '%H:%M').time()
@@ -215,16 +258,18 @@ class EntradaSalidaDetector:
 class DataGrouper:
     """Clase para agrupar datos por empleado y fecha"""
     
-    def agrupar_por_empleado_fecha(self, datos: List[Dict]) -> List[Dict]:
+    def agrupar_por_empleado_fecha(self, datos: List[Dict], perfiles=None) -> List[Dict]:
         """
         Agrupa datos por empleado y fecha, combinando entradas y salidas
         
         LÓGICA CORREGIDA:
         - Primera hora del día = Entrada
         - Segunda hora del día = Salida
+        - Marca única: se ubica como Salida solo si el perfil histórico del empleado lo indica
         
         Args:
             datos: Lista de datos con empleado, fecha, hora, tipo
+            perfiles: PerfilesHorario opcional para clasificar marcas únicas
             
         Returns:
             List[Dict]: Datos agrupados
@@ -258,6 +303,9 @@ class DataGrouper:
             # Si solo hay UNA hora, significa que falta la salida
             if len(horas_ordenadas) == 1:
                 salida_final = '0:00'  # Marcar como faltante
+                # Salvo que el historial del empleado indique que la marca es una salida
+                if perfiles is not None and perfiles.clasificar(grupo['empleado'], entrada_final) == 'Salida':
+                    entrada_final, salida_final = '0:00', horas_ordenadas[0]
             else:
                 salida_final = horas_ordenadas[1]  # Segunda hora
             
@@ -0,0 +1,104 @@
+import sqlite3
+
+import pandas as pd
+
+from almacen_periodos import (
+    cargar_marcaciones, cargar_resultados, guardar_periodo, listar_periodos, resumen_acumulado
+)
+
+
+def _marcaciones(descuento=0):
+    return pd.DataFrame({
+        "Empleado": ["Ana Perez", "Juan Gomez"],
+        "Fecha": pd.to_datetime(["2024-03-01", "2024-03-01"]),
+        "Entrada": ["09:00", "10:00"],
+        "Salida": ["18:00", "19:00"],
+        "Descuento Inventario": [descuento, 0],
+    })
+
+
+def _resultados(sueldo):
+    return [
+        {"Empleado": "Ana Perez", "Fecha": "2024-03-01", "Entrada": "09:00", "Salida": "18:00",
+         "Horas Trabajadas (h:mm)": "9:00", "Horas Normales": "9:00", "Horas Especiales": "0:00",
+         "_sueldo_centavos": sueldo, "Id_Registro": -7},
+    ]
+
+
+def test_guardar_mismo_periodo_actualiza_la_fila(tmp_path):
+    ruta = str(tmp_path / "periodos.sqlite")
+    primero = guardar_periodo(_marcaciones(), _resultados(900), 100, [], "marzo", ruta=ruta)
+    segundo = guardar_periodo(_marcaciones(descuento=50), _resultados(1350), 150, [], "marzo", ruta=ruta)
+
+    assert primero == segundo
+    periodos = listar_periodos(ruta)
+    assert len(periodos) == 1
+    assert periodos.loc[0, "valor_por_hora"] == 150
+    assert periodos.loc[0, "registros"] == 2
+    assert cargar_resultados(primero, ruta)["sueldo_centavos"].tolist() == [1350]
+    assert cargar_marcaciones(primero, ruta)["Descuento Inventario"].tolist() == [50, 0]
+
+
+def test_ids_de_registro_se_guardan_y_se_recuperan(tmp_path):
+    ruta = str(tmp_path / "periodos.sqlite")
+    marcaciones = _marcaciones().assign(Id_Registro=[2 ** 62, -5])
+    periodo_id = guardar_periodo(marcaciones, _resultados(900), 100, [], ruta=ruta)
+
+    assert cargar_marcaciones(periodo_id, ruta)["Id_Registro"].tolist() == [2 ** 62, -5]
+    assert cargar_resultados(periodo_id, ruta)["id_registro"].tolist() == [-7]
+
+
+def test_periodo_sin_ids_no_inventa_columna(tmp_path):
+    ruta = str(tmp_path / "periodos.sqlite")
+    periodo_id = guardar_periodo(_marcaciones(), _resultados(900), 100, [], ruta=ruta)
+    assert "Id_Registro" not in cargar_marcaciones(periodo_id, ruta).columns
+
+
+def test_otros_feriados_son_otro_periodo(tmp_path):
+    ruta = str(tmp_path / "periodos.sqlite")
+    primero = guardar_periodo(_marcaciones(), _resultados(900), 100, [], ruta=ruta)
+    segundo = guardar_periodo(_marcaciones(), _resultados(1800), 100, ["2024-03-01"], ruta=ruta)
+
+    assert primero != segundo
+    assert len(listar_periodos(ruta)) == 2
+
+
+def test_base_anterior_se_migra_y_acumula_en_centavos(tmp_path):
+    ruta = str(tmp_path / "periodos.sqlite")
+    conexion = sqlite3.connect(ruta)
+    conexion.executescript("""
+        CREATE TABLE periodos (id INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT NOT NULL,
+            creado TEXT NOT NULL, fecha_desde TEXT, fecha_hasta TEXT, valor_por_hora REAL,
+            feriados TEXT, firma TEXT UNIQUE);
+        CREATE TABLE resultados (periodo_id INTEGER NOT NULL, empleado TEXT NOT NULL,
+            fecha TEXT NOT NULL, entrada TEXT, salida TEXT, feriado TEXT,
+            minutos_trabajados INTEGER, minutos_normales INTEGER, minutos_especiales INTEGER,
+            descuento_inventario REAL, descuento_caja REAL, retiro REAL, sueldo_final REAL,
+            observaciones TEXT);
+        CREATE TABLE marcaciones (periodo_id INTEGER NOT NULL, empleado TEXT NOT NULL,
+            fecha TEXT NOT NULL, entrada TEXT, salida TEXT, descuento_inventario REAL DEFAULT 0,
+            descuento_caja REAL DEFAULT 0, retiro REAL DEFAULT 0);
+        INSERT INTO periodos VALUES (1, 'viejo', '2024-01-01', '2024-01-01', '2024-01-01', 100, '[]', 'x');
+        INSERT INTO resultados VALUES (1, 'Ana Perez', '2024-01-01', '09:00', '18:00', 'No',
+            540, 540, 0, 0, 0, 0, 900.1, NULL);
+    """)
+    conexion.close()
+
+    guardar_periodo(_marcaciones(), _resultados(90020), 100, [], ruta=ruta)
+
+    assert cargar_resultados(1, ruta)["sueldo_centavos"].tolist() == [90010]
+    assert cargar_resultados(1, ruta)["id_registro"].isna().all()
+    acumulado = resumen_acumulado("2024-01-01", "2024-12-31", ruta)
+    assert acumulado["sueldo_centavos"].tolist() == [90010 + 90020]
+
+
+def test_acumulado_une_escrituras_del_mismo_empleado(tmp_path):
+    ruta = str(tmp_path / "periodos.sqlite")
+    guardar_periodo(_marcaciones(), _resultados(900), 100, [], "marzo", ruta=ruta)
+    abril = [dict(_resultados(500)[0], Empleado="PEREZ, ANA", Fecha="2024-04-01")]
+    guardar_periodo(_marcaciones().assign(Fecha=pd.to_datetime(["2024-04-01"] * 2)), abril, 100, [], "abril", ruta=ruta)
+
+    acumulado = resumen_acumulado("2024-01-01", "2024-12-31", ruta)
+    assert acumulado["empleado"].tolist() == ["PEREZ, ANA"]
+    assert acumulado["sueldo_centavos"].tolist() == [1400]
+    assert acumulado["dias"].tolist() == [2]
@@ -0,0 +1,68 @@
+import pandas as pd
+
+from anomalias import COLUMNAS_ANOMALIAS, detectar_anomalias
+
+
+def _registros(entradas, salidas=None, empleado="Ana Perez", **columnas):
+    dias = len(entradas)
+    return pd.DataFrame({
+        "Empleado": [empleado] * dias,
+        "Fecha": pd.date_range("2024-03-01", periods=dias, freq="D"),
+        "Entrada": entradas,
+        "Salida": salidas or ["18:00"] * dias,
+        **columnas,
+    })
+
+
+def _indicadores(anomalias):
+    return list(zip(anomalias["Fecha"], anomalias["Indicador"]))
+
+
+def test_periodo_vacio():
+    anomalias = detectar_anomalias(_registros([]))
+    assert anomalias.empty
+    assert list(anomalias.columns) == COLUMNAS_ANOMALIAS
+
+
+def test_entrada_fuera_del_horario_reciente():
+    entradas = ["09:00", "09:05", "08:55", "09:00", "09:10", "09:00", "15:00", "09:05"]
+    anomalias = detectar_anomalias(_registros(entradas, ["18:00"] * 6 + ["23:59", "18:00"]))
+    assert ("2024-03-07", "Horario de entrada") in _indicadores(anomalias)
+    fila = anomalias[anomalias["Indicador"] == "Horario de entrada"].iloc[0]
+    assert fila["Valor"] == "15:00"
+    assert fila["Habitual"].startswith("~09:0")
+
+
+def test_entradas_alrededor_de_la_medianoche_no_son_atipicas():
+    entradas = ["23:50", "00:05", "23:55", "00:10", "23:58", "00:02", "23:52", "00:08", "23:57", "00:04"]
+    anomalias = detectar_anomalias(_registros(entradas, ["08:00"] * len(entradas)))
+    assert "Horario de entrada" not in anomalias["Indicador"].tolist()
+
+
+def test_entrada_de_dia_se_detecta_en_turno_nocturno():
+    entradas = ["23:50", "00:05", "23:55", "00:10", "23:58", "00:02", "12:00"]
+    anomalias = detectar_anomalias(_registros(entradas, ["08:00"] * 6 + ["20:00"]))
+    fila = anomalias[anomalias["Indicador"] == "Horario de entrada"].iloc[0]
+    assert fila["Fecha"] == "2024-03-07"
+    assert fila["Habitual"].startswith("~00:0") or fila["Habitual"].startswith("~23:5")
+
+
+def test_turno_mucho_mas_largo_que_lo_habitual():
+    salidas = ["18:00"] * 7 + ["23:30"]
+    anomalias = detectar_anomalias(_registros(["09:00"] * 8, salidas))
+    assert _indicadores(anomalias) == [("2024-03-08", "Duración del turno")]
+
+
+def test_descuento_inusualmente_alto_conserva_id_registro():
+    descuentos = [100, 120, 90, 110, 100, 105, 5000]
+    df = _registros(["09:00"] * 7, **{"Descuento Caja": descuentos, "Id_Registro": range(10, 17)})
+    anomalias = detectar_anomalias(df)
+    fila = anomalias[anomalias["Indicador"] == "Descuento Caja"]
+    assert fila["Id_Registro"].tolist() == [16]
+    assert fila.index.tolist() == [6]
+
+
+def test_empleados_se_evaluan_por_separado():
+    ana = _registros(["09:00"] * 6, empleado="Ana Perez")
+    juan = _registros(["21:00"] * 6, ["23:59"] * 6, empleado="Juan Gomez")
+    assert detectar_anomalias(pd.concat([ana, juan], ignore_index=True)).empty
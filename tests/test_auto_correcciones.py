@@ -0,0 +1,84 @@
+"""
+Pruebas del motor de autocorrección de marcas únicas (auto_correcciones.py)
+"""
+import pandas as pd
+
+from auto_correcciones import REGLAS_POR_DEFECTO, HORARIO_LOCAL_POR_DEFECTO, aplicar_reglas_autocorreccion
+from calculations import serie_hora_a_minutos
+from pdf_processor import detectar_registros_incompletos
+
+
+def _registros(filas):
+    return pd.DataFrame(filas, columns=["Empleado", "Fecha", "Entrada", "Salida"])
+
+
+def _aplicar(df):
+    incompletos = detectar_registros_incompletos(df)
+    return aplicar_reglas_autocorreccion(df, incompletos, REGLAS_POR_DEFECTO, HORARIO_LOCAL_POR_DEFECTO)
+
+
+def test_serie_hora_a_minutos():
+    minutos = serie_hora_a_minutos(pd.Series(["08:30", "8:05:59", "22.15", "sin hora", None]))
+    assert minutos.iloc[:3].tolist() == [510, 485, 1335]
+    assert minutos.iloc[3:].isna().all()
+
+
+def test_entrada_se_completa_con_la_salida_mediana_del_empleado():
+    df = _registros([
+        ["Ana", "2024-10-01", "09:00", "17:00"],
+        ["Ana", "2024-10-02", "09:00", "18:00"],
+        ["Ana", "2024-10-03", "09:00", "19:00"],
+        ["Ana", "2024-10-04", "09:10", "0:00"],
+    ])
+    autocorregidos, pendientes = _aplicar(df)
+
+    assert pendientes.empty
+    fila = autocorregidos.loc[3]
+    assert (fila["Entrada"], fila["Salida"]) == ("09:10", "18:00")
+    assert fila["Auto_Correccion"] == REGLAS_POR_DEFECTO[0]["nombre"]
+
+
+def test_sin_historial_usa_el_horario_del_local():
+    df = _registros([["Beto", "2024-10-01", "0:00", "21:00"]])
+    autocorregidos, pendientes = _aplicar(df)
+
+    assert pendientes.empty
+    assert (autocorregidos.iloc[0]["Entrada"], autocorregidos.iloc[0]["Salida"]) == ("10:30", "21:00")
+
+
+def test_turno_fuera_de_duracion_queda_pendiente():
+    # Salida a las 15:00 con apertura 10:30 y un historial que entra a las 14:30: 0:30 h < 2 h
+    df = _registros([
+        ["Caro", "2024-10-01", "14:30", "20:00"],
+        ["Caro", "2024-10-02", "0:00", "15:00"],
+    ])
+    autocorregidos, pendientes = _aplicar(df)
+
+    assert autocorregidos.empty
+    assert pendientes.index.tolist() == [1]
+
+
+def test_tabla_de_correcciones_por_id_de_registro():
+    from auto_correcciones import aplicar_tabla_correcciones
+
+    df = _registros([
+        ["Ana", "2024-10-01", "09:00", "0:00"],
+        ["Ana", "2024-10-02", "09:00", "18:00"],
+        ["Juan", "2024-10-01", "0:00", "17:00"],
+    ]).assign(Id_Registro=[30, 10, 20]).set_axis([5, 6, 7])
+    correcciones = pd.DataFrame({"Salida": ["18:30", "19:00"], "Nota": ["a", "b"]}, index=[30, 99])
+
+    corregido = aplicar_tabla_correcciones(df, correcciones, "Id_Registro")
+
+    assert corregido["Salida"].tolist() == ["18:30", "18:00", "17:00"]
+    assert corregido["Nota"].tolist()[0] == "a" and corregido["Nota"].iloc[1:].isna().all()
+    assert df.loc[5, "Salida"] == "0:00"
+    assert aplicar_tabla_correcciones(df, correcciones.iloc[1:], "Id_Registro") is df
+
+
+def test_tabla_de_correcciones_por_indice():
+    from auto_correcciones import aplicar_tabla_correcciones
+
+    df = _registros([["Ana", "2024-10-01", "09:00", "0:00"], ["Juan", "2024-10-01", "0:00", "17:00"]])
+    corregido = aplicar_tabla_correcciones(df, pd.DataFrame({"Entrada": ["08:00"]}, index=[1]))
+    assert corregido["Entrada"].tolist() == ["09:00", "08:00"]
@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+from data_processor import calcular_sueldos
+from politicas import cargar_politicas
+
+
+@pytest.fixture
+def politicas(tmp_path):
+    """Política por defecto (10:30-22:00, banda 20:00-22:00 ×1.3, feriado ×2)"""
+    return cargar_politicas(str(tmp_path / "sin_politicas.json"))
+
+
+def _registros(*turnos):
+    return pd.DataFrame({
+        "Empleado": ["Ana Perez"] * len(turnos),
+        "Fecha": [fecha for fecha, _, _ in turnos],
+        "Entrada": [entrada for _, entrada, _ in turnos],
+        "Salida": [salida for _, _, salida in turnos],
+        "Descuento Inventario": [0] * len(turnos),
+        "Descuento Caja": [0] * len(turnos),
+        "Retiro": [0] * len(turnos),
+    })
+
+
+def test_turno_diurno(politicas):
+    resultado = calcular_sueldos(_registros(("2024-03-01", "12:00", "21:00")), 1000, set(), politicas)
+    fila = resultado.iloc[0]
+    assert fila["_minutos_trabajados"] == 9 * 60
+    assert fila["_minutos_especiales"] == 60
+    # 8 h × 1000 + 1 h × 1300
+    assert fila["_sueldo_centavos"] == 930000
+
+
+def test_salida_despues_de_la_medianoche_se_recorta_al_fin_laboral(politicas):
+    resultado = calcular_sueldos(
+        _registros(("2024-03-01", "18:00", "23:30"), ("2024-03-01", "18:00", "00:30"), ("2024-03-01", "18:00", "08:00")),
+        1000, set(), politicas
+    )
+    # Salir más tarde nunca paga más que la ventana (10:30-22:00): 4 h, 2 de ellas en banda
+    assert resultado["Horas Trabajadas (h:mm)"].tolist() == ["4:00", "4:00", "4:00"]
+    assert resultado["_sueldo_centavos"].tolist() == [2 * 100000 + 2 * 130000] * 3
+
+
+def test_salida_despues_del_fin_laboral_se_recorta(politicas):
+    resultado = calcular_sueldos(_registros(("2024-03-01", "18:00", "23:30")), 1000, set(), politicas)
+    assert resultado.iloc[0]["_minutos_trabajados"] == 4 * 60
+
+
+def test_entrada_fuera_de_horario_no_se_paga(politicas):
+    resultado = calcular_sueldos(_registros(("2024-03-01", "08:00", "12:00")), 1000, set(), politicas)
+    fila = resultado.iloc[0]
+    assert fila["_sueldo_centavos"] == 0
+    assert fila["Observaciones"].startswith("Fuera de horario laboral")
+
+
+def test_feriado_solo_en_el_tramo_de_su_dia(politicas):
+    politicas["grupos"]["general"].update({"inicio_laboral": "18:00", "fin_laboral": "06:00"})
+    feriados = {pd.Timestamp("2024-03-02").date()}
+    resultado = calcular_sueldos(_registros(("2024-03-01", "20:00", "02:00")), 1000, feriados, politicas)
+    fila = resultado.iloc[0]
+    assert fila["Feriado"] == "Sí"
+    # 2 h de banda el día 1 (×1.3) + 2 h normales el día 1 + 2 h el día 2 feriado (×2)
+    assert fila["_sueldo_centavos"] == 2 * 130000 + 2 * 100000 + 2 * 200000
+
+
+def test_ventana_nocturna_recorta_al_fin_del_dia_siguiente(politicas):
+    politicas["grupos"]["general"].update({"inicio_laboral": "18:00", "fin_laboral": "06:00"})
+    resultado = calcular_sueldos(_registros(("2024-03-01", "18:00", "08:00")), 1000, set(), politicas)
+    assert resultado.iloc[0]["_minutos_trabajados"] == 12 * 60
+
+
+def test_resultado_conserva_id_registro(politicas):
+    registros = _registros(("2024-03-01", "12:00", "21:00"), ("2024-03-02", "12:00", "21:00"))
+    registros["Id_Registro"] = [123, -456]
+    resultado = calcular_sueldos(registros, 1000, set(), politicas)
+    assert resultado["Id_Registro"].tolist() == [123, -456]
+
+
+def test_turno_que_pasa_la_medianoche_no_es_ambiguo(politicas):
+    from pdf_processor import detectar_horarios_ambiguos
+    from perfiles_empleados import PerfilesHorario
+
+    df = _registros(("2024-03-01", "18:00", "00:30"), ("2024-03-01", "12:00", "09:00"))
+    ambiguos = detectar_horarios_ambiguos(df, perfiles=PerfilesHorario(), politicas=politicas)
+
+    assert ambiguos["Entrada"].tolist() == ["12:00"]
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from calculations import (
+    a_centavos, escalar_redondeando, factor_a_puntos_basicos, minutos_a_horasminutos,
+    minutos_en_franja, serie_a_centavos, turnos_absolutos
+)
+
+
+def test_escalar_redondeando_redondea_la_mitad_hacia_arriba():
+    assert escalar_redondeando([5, 15, 14], 1, 10).tolist() == [1, 2, 1]
+    assert escalar_redondeando([0], 13000, 10000).tolist() == [0]
+
+
+def test_escalar_redondeando_sin_desborde():
+    grande = 2 ** 40
+    resultado = escalar_redondeando([grande], 2 ** 30, 2 ** 30)
+    assert resultado.tolist() == [grande]
+
+
+def test_factores_y_centavos_exactos():
+    assert factor_a_puntos_basicos(1.3) == 13000
+    assert a_centavos("150.005") == 15001
+    assert a_centavos(0.1 + 0.2) == 30
+
+
+def test_turnos_absolutos_cruzan_la_medianoche():
+    fechas = pd.Series(pd.to_datetime(["2024-03-01", "2024-03-02"]))
+    dia, inicio, fin = turnos_absolutos(fechas, np.array([18 * 60, 9 * 60]), np.array([8 * 60, 17 * 60]))
+    assert dia.tolist() == [0, 1]
+    assert (fin - inicio).tolist() == [14 * 60, 8 * 60]
+
+
+def test_minutos_en_franja_nocturna():
+    # Turno 18:00-08:00 contra la franja 22:00-06:00
+    assert minutos_en_franja(np.array([18 * 60]), np.array([32 * 60]), 22 * 60, 6 * 60).tolist() == [8 * 60]
+
+
+def test_minutos_a_horasminutos():
+    assert minutos_a_horasminutos([0, 61, -90]).tolist() == ["0:00", "1:01", "-1:30"]
+
+
+def test_serie_a_centavos_exacta():
+    serie = pd.Series([150.005, "0.015", None, "abc", -2.675, 1.005, 19.99, float("inf")])
+    assert serie_a_centavos(serie).tolist() == [15001, 2, 0, 0, -268, 101, 1999, 0]
+    assert serie_a_centavos(serie).dtype == np.int64
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from data_processor import calcular_en_trabajo
+from politicas import cargar_politicas
+from trabajos import TERMINADO, Trabajo, TrabajoCancelado
+
+
+@pytest.fixture
+def politicas(tmp_path):
+    return cargar_politicas(str(tmp_path / "sin_politicas.json"))
+
+
+def _registros():
+    return pd.DataFrame({
+        "Empleado": ["Ana Perez"] * 3 + ["Juan Gomez"],
+        "Fecha": ["2024-03-01"] * 4,
+        "Entrada": ["12:00", "12:05", "12:10", "12:00"],
+        "Salida": ["21:00", "21:00", "21:05", "21:00"],
+        "Descuento Inventario": [0] * 4,
+        "Descuento Caja": [0] * 4,
+        "Retiro": [0] * 4,
+    })
+
+
+def test_calculo_en_trabajo_guarda_avisos_sin_mostrarlos(politicas):
+    trabajo = Trabajo(calcular_en_trabajo, (_registros(), 1000, set(), politicas), {}, None, "", "s")
+    trabajo._ejecutar()
+
+    assert trabajo.estado == TERMINADO
+    resultados = trabajo.resultado["salida"][0]
+    assert [r["Empleado"] for r in resultados] == ["Ana Perez", "Ana Perez", "Juan Gomez"]
+    avisos = trabajo.resultado["avisos"]
+    assert [tipo for tipo, _ in avisos] == ["info"]
+    assert "Ana Perez - 2024-03-01" in avisos[0][1]
+
+
+def test_calculo_en_trabajo_atiende_la_cancelacion(politicas):
+    trabajo = Trabajo(calcular_en_trabajo, (), {}, None, "", "s")
+    trabajo.cancelar()
+
+    with pytest.raises(TrabajoCancelado):
+        calcular_en_trabajo(trabajo, _registros(), 1000, set(), politicas)
@@ -0,0 +1,138 @@
+import io
+
+import formatos_reloj
+from formatos_reloj import (
+    FORMATO_GENERICO, decodificar_texto, elegir_formato, extraer_marcaciones, extraer_marcaciones_lineas,
+    formatos_registrados, registrar_formato
+)
+
+ZKTECO = [
+    "  101\tAna Perez\t2024-10-01 08:02:11\t1\t0",
+    "  101\tAna Perez\t2024-10-01 17:05:40\t1\t1",
+    "  102\tJuan Gomez\t2024-10-01 09:00:00\t1\t0",
+    "  102\tJuan Gomez\t2024-10-01 18:30:00\t1\t1",
+]
+
+ZKTECO_SOLO_LEGAJO = [
+    "1 2024/10/01 08:02:11 1 0",
+    "1 2024/10/01 17:05:40 1 1",
+    "2 2024/10/01 09:00 1 0",
+]
+
+CSV = [
+    "Nombre;Fecha;Hora;Estado",
+    "Ana Perez;01/10/2024;08:02;Entrada",
+    "Ana Perez;01/10/2024;17:05;Salida",
+    "Juan Gomez;2024-10-01;9.00;",
+]
+
+TEXTO_LIBRE = [
+    "REPORTE DE ASISTENCIA",
+    "Empleado: Ana Perez",
+    "01/10/2024 08:02 Entrada",
+    "01/10/2024 17:05 Salida",
+]
+
+
+def _resumen(datos):
+    return [(d["empleado"], d["fecha"], d["hora"], d["tipo"]) for d in datos]
+
+
+def test_elegir_formato():
+    assert elegir_formato(ZKTECO) == "zkteco"
+    assert elegir_formato(ZKTECO_SOLO_LEGAJO) == "zkteco"
+    assert elegir_formato(["", "\f"] + CSV) == "csv"
+    assert elegir_formato(TEXTO_LIBRE) == FORMATO_GENERICO
+    assert elegir_formato([]) == FORMATO_GENERICO
+
+
+def test_formatos_se_prueban_por_prioridad():
+    orden = formatos_registrados()
+    assert orden.index("zkteco") < orden.index("csv") < orden.index(FORMATO_GENERICO)
+    assert orden[-1] == FORMATO_GENERICO
+
+
+def test_zkteco_con_nombre_y_estado():
+    datos, plan = extraer_marcaciones_lineas(ZKTECO)
+    assert plan["formato"] == "zkteco"
+    assert _resumen(datos) == [
+        ("Ana Perez", "2024-10-01", "08:02", "Entrada"),
+        ("Ana Perez", "2024-10-01", "17:05", "Salida"),
+        ("Juan Gomez", "2024-10-01", "09:00", "Entrada"),
+        ("Juan Gomez", "2024-10-01", "18:30", "Salida"),
+    ]
+    assert all(d["confianza"] == 1.0 for d in datos)
+
+
+def test_zkteco_sin_nombre_usa_el_legajo():
+    datos, _ = extraer_marcaciones_lineas(ZKTECO_SOLO_LEGAJO)
+    assert _resumen(datos) == [
+        ("1", "2024-10-01", "08:02", "Entrada"),
+        ("1", "2024-10-01", "17:05", "Salida"),
+        ("2", "2024-10-01", "09:00", "Entrada"),
+    ]
+
+
+def test_csv_con_fecha_y_hora_separadas():
+    datos, plan = extraer_marcaciones_lineas(CSV)
+    assert plan["formato"] == "csv"
+    assert plan["estructura"]["delimitador"] == ";"
+    assert _resumen(datos) == [
+        ("Ana Perez", "2024-10-01", "08:02", "Entrada"),
+        ("Ana Perez", "2024-10-01", "17:05", "Salida"),
+        # Sin tipo: se estima por la hora
+        ("Juan Gomez", "2024-10-01", "09:00", "Entrada"),
+    ]
+
+
+def test_csv_con_fecha_y_hora_juntas():
+    lineas = ["Employee,DateTime,Status", "Ana Perez,2024-10-01 08:02:59,C/In", "Ana Perez,2024-10-01 13:30,C/Out"]
+    datos, _ = extraer_marcaciones_lineas(lineas)
+    assert _resumen(datos) == [
+        ("Ana Perez", "2024-10-01", "08:02", "Entrada"),
+        ("Ana Perez", "2024-10-01", "13:30", "Salida"),
+    ]
+
+
+def test_plan_guardado_evita_detectar_el_formato():
+    _, plan = extraer_marcaciones_lineas(CSV)
+    datos, plan_nuevo = extraer_marcaciones_lineas(CSV[:1] + ["Sofia Lopez;02/10/2024;10:00;Entrada"], plan)
+    assert plan_nuevo == plan
+    assert _resumen(datos) == [("Sofia Lopez", "2024-10-02", "10:00", "Entrada")]
+
+
+def test_formato_especifico_sin_datos_recurre_al_texto_libre(monkeypatch):
+    monkeypatch.setitem(formatos_reloj._FORMATOS, "vacio", {
+        "prioridad": -1, "sniff": lambda muestra: True, "extraer": lambda lineas, estructura, progreso: []
+    })
+    assert elegir_formato(TEXTO_LIBRE) == "vacio"
+
+    datos, plan = extraer_marcaciones_lineas(TEXTO_LIBRE)
+    assert plan["formato"] == FORMATO_GENERICO
+    assert ("2024-10-01", "08:02") in [(d["fecha"], d["hora"]) for d in datos]
+
+
+def test_registrar_formato_y_sniff_que_falla(monkeypatch):
+    monkeypatch.setattr(formatos_reloj, "_FORMATOS", dict(formatos_reloj._FORMATOS))
+
+    @registrar_formato("roto", prioridad=-2, sniff=lambda muestra: 1 / 0)
+    def _extraer_roto(lineas, estructura, progreso=None):
+        return []
+
+    assert formatos_registrados()[0] == "roto"
+    assert elegir_formato(ZKTECO) == "zkteco"
+
+
+def test_decodificar_texto():
+    texto = "Nombre;Fecha\nMaría Núñez;01/10/2024"
+    assert decodificar_texto(texto.encode("utf-16")) == texto
+    assert decodificar_texto(texto.encode("utf-8-sig")) == texto
+    assert decodificar_texto(texto.encode("cp1252")) == texto
+
+
+def test_extraer_marcaciones_de_archivo_de_texto():
+    archivo = io.BytesIO("\n".join(CSV).encode("utf-16"))
+    archivo.name = "reloj.CSV"
+    datos = extraer_marcaciones(archivo)
+    assert len(datos) == 3
+    assert {d["archivo"] for d in datos} == {"reloj.CSV"}
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from identificadores import COLUMNA_ID, asignar_id_registro, ids_registro
+
+
+def _registros():
+    return pd.DataFrame({
+        "Empleado": ["Ana Perez", "Ana Perez", "Juan Gomez"],
+        "Fecha": ["2024-03-01", "2024-03-01", "2024-03-01"],
+        "Entrada": ["09:00", "09:00", "10:00"],
+        "Salida": ["18:00", "18:00", "19:00"],
+    })
+
+
+def test_ids_unicos_aunque_los_registros_se_repitan():
+    ids = asignar_id_registro(_registros(), "marzo.xlsx")[COLUMNA_ID]
+    assert ids.dtype == "int64"
+    assert ids.is_unique
+
+
+def test_ids_estables_al_filtrar_u_ordenar():
+    df = asignar_id_registro(_registros(), "marzo.xlsx")
+    otra_lectura = asignar_id_registro(_registros(), "marzo.xlsx")
+    assert df[COLUMNA_ID].tolist() == otra_lectura[COLUMNA_ID].tolist()
+
+    filtrado = df[df["Empleado"] == "Juan Gomez"].sort_values("Fecha").reset_index(drop=True)
+    assert filtrado.loc[0, COLUMNA_ID] == df.loc[2, COLUMNA_ID]
+
+
+def test_ids_dependen_del_origen():
+    marzo = asignar_id_registro(_registros(), "marzo.xlsx")[COLUMNA_ID]
+    abril = asignar_id_registro(_registros(), "abril.xlsx")[COLUMNA_ID]
+    assert set(marzo).isdisjoint(abril)
+
+
+def test_ids_existentes_se_conservan():
+    df = _registros().assign(**{COLUMNA_ID: [1, 2, 3]})
+    assert asignar_id_registro(df, "otro")[COLUMNA_ID].tolist() == [1, 2, 3]
+
+
+def test_ids_registro_sin_columna_usa_el_indice():
+    df = _registros().set_axis([10, 11, 12])
+    assert ids_registro(df).tolist() == [10, 11, 12]
@@ -0,0 +1,47 @@
+import ingesta_pdf
+from ingesta_pdf import ingerir_pdfs
+from trabajos import TERMINADO, Trabajo
+
+
+def _marcacion(hora):
+    return {"empleado": "Ana Perez", "fecha": "2024-03-01", "hora": hora}
+
+
+def test_fusion_en_orden_de_carga_aunque_terminen_desordenados(monkeypatch):
+    def terminados_al_reves(archivos, progreso=None):
+        for posicion in reversed(range(1, len(archivos) + 1)):
+            yield posicion, f"{posicion}.pdf", [_marcacion("09:00"), _marcacion(f"1{posicion}:00")], None, []
+
+    monkeypatch.setattr(ingesta_pdf, "procesar_pdfs_en_paralelo", terminados_al_reves)
+    archivos = [("1.pdf", b""), ("2.pdf", b""), ("3.pdf", b"")]
+    trabajo = Trabajo(ingerir_pdfs, (archivos,), {}, None, "", "s")
+    trabajo._ejecutar()
+
+    assert trabajo.estado == TERMINADO
+    resultado = trabajo.resultado
+    assert [m["hora"] for m in resultado["marcaciones"]] == ["09:00", "11:00", "12:00", "13:00"]
+    assert {(s["archivo"], s["archivo_original"]) for s in resultado["solapamientos"]} == {
+        ("2.pdf", "1.pdf"), ("3.pdf", "1.pdf")
+    }
+    assert [r["posicion"] for r in resultado["archivos"]] == [1, 2, 3]
+
+
+def test_error_de_lectura_vuelve_como_aviso():
+    marcaciones, error, avisos = ingesta_pdf._extraer_marcaciones_archivo("roto.pdf", b"no es un pdf")
+
+    assert marcaciones == [] and error is None
+    assert [tipo for tipo, _ in avisos] == ["error"]
+    assert "Error extrayendo texto del PDF" in avisos[0][1]
+
+
+def test_paginas_escaneadas_sin_tesseract_avisan(monkeypatch):
+    import ocr_fallback
+    import pdf_backends
+    from pdf_processor import extraer_texto_pdf
+
+    monkeypatch.setattr(pdf_backends, "extraer_paginas_texto", lambda archivo, progreso=None: ["", "Empleado: Ana"])
+    monkeypatch.setattr(ocr_fallback, "ruta_tesseract", lambda: None)
+    avisos = []
+
+    assert "Empleado: Ana" in extraer_texto_pdf(object(), avisos=avisos)
+    assert avisos == [("warning", " 1 página(s) parecen escaneadas (sin texto). Instala Tesseract OCR para procesarlas.")]
@@ -0,0 +1,24 @@
+import os
+import stat
+
+import ocr_fallback
+
+
+def test_ocr_imagenes_en_orden_y_con_cache(tmp_path, monkeypatch):
+    llamadas = tmp_path / "llamadas"
+    binario = tmp_path / "tesseract"
+    binario.write_text(f'#!/bin/sh\necho x >> "{llamadas}"\ncat\n')
+    binario.chmod(binario.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("TESSERACT_CMD", str(binario))
+    monkeypatch.setattr(ocr_fallback, "DIRECTORIO_CACHE_OCR", str(tmp_path / "cache"))
+
+    assert ocr_fallback.ocr_imagenes([b"pagina 1", b"pagina 2"]) == ["pagina 1", "pagina 2"]
+    assert ocr_fallback.ocr_imagenes([b"pagina 2", b"pagina 1"]) == ["pagina 2", "pagina 1"]
+    assert llamadas.read_text().count("x") == 2
+    assert len(os.listdir(tmp_path / "cache")) == 2
+
+
+def test_sin_tesseract(monkeypatch):
+    monkeypatch.delenv("TESSERACT_CMD", raising=False)
+    monkeypatch.setattr(ocr_fallback.shutil, "which", lambda _: None)
+    assert ocr_fallback.ocr_imagenes([b"pagina"]) is None
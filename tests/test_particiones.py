@@ -0,0 +1,78 @@
+import openpyxl
+import pandas as pd
+import pytest
+
+import data_processor
+from almacen_periodos import cargar_resultados, guardar_periodo
+from data_processor import _resumen_por_empleado, detectar_y_resolver_marcaciones_duplicadas, procesar_datos_excel
+from politicas import cargar_politicas
+from resultados_por_partes import ResultadosPorPartes
+
+EMPLEADOS = ["Ana Perez", "Juan Gomez", "Luis Diaz", "Marta Ruiz", "Paz", "Sofia Lopez"]
+
+
+@pytest.fixture
+def politicas(tmp_path):
+    return cargar_politicas(str(tmp_path / "sin_politicas.json"))
+
+
+def _periodo(dias=10):
+    filas = []
+    for numero, empleado in enumerate(EMPLEADOS):
+        for dia in range(1, dias + 1):
+            filas.append({
+                "Empleado": empleado, "Fecha": f"2024-03-{dia:02d}",
+                "Entrada": f"{11 + numero % 3}:00", "Salida": "21:30",
+                "Descuento Inventario": 0, "Descuento Caja": 0, "Retiro": 0,
+            })
+    return pd.DataFrame(filas)
+
+
+def test_periodo_particionado_acumula_sin_unir_las_partes(politicas, monkeypatch):
+    df = _periodo()
+    completo = procesar_datos_excel(df, 1000, None, set(), 0, politicas, avisos=[])
+
+    monkeypatch.setattr(data_processor, "FILAS_POR_PARTICION", 15)
+    particionado = procesar_datos_excel(df, 1000, None, set(), 0, politicas, avisos=[])
+    resultados = particionado[0]
+
+    assert isinstance(resultados, ResultadosPorPartes)
+    assert len(resultados.filas_por_parte) > 1
+    assert len(resultados) == len(completo[0])
+    assert particionado[1:] == completo[1:]
+
+    resumen_completo = _resumen_por_empleado(pd.DataFrame(completo[0]))
+    pd.testing.assert_frame_equal(_resumen_por_empleado(resultados), resumen_completo, check_dtype=False)
+
+    hoja = openpyxl.load_workbook(resultados.ruta_excel).active
+    assert hoja.max_row == len(resultados) + 1
+    assert len(resultados.filas(5, 40)) == 35
+
+
+def test_guardar_periodo_particionado_guarda_todas_las_partes(politicas, monkeypatch, tmp_path):
+    df = _periodo()
+    monkeypatch.setattr(data_processor, "FILAS_POR_PARTICION", 15)
+    resultados, _, total_sueldos, _, _ = procesar_datos_excel(df, 1000, None, set(), 0, politicas, avisos=[])
+
+    ruta = str(tmp_path / "periodos.sqlite")
+    periodo_id = guardar_periodo(df, resultados, 1000, [], ruta=ruta)
+
+    guardados = cargar_resultados(periodo_id, ruta)
+    assert len(guardados) == len(df)
+    assert guardados["sueldo_centavos"].sum() == total_sueldos * 100
+
+
+def test_tres_marcaciones_casi_iguales_quedan_en_dos():
+    df = pd.DataFrame({
+        "Empleado": ["Ana Perez"] * 3 + ["Juan Gomez"],
+        "Fecha": ["2024-03-01"] * 4,
+        "Entrada": ["12:00", "12:05", "12:10", "12:00"],
+        "Salida": ["21:00", "21:00", "21:05", "21:00"],
+    })
+    resueltas = []
+    resultado = detectar_y_resolver_marcaciones_duplicadas(df, resueltas=resueltas)
+
+    assert resueltas == ["Ana Perez - 2024-03-01"]
+    ana = resultado[resultado["Empleado"] == "Ana Perez"]
+    assert ana[["Entrada", "Salida"]].values.tolist() == [["12:00", "21:05"], ["12:05", "21:00"]]
+    assert resultado[resultado["Empleado"] == "Juan Gomez"].index.tolist() == [3]
@@ -0,0 +1,29 @@
+import pytest
+
+import pdf_backends
+from pdf_backends import BackendPDFNoDisponible, elegir_backend
+
+
+@pytest.fixture
+def instalados(monkeypatch):
+    def instalar(*nombres):
+        monkeypatch.setattr(pdf_backends, "_disponible", lambda nombre: nombre in nombres)
+    monkeypatch.delenv("PDF_BACKEND", raising=False)
+    return instalar
+
+
+def test_pdfplumber_es_el_predeterminado(instalados):
+    instalados("pdfplumber", "pypdfium2", "PyPDF2")
+    assert elegir_backend() == "pdfplumber"
+
+
+def test_pypdfium2_solo_si_se_pide(instalados, monkeypatch):
+    instalados("pdfplumber", "pypdfium2")
+    monkeypatch.setenv("PDF_BACKEND", "pypdfium2")
+    assert elegir_backend() == "pypdfium2"
+
+
+def test_sin_backends(instalados):
+    instalados()
+    with pytest.raises(BackendPDFNoDisponible):
+        elegir_backend()
@@ -0,0 +1,133 @@
+import json
+
+import pandas as pd
+
+import perfiles_empleados
+from perfiles_empleados import PerfilesHorario
+
+
+def _periodo(desde, dias, entrada="09:00", salida="18:00", empleado="Ana Perez"):
+    fechas = pd.date_range(desde, periods=dias, freq="D")
+    return pd.DataFrame({
+        "Empleado": [empleado] * dias,
+        "Fecha": fechas,
+        "Entrada": [entrada] * dias,
+        "Salida": [salida] * dias,
+    })
+
+
+def test_clave_periodo_usa_origen_y_rango_de_fechas():
+    df = _periodo("2024-03-01", 10)
+    assert PerfilesHorario.clave_periodo(df, "marzo.xlsx") == "marzo.xlsx|2024-03-01|2024-03-10"
+
+
+def test_registrar_mismo_periodo_no_duplica_conteos():
+    perfiles = PerfilesHorario()
+    df = _periodo("2024-03-01", 10)
+
+    assert perfiles.registrar_periodo(df, "a")
+    assert not perfiles.registrar_periodo(df, "a")
+    assert sum(perfiles.histogramas["ana perez"]["Entrada"]) == 10
+
+
+def test_periodo_editado_reemplaza_su_aporte():
+    perfiles = PerfilesHorario()
+    perfiles.registrar_periodo(_periodo("2024-03-01", 10), "a")
+    assert perfiles.registrar_periodo(_periodo("2024-03-01", 10, entrada="10:00"), "a")
+
+    entradas = perfiles.histogramas["ana perez"]["Entrada"]
+    assert sum(entradas) == 10
+    assert entradas[PerfilesHorario._bin("09:00")] == 0
+    assert entradas[PerfilesHorario._bin("10:00")] == 10
+
+
+def test_se_descuenta_el_periodo_mas_antiguo(monkeypatch):
+    monkeypatch.setattr(perfiles_empleados, "MAX_PERIODOS_REGISTRADOS", 2)
+    perfiles = PerfilesHorario()
+    perfiles.registrar_periodo(_periodo("2024-01-01", 5, empleado="Ana Perez"), "enero")
+    perfiles.registrar_periodo(_periodo("2024-02-01", 5, empleado="Juan Gomez"), "febrero")
+    perfiles.registrar_periodo(_periodo("2024-03-01", 5, empleado="Juan Gomez"), "marzo")
+
+    assert list(perfiles.periodos) == ["febrero", "marzo"]
+    assert not perfiles.tiene_perfil("Ana Perez")
+    assert sum(perfiles.histogramas["gomez juan"]["Entrada"]) == 10
+
+
+def test_guardar_y_cargar(tmp_path):
+    ruta = tmp_path / "perfiles.json"
+    perfiles = PerfilesHorario()
+    perfiles.registrar_periodo(_periodo("2024-03-01", 10), "a")
+    perfiles.guardar(str(ruta))
+
+    cargados = PerfilesHorario.cargar(str(ruta))
+    assert cargados.histogramas == perfiles.histogramas
+    assert not cargados.registrar_periodo(_periodo("2024-03-01", 10), "a")
+    assert [p.name for p in tmp_path.iterdir()] == ["perfiles.json"]
+
+
+def test_cargar_formato_anterior_conserva_histogramas(tmp_path):
+    ruta = tmp_path / "perfiles.json"
+    histogramas = {"Ana Perez": {"Entrada": [1] * perfiles_empleados.CANTIDAD_BINS,
+                                 "Salida": [0] * perfiles_empleados.CANTIDAD_BINS}}
+    ruta.write_text(json.dumps({
+        "minutos_por_bin": perfiles_empleados.MINUTOS_POR_BIN,
+        "histogramas": histogramas,
+        "periodos_registrados": ["abc"],
+    }))
+
+    cargados = PerfilesHorario.cargar(str(ruta))
+    assert cargados.histogramas == {"ana perez": histogramas["Ana Perez"]}
+    assert cargados.periodos == {}
+
+
+def test_escrituras_del_nombre_comparten_perfil():
+    perfiles = PerfilesHorario()
+    perfiles.registrar_periodo(_periodo("2024-03-01", 5, empleado="Juan Pérez"), "a")
+    perfiles.registrar_periodo(_periodo("2024-04-01", 5, empleado="PEREZ JUAN"), "b")
+
+    assert list(perfiles.histogramas) == ["juan perez"]
+    assert sum(perfiles.histogramas["juan perez"]["Entrada"]) == 10
+    assert perfiles.clasificar("perez, juan", "09:00") == "Entrada"
+
+
+def test_cargar_perfiles_por_nombre_une_escrituras(tmp_path):
+    ruta = tmp_path / "perfiles.json"
+    ceros = [0] * perfiles_empleados.CANTIDAD_BINS
+    ruta.write_text(json.dumps({
+        "minutos_por_bin": perfiles_empleados.MINUTOS_POR_BIN,
+        "histogramas": {"Juan Pérez": {"Entrada": [1] + ceros[1:], "Salida": ceros},
+                        "PEREZ JUAN": {"Entrada": [2] + ceros[1:], "Salida": ceros}},
+        "periodos": {"a": {"Juan Pérez": {"Entrada": {"0": 1}, "Salida": {}}}},
+    }))
+
+    cargados = PerfilesHorario.cargar(str(ruta))
+    assert cargados.histogramas["juan perez"]["Entrada"][0] == 3
+    assert cargados.periodos == {"a": {"juan perez": {"Entrada": {"0": 1}, "Salida": {}}}}
+
+
+def test_obtener_perfiles_recarga_si_el_archivo_cambia(tmp_path, monkeypatch):
+    import os
+
+    ruta = tmp_path / "perfiles.json"
+    monkeypatch.setattr(perfiles_empleados, "ARCHIVO_PERFILES", str(ruta))
+    monkeypatch.setattr(perfiles_empleados, "_perfiles_cargados", None)
+    assert perfiles_empleados.obtener_perfiles().histogramas == {}
+
+    # Otro proceso guarda perfiles nuevos
+    otros = PerfilesHorario()
+    otros.registrar_periodo(_periodo("2024-03-01", 10), "a")
+    otros.guardar(str(ruta))
+    os.utime(ruta, ns=(1, 10 ** 18))
+
+    assert perfiles_empleados.obtener_perfiles().tiene_perfil("Ana Perez")
+
+
+def test_detector_usa_el_perfil_con_el_nombre_sin_normalizar():
+    from smart_parser import EntradaSalidaDetector
+
+    perfiles = PerfilesHorario()
+    perfiles.registrar_periodo(_periodo("2024-03-01", 10, entrada="15:00", salida="23:00", empleado="Juan Pérez"), "a")
+    detector = EntradaSalidaDetector(perfiles=perfiles)
+
+    assert detector.detectar_tipo("2024-03-11 15:00", "15:00", empleado="PEREZ, JUAN") == "Entrada"
+    assert detector.detectar_tipo("2024-03-11 23:00", "23:00", empleado="PEREZ, JUAN") == "Salida"
@@ -0,0 +1,60 @@
+import json
+
+import cache_disenos
+from pdf_processor import extraer_datos_segun_estructura
+from smart_parser import SmartTimeParser
+
+PATRON_BARRAS = r'(\d{1,2}/\d{1,2}/\d{4})\s+(\d{1,2}:\d{2})'
+PATRON_ISO = r'(\d{4}-\d{2}-\d{2})\s+(\d{1,2}:\d{2})'
+
+
+def test_cantidad_fecha_hora():
+    assert SmartTimeParser.cantidad_fecha_hora("01/03/2024 09:00 01/03/2024 18:00") == 2
+    assert SmartTimeParser.cantidad_fecha_hora("2024-03-01 09:00:00") == 1
+    assert SmartTimeParser.cantidad_fecha_hora("Total 9:00") == 0
+
+
+def test_plan_guardado_no_pierde_marcas_de_otro_formato():
+    lineas = ["Empleado: Ana Perez", "01/03/2024 09:00", "2024-03-02 18:00"]
+    estructura = {"patrones_fecha_hora": [PATRON_BARRAS]}
+
+    datos = extraer_datos_segun_estructura(lineas, estructura)
+
+    assert [(d["fecha"], d["hora"]) for d in datos] == [("2024-03-01", "09:00"), ("2024-03-02", "18:00")]
+    # El plan se amplía con el patrón que faltaba
+    assert PATRON_BARRAS in estructura["patrones_fecha_hora"]
+    assert PATRON_ISO in estructura["patrones_fecha_hora"]
+
+
+def test_plan_que_cubre_el_documento_no_cambia():
+    estructura = {"patrones_fecha_hora": [PATRON_BARRAS]}
+    datos = extraer_datos_segun_estructura(["Empleado: Ana Perez", "01/03/2024 09:00"], estructura)
+
+    assert len(datos) == 1
+    assert estructura == {"patrones_fecha_hora": [PATRON_BARRAS]}
+
+
+def test_guardar_plan_reemplaza_el_archivo(tmp_path, monkeypatch):
+    ruta = tmp_path / "disenos.json"
+    monkeypatch.setattr(cache_disenos, "ARCHIVO_DISENOS", str(ruta))
+    monkeypatch.setattr(cache_disenos, "_planes", {})
+
+    cache_disenos.guardar_plan("abc", {"modo": "texto"})
+    cache_disenos.guardar_plan("def", {"modo": "tabla"})
+
+    assert json.loads(ruta.read_text()) == {"abc": {"modo": "texto"}, "def": {"modo": "tabla"}}
+    assert [p.name for p in tmp_path.iterdir()] == ["disenos.json"]
+
+
+def test_planes_guardados_por_otro_proceso_se_leen(tmp_path, monkeypatch):
+    import os
+
+    ruta = tmp_path / "disenos.json"
+    monkeypatch.setattr(cache_disenos, "ARCHIVO_DISENOS", str(ruta))
+    monkeypatch.setattr(cache_disenos, "_planes", None)
+    assert cache_disenos.obtener_plan("abc") is None
+
+    ruta.write_text(json.dumps({"abc": {"modo": "texto"}}))
+    os.utime(ruta, ns=(1, 10 ** 18))
+
+    assert cache_disenos.obtener_plan("abc") == {"modo": "texto"}
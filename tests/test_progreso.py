@@ -0,0 +1,26 @@
+import pytest
+
+from progreso import Progreso, subrango
+from trabajos import Trabajo, TrabajoCancelado
+
+
+def test_informes_limitados_pero_el_avance_llega_siempre():
+    llamadas = []
+    avance = Progreso(lambda porcentaje, mensaje: llamadas.append((porcentaje, mensaje)), 4, "Filas", cada=1,
+                      intervalo=3600)
+    for _ in range(4):
+        avance.avanzar()
+
+    assert [porcentaje for porcentaje, _ in llamadas] == [25, 50, 75, 100]
+    assert [mensaje for _, mensaje in llamadas] == ["Filas: 1/4", None, None, "Filas: 4/4"]
+
+
+def test_cancelacion_se_atiende_entre_informes():
+    trabajo = Trabajo(lambda t: None, (), {}, None, "", "s")
+    avance = Progreso(subrango(trabajo.informar, 0, 80), 100, "Filas", cada=1, intervalo=3600)
+    avance.avanzar()
+    assert trabajo.mensaje == "Filas: 1/100"
+
+    trabajo.cancelar()
+    with pytest.raises(TrabajoCancelado):
+        avance.avanzar()
@@ -0,0 +1,97 @@
+import pandas as pd
+
+from data_processor import detectar_y_resolver_marcaciones_duplicadas
+from identificadores import COLUMNA_ID, asignar_id_registro
+from registro_empleados import COLUMNA_ID_EMPLEADO, RegistroEmpleados, clave_empleado, normalizar_nombre
+
+
+def test_normalizar_nombre_ignora_acentos_mayusculas_signos_y_orden():
+    assert normalizar_nombre("PÉREZ,  Juan") == "juan perez"
+    assert normalizar_nombre("juan   perez") == "juan perez"
+    assert normalizar_nombre("Núñez-Ana") == "ana nunez"
+    assert normalizar_nombre("Paz") == "paz"
+
+
+def test_unificar_asigna_un_id_y_un_nombre_por_empleado():
+    registro = RegistroEmpleados()
+    df = pd.DataFrame({"Empleado": ["Juan Pérez", "PEREZ JUAN", "Ana Gomez", "juan  perez"]})
+    unificado = registro.unificar(df)
+
+    assert unificado["Empleado"].tolist() == ["Juan Pérez", "Juan Pérez", "Ana Gomez", "Juan Pérez"]
+    assert unificado[COLUMNA_ID_EMPLEADO].tolist() == [0, 0, 1, 0]
+    assert len(registro) == 2
+    assert df["Empleado"].tolist()[1] == "PEREZ JUAN"
+
+
+def test_nombre_canonico_no_depende_de_lo_visto_antes():
+    registro = RegistroEmpleados()
+    registro.unificar(pd.DataFrame({"Empleado": ["PEREZ JUAN"]}))
+    df = pd.DataFrame({"Empleado": ["Juan Pérez", "PEREZ JUAN"]})
+
+    assert registro.unificar(df)["Empleado"].tolist() == ["Juan Pérez", "Juan Pérez"]
+    assert RegistroEmpleados().unificar(df)["Empleado"].tolist() == ["Juan Pérez", "Juan Pérez"]
+
+
+def test_id_registro_no_depende_de_la_escritura_mostrada():
+    df = pd.DataFrame({"Empleado": ["Juan Pérez"], "Fecha": ["2024-03-01"], "Entrada": ["09:00"], "Salida": ["18:00"]})
+    visto_antes = RegistroEmpleados()
+    visto_antes.unificar(pd.DataFrame({"Empleado": ["PEREZ JUAN"]}))
+
+    ids = asignar_id_registro(visto_antes.unificar(df), "a.xlsx")[COLUMNA_ID]
+    assert ids.tolist() == asignar_id_registro(RegistroEmpleados().unificar(df), "a.xlsx")[COLUMNA_ID].tolist()
+    assert ids.tolist() == asignar_id_registro(df.assign(Empleado="PEREZ, Juan"), "a.xlsx")[COLUMNA_ID].tolist()
+
+
+def test_unificar_resuelve_alias_y_deja_vacios_sin_id():
+    registro = RegistroEmpleados({"Juanca": "Juan Carlos Pérez"})
+    unificado = registro.unificar(pd.DataFrame({"Empleado": ["juanca", None, "Juan Carlos Perez"]}))
+
+    assert unificado["Empleado"].tolist()[::2] == ["Juan Carlos Pérez", "Juan Carlos Pérez"]
+    assert unificado["Empleado"].isna().tolist() == [False, True, False]
+    assert unificado[COLUMNA_ID_EMPLEADO].tolist() == [0, -1, 0]
+
+
+def test_clave_empleado_usa_el_id_y_descarta_los_vacios():
+    registro = RegistroEmpleados()
+    unificado = registro.unificar(pd.DataFrame({"Empleado": ["Ana", None, "ANA"]}))
+    clave = clave_empleado(unificado)
+    assert clave.iloc[[0, 2]].tolist() == [0, 0]
+    assert clave.isna().tolist() == [False, True, False]
+
+    sin_unificar = pd.DataFrame({"Empleado": ["Ana", "ANA"]})
+    assert clave_empleado(sin_unificar).tolist() == ["Ana", "ANA"]
+
+
+def test_duplicados_se_agrupan_por_id_empleado():
+    df = pd.DataFrame({
+        "Empleado": ["Ana Perez", "ana perez", "ANA PEREZ"],
+        COLUMNA_ID_EMPLEADO: [7, 7, 7],
+        "Fecha": ["2024-03-01"] * 3,
+        "Entrada": ["12:00", "12:05", "12:10"],
+        "Salida": ["21:00", "21:00", "21:05"],
+    })
+    resueltas = []
+    resultado = detectar_y_resolver_marcaciones_duplicadas(df, resueltas=resueltas)
+
+    assert resueltas == ["Ana Perez - 2024-03-01"]
+    assert len(resultado) == 2
+
+
+def test_obtener_registro_relee_los_alias_si_cambia_el_archivo(tmp_path, monkeypatch):
+    import json
+    import os
+
+    import registro_empleados
+
+    ruta = tmp_path / "alias.json"
+    monkeypatch.setattr(registro_empleados, "ARCHIVO_ALIAS", str(ruta))
+    monkeypatch.setattr(registro_empleados, "_registro", None)
+    registro = registro_empleados.obtener_registro()
+    id_juan = registro.id_empleado("Juan Carlos Pérez")
+    assert registro.clave("Juanca") == "juanca"
+
+    ruta.write_text(json.dumps({"alias": {"Juanca": "Juan Carlos Pérez"}}))
+    os.utime(ruta, ns=(1, 10 ** 18))
+
+    assert registro_empleados.obtener_registro() is registro
+    assert registro.id_empleado("Juanca") == id_juan
@@ -0,0 +1,289 @@
+"""
+Trabajos en segundo plano
+Ejecuta el procesamiento largo fuera del script de Streamlit, con identificador, progreso real,
+resultados parciales y cancelación, para que la interfaz siga respondiendo mientras tanto.
+Los recursos se comparten entre todas las sesiones del servidor: los trabajos (lectura de PDFs
+y cálculo de sueldos) se atienden por turnos entre sesiones y el parseo usa un único pool de
+procesos acotado.
+"""
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+# Trabajos ejecutándose a la vez entre todas las sesiones (el resto espera en cola)
+MAX_TRABAJOS_SIMULTANEOS = int(os.environ.get("MAX_TRABAJOS_SIMULTANEOS", 2))
+
+# Procesos del pool compartido de parseo (por defecto la cantidad de núcleos)
+MAX_PROCESOS = int(os.environ.get("MAX_PROCESOS", 0)) or os.cpu_count() or 1
+
+# Trabajos terminados que se conservan para reutilizar su resultado
+MAX_TRABAJOS_TERMINADOS = 20
+
+PENDIENTE = "pendiente"
+EN_CURSO = "en_curso"
+TERMINADO = "terminado"
+CANCELADO = "cancelado"
+ERROR = "error"
+
+
+class TrabajoCancelado(BaseException):
+    """
+    Se lanza dentro del trabajo cuando el usuario pidió cancelarlo
+
+    Hereda de BaseException (como KeyboardInterrupt) para que los `except Exception` de los
+    parsers no la confundan con un error del archivo y la cancelación llegue hasta el trabajo.
+    """
+
+
+class Trabajo:
+    """Estado de un trabajo en segundo plano, compartido entre el hilo que lo ejecuta y la interfaz"""
+
+    def __init__(self, funcion: Callable, args: tuple, kwargs: Dict, clave: Optional[str], descripcion: str,
+                 sesion: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.clave = clave
+        self.sesion = sesion
+        self.descripcion = descripcion
+        self.estado = PENDIENTE
+        self.progreso = 0.0
+        self.mensaje = "En cola..."
+        self.parcial: Any = None
+        self.resultado: Any = None
+        self.error: Optional[str] = None
+        self.creado = time.time()
+        self.iniciado: Optional[float] = None
+        self.finalizado: Optional[float] = None
+        self._funcion = funcion
+        self._args = args
+        self._kwargs = kwargs
+        self._cancelar = threading.Event()
+
+    @property
+    def activo(self) -> bool:
+        """True mientras el trabajo está en cola o ejecutándose"""
+        return self.estado in (PENDIENTE, EN_CURSO)
+
+    @property
+    def cancelacion_solicitada(self) -> bool:
+        """True si se pidió cancelar el trabajo"""
+        return self._cancelar.is_set()
+
+    def informar(self, progreso: float, mensaje: Optional[str] = None, parcial: Any = None):
+        """
+        Actualiza el progreso desde el trabajo; es también el punto donde se atiende la cancelación
+
+        Args:
+            progreso: Porcentaje de 0 a 100
+            mensaje: Texto descriptivo de la etapa actual (con el tiempo restante si
+                     lo informa un Progreso, ver progreso.py)
+            parcial: Resultado parcial disponible hasta el momento
+
+        Raises:
+            TrabajoCancelado: Si el usuario pidió cancelar el trabajo
+        """
+        if self._cancelar.is_set():
+            raise TrabajoCancelado()
+        self.progreso = max(0.0, min(100.0, float(progreso)))
+        if mensaje is not None:
+            self.mensaje = mensaje
+        if parcial is not None:
+            self.parcial = parcial
+
+    def cancelar(self):
+        """Pide la cancelación; el trabajo se detiene en su próximo informe de progreso"""
+        self._cancelar.set()
+        if self.estado == PENDIENTE:
+            self.estado = CANCELADO
+            self.finalizado = time.time()
+
+    def _ejecutar(self):
+        """Ejecuta la función del trabajo (en un hilo del pool)"""
+        if self._cancelar.is_set():
+            self.estado = CANCELADO
+            return
+
+        self.estado = EN_CURSO
+        self.iniciado = time.time()
+        self.mensaje = "Procesando..."
+        try:
+            self.resultado = self._funcion(self, *self._args, **self._kwargs)
+            self.progreso = 100.0
+            self.estado = TERMINADO
+        except TrabajoCancelado:
+            self.estado = CANCELADO
+        except Exception as e:
+            self.error = str(e)
+            self.estado = ERROR
+        finally:
+            self.finalizado = time.time()
+
+
+_pool = ThreadPoolExecutor(max_workers=MAX_TRABAJOS_SIMULTANEOS, thread_name_prefix="trabajo")
+_trabajos: Dict[str, Trabajo] = {}
+_bloqueo = threading.Lock()
+
+# Cola justa: trabajos pendientes por sesión y orden de turnos entre sesiones
+_pendientes: Dict[str, Deque[Trabajo]] = {}
+_turnos: Deque[str] = deque()
+
+_pool_procesos: Optional[ProcessPoolExecutor] = None
+_bloqueo_procesos = threading.Lock()
+
+
+def clave_entrada(*partes) -> str:
+    """
+    Huella de los datos de entrada de un trabajo, para reutilizar el resultado si se repiten
+
+    Args:
+        *partes: Bytes, textos o valores que identifican la entrada
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    huella = hashlib.sha1()
+    for parte in partes:
+        huella.update(parte if isinstance(parte, bytes) else repr(parte).encode('utf-8'))
+        huella.update(b'\0')
+    return huella.hexdigest()
+
+
+def _descartar_antiguos():
+    """Olvida los trabajos terminados más antiguos por encima de MAX_TRABAJOS_TERMINADOS"""
+    terminados = sorted((t for t in _trabajos.values() if not t.activo), key=lambda t: t.finalizado or t.creado)
+    for trabajo in terminados[:max(0, len(terminados) - MAX_TRABAJOS_TERMINADOS)]:
+        del _trabajos[trabajo.id]
+
+
+def _siguiente_trabajo() -> Optional[Trabajo]:
+    """
+    Toma el próximo trabajo pendiente por turnos entre sesiones: una sesión con muchos
+    trabajos en cola no demora a las demás más de un trabajo por turno
+    """
+    with _bloqueo:
+        while _turnos:
+            sesion = _turnos.popleft()
+            cola = _pendientes.get(sesion)
+            if not cola:
+                _pendientes.pop(sesion, None)
+                continue
+            trabajo = cola.popleft()
+            if cola:
+                _turnos.append(sesion)
+            else:
+                del _pendientes[sesion]
+            return trabajo
+        return None
+
+
+def _atender_cola():
+    """Ejecuta (en un hilo del pool) el trabajo al que le toca el turno"""
+    trabajo = _siguiente_trabajo()
+    if trabajo is not None:
+        trabajo._ejecutar()
+
+
+def enviar_trabajo(funcion: Callable, *args, clave: Optional[str] = None, descripcion: str = "",
+                   sesion: Optional[str] = None, **kwargs) -> Trabajo:
+    """
+    Encola un trabajo en segundo plano, o devuelve el existente con la misma clave
+
+    La función recibe el Trabajo como primer argumento y debe llamar a trabajo.informar()
+    periódicamente para reportar progreso y permitir la cancelación.
+
+    Args:
+        funcion: Función a ejecutar, funcion(trabajo, *args, **kwargs)
+        clave: Huella de la entrada (clave_entrada); si la sesión ya tiene un trabajo activo
+               o terminado con esa clave se reutiliza en lugar de volver a procesar
+        descripcion: Texto para mostrar en la interfaz
+        sesion: Sesión que envía el trabajo (por defecto sesion.id_sesion()); la cola
+                atiende a las sesiones por turnos
+
+    Returns:
+        Trabajo: Trabajo encolado o reutilizado
+    """
+    if sesion is None:
+        from sesion import id_sesion
+        sesion = id_sesion()
+
+    with _bloqueo:
+        if clave:
+            for trabajo in _trabajos.values():
+                if (trabajo.clave == clave and trabajo.sesion == sesion
+                        and trabajo.estado in (PENDIENTE, EN_CURSO, TERMINADO)):
+                    return trabajo
+
+        trabajo = Trabajo(funcion, args, kwargs, clave, descripcion, sesion)
+        _trabajos[trabajo.id] = trabajo
+        _descartar_antiguos()
+
+        _pendientes.setdefault(sesion, deque()).append(trabajo)
+        if sesion not in _turnos:
+            _turnos.append(sesion)
+
+    _pool.submit(_atender_cola)
+    return trabajo
+
+
+def obtener_trabajo(trabajo_id: Optional[str]) -> Optional[Trabajo]:
+    """Devuelve un trabajo por su identificador (None si no existe o ya fue descartado)"""
+    return _trabajos.get(trabajo_id) if trabajo_id else None
+
+
+def cancelar_trabajo(trabajo_id: Optional[str]) -> bool:
+    """
+    Pide cancelar un trabajo
+
+    Returns:
+        bool: True si el trabajo existía y estaba activo
+    """
+    trabajo = obtener_trabajo(trabajo_id)
+    if trabajo is None or not trabajo.activo:
+        return False
+    trabajo.cancelar()
+    return True
+
+
+def reiniciar_trabajo(trabajo_id: Optional[str]) -> Optional[Trabajo]:
+    """
+    Cancela un trabajo (si sigue activo) y encola uno nuevo con la misma función y datos
+
+    Returns:
+        Trabajo: Nuevo trabajo, o None si el original no existe
+    """
+    trabajo = obtener_trabajo(trabajo_id)
+    if trabajo is None:
+        return None
+
+    trabajo.cancelar()
+    with _bloqueo:
+        # Quitar el original para que el nuevo trabajo no lo reutilice por su clave
+        _trabajos.pop(trabajo.id, None)
+    return enviar_trabajo(trabajo._funcion, *trabajo._args, clave=trabajo.clave,
+                          descripcion=trabajo.descripcion, sesion=trabajo.sesion, **trabajo._kwargs)
+
+
+def pool_procesos() -> ProcessPoolExecutor:
+    """
+    Pool de procesos compartido por todas las sesiones para el parseo de archivos
+
+    Se crea al primer uso con MAX_PROCESOS procesos y se recrea si un proceso murió.
+
+    Returns:
+        ProcessPoolExecutor: Pool compartido
+    """
+    global _pool_procesos
+    with _bloqueo_procesos:
+        if _pool_procesos is None or getattr(_pool_procesos, "_broken", False):
+            _pool_procesos = ProcessPoolExecutor(max_workers=MAX_PROCESOS)
+        return _pool_procesos
+
+
+def procesos_por_trabajo() -> int:
+    """Procesos del pool compartido que puede ocupar a la vez un mismo trabajo"""
+    return max(1, MAX_PROCESOS // MAX_TRABAJOS_SIMULTANEOS)
+
@@ -147,7 +147,7 @@ def mostrar_subida_archivo():
         excel_selected = st.button("Archivo Excel", use_container_width=True, help="Datos estructurados tradicionales")
     
     with col2:
-        pdf_selected = st.button(" Archivos PDF (Hasta 2)", use_container_width=True, help="Procesamiento inteligente automático - Períodos quincenales")
+        pdf_selected = st.button(" Archivos PDF", use_container_width=True, help="Procesamiento inteligente automático - Sin límite de archivos")
     
     # Mantener selección en session state
     if excel_selected:
@@ -181,30 +181,25 @@ def mostrar_subida_archivo():
         st.markdown("""
         <div class="custom-alert alert-warning">
             <strong> Modo Inteligente PDF Activado - Períodos Quincenales</strong><br>
-            Sube hasta 2 PDFs (uno por cada quincena). El sistema los ordenará automáticamente por fecha.
+            Sube todos los PDFs del período (quincenas, locales o exportaciones superpuestas). El sistema los procesa en paralelo, elimina marcaciones repetidas y los ordena automáticamente por fecha.
         </div>
         """, unsafe_allow_html=True)
         
         st.markdown("""
         <div class="custom-alert alert-info">
-            <strong>💡</strong> Añade por orden los PDFs (primera a segunda quincena). 
+            <strong>💡</strong> Si dos PDFs repiten días, cada marcación se cuenta una sola vez. 
         </div>
         """, unsafe_allow_html=True)
         
         # Subida de archivos múltiples
         archivos = st.file_uploader(
-            "Sube tus archivos PDF (máximo 2 quincenas):",
-            type=["pdf"],
+            "Sube tus archivos PDF (o exportaciones del reloj en CSV/TXT):",
+            type=["pdf", "csv", "txt", "dat"],
             accept_multiple_files=True,
-            help="PDFs con información de empleados y horarios. Ejemplo: 1-15 octubre y 16-31 octubre",
+            help="PDFs con información de empleados y horarios, o exportaciones de texto del reloj (ej: ZKTeco, CSV). Ejemplo: 1-15 octubre y 16-31 octubre",
             key="pdf_uploader"
         )
         
-        # Validar que no se suban más de 2 archivos
-        if archivos and len(archivos) > 2:
-            st.error(" Máximo 2 archivos PDF permitidos (uno por cada quincena)")
-            return None, "pdf"
-        
         # Mostrar información de archivos subidos de forma compacta
         if archivos:
             # Crear lista compacta de archivos
@@ -233,6 +228,86 @@ def mostrar_subida_archivo():
         return archivos, "pdf"
 
 
+def mostrar_autocorreccion_registros(df_con_asistencia, df_incompletos):
+    """
+    Aplica las reglas de autocorrección a los registros incompletos y muestra el resumen de auditoría.
+    Solo las excepciones que ninguna regla pudo resolver quedan para revisión manual.
+
+    Args:
+        df_con_asistencia: DataFrame con todos los registros con asistencia
+        df_incompletos: DataFrame con registros incompletos
+
+    Returns:
+        tuple: (df_con_asistencia_actualizado, df_pendientes)
+    """
+    from auto_correcciones import aplicar_reglas_autocorreccion, aplicar_autocorrecciones_a_dataframe
+
+    if df_incompletos.empty:
+        return df_con_asistencia, df_incompletos
+
+    usar_reglas = st.checkbox(
+        "⚙️ Autocompletar marcas únicas con reglas",
+        value=True,
+        key="usar_autocorreccion",
+        help="Completa automáticamente las marcas únicas según el horario habitual del empleado o del local. Solo las excepciones requerirán revisión manual."
+    )
+
+    if not usar_reglas:
+        return df_con_asistencia, df_incompletos
+
+    df_autocorregidos, df_pendientes = aplicar_reglas_autocorreccion(df_con_asistencia, df_incompletos)
+
+    if df_autocorregidos.empty:
+        return df_con_asistencia, df_pendientes
+
+    st.markdown(f"""
+    <div class="custom-alert alert-success">
+        <strong>⚙️ {len(df_autocorregidos)} registro(s) autocompletado(s) por reglas</strong><br>
+        {len(df_pendientes)} registro(s) requieren revisión manual. Las correcciones automáticas quedan marcadas en la columna Observaciones del reporte.
+    </div>
+    """, unsafe_allow_html=True)
+
+    with st.expander("🔎 Auditoría de autocorrecciones", expanded=False):
+        st.dataframe(
+            df_autocorregidos[['Empleado', 'Fecha', 'Horario_Registrado', 'Entrada', 'Salida', 'Auto_Correccion']],
+            use_container_width=True
+        )
+
+    return aplicar_autocorrecciones_a_dataframe(df_con_asistencia, df_autocorregidos), df_pendientes
+
+
+def mostrar_anomalias(df):
+    """
+    Muestra los registros atípicos del período (duración del turno, horario de entrada y
+    montos de descuentos/retiros). Es solo informativo: no detiene el cálculo.
+
+    Args:
+        df: DataFrame con los registros ya corregidos
+
+    Returns:
+        DataFrame: Anomalías detectadas (ver anomalias.detectar_anomalias)
+    """
+    from anomalias import detectar_anomalias, COLUMNAS_ANOMALIAS
+
+    df_anomalias = detectar_anomalias(df)
+
+    if df_anomalias.empty:
+        return df_anomalias
+
+    registros = df_anomalias.index.nunique()
+    st.markdown(f"""
+    <div class="custom-alert alert-warning">
+        <strong>📈 {len(df_anomalias)} anomalía(s) en {registros} registro(s)</strong><br>
+        Valores que se apartan de lo habitual del empleado o del período (posibles errores de reloj o irregularidades). Revisarlos no es obligatorio para calcular.
+    </div>
+    """, unsafe_allow_html=True)
+
+    with st.expander("📈 Ver anomalías del período", expanded=False):
+        st.dataframe(df_anomalias[COLUMNAS_ANOMALIAS], use_container_width=True, hide_index=True)
+
+    return df_anomalias
+
+
 def mostrar_editor_registros_incompletos(df_incompletos):
     """
     Muestra una interfaz simplificada y estable para completar registros incompletos.
@@ -247,9 +322,8 @@ def mostrar_editor_registros_incompletos(df_incompletos):
     import pandas as pd
     from datetime import datetime, timedelta
     
-    # Forzar limpieza de caché para evitar problemas de duplicación
-    st.cache_data.clear()
-    
+    # Las cachés de la sesión (ej: el Excel de resultados) se indexan por la huella de los
+    # datos, así que no hace falta vaciarlas aquí: corregir registros cambia la huella
     if df_incompletos.empty:
         return True
     
@@ -262,9 +336,8 @@ def mostrar_editor_registros_incompletos(df_incompletos):
     
     st.markdown("### 👨‍💼 Panel de Corrección Administrativa")
     
-    # Inicializar session_state de forma más limpia
-    if 'correcciones_horarios' not in st.session_state:
-        st.session_state.correcciones_horarios = {}
+    # Correcciones confirmadas: una fila por registro (ver _tabla_correcciones)
+    correcciones = _tabla_correcciones('correcciones_horarios')
     
     # Inicializar contador de cambios para evitar problemas DOM
     if 'cambios_contador' not in st.session_state:
@@ -272,8 +345,11 @@ def mostrar_editor_registros_incompletos(df_incompletos):
     
     registros_completos = 0
     
+    # Claves por Id_Registro: no cambian aunque el DataFrame se filtre u ordene entre recargas
+    from identificadores import ids_registro
+    
     # Procesar cada registro de forma más simple
-    for idx, row in df_incompletos.iterrows():
+    for numero, (idx, row) in enumerate(zip(ids_registro(df_incompletos), df_incompletos.to_dict('records')), 1):
         horario_registrado = row.get('Horario_Registrado', 'No disponible')
         tipo_problema = row.get('Tipo_Problema', 'Problema no identificado')
         
@@ -297,7 +373,7 @@ def mostrar_editor_registros_incompletos(df_incompletos):
                 st.markdown("**1️⃣ ¿Qué tipo de marca fue?**")
                 
                 # Clave única para evitar conflictos
-                select_key = f"tipo_select_{idx}_{row['Empleado'].replace(' ', '_')}"
+                select_key = f"tipo_select_{idx}"
                 
                 tipo_decision = st.selectbox(
                     f"El horario {horario_registrado} fue:",
@@ -364,11 +440,9 @@ def mostrar_editor_registros_incompletos(df_incompletos):
                     salida_final = horario_registrado
                 
                 # Botón para confirmar este registro
-                if st.form_submit_button(f"✅ Confirmar Registro {idx+1}", use_container_width=True):
+                if st.form_submit_button(f"✅ Confirmar Registro {numero}", use_container_width=True):
                     # Guardar las correcciones
-                    st.session_state.correcciones_horarios[f"{idx}_entrada"] = entrada_final
-                    st.session_state.correcciones_horarios[f"{idx}_salida"] = salida_final
-                    st.session_state.correcciones_horarios[f"{idx}_confirmado"] = True
+                    _registrar_correccion('correcciones_horarios', idx, entrada_final, salida_final)
                     
                     # Mostrar confirmación
                     horas_estimadas = _calcular_horas_trabajadas(entrada_final, salida_final)
@@ -376,9 +450,8 @@ def mostrar_editor_registros_incompletos(df_incompletos):
                     st.rerun()
             
             # Mostrar estado actual si ya está confirmado
-            if st.session_state.correcciones_horarios.get(f"{idx}_confirmado", False):
-                entrada_conf = st.session_state.correcciones_horarios.get(f"{idx}_entrada")
-                salida_conf = st.session_state.correcciones_horarios.get(f"{idx}_salida")
+            if idx in correcciones.index:
+                entrada_conf, salida_conf = correcciones.loc[idx, ['Entrada', 'Salida']]
                 
                 if entrada_conf and salida_conf:
                     horas_estimadas = _calcular_horas_trabajadas(entrada_conf, salida_conf)
@@ -457,13 +530,12 @@ def mostrar_editor_horarios_ambiguos(df_ambiguos):
     
     st.markdown("### 🔍 Revisión de Horarios Ambiguos")
     
-    # Inicializar session_state para correcciones de ambiguos
-    if 'correcciones_ambiguos' not in st.session_state:
-        st.session_state.correcciones_ambiguos = {}
-    
     correcciones_realizadas = False
     
-    for idx, row in df_ambiguos.iterrows():
+    # Claves por Id_Registro: no cambian aunque el DataFrame se filtre u ordene entre recargas
+    from identificadores import ids_registro
+    
+    for idx, row in zip(ids_registro(df_ambiguos), df_ambiguos.to_dict('records')):
         with st.expander(
             f"⚠️ {row['Empleado']} - 📅 {row['Fecha']} - {row['Razon_Sospecha'][:50]}...", 
             expanded=True
@@ -498,15 +570,11 @@ def mostrar_editor_horarios_ambiguos(df_ambiguos):
                     st.success(f"📤 Salida: {row['Entrada_Original']}")
                     
                     # Guardar la corrección
-                    st.session_state.correcciones_ambiguos[idx] = {
-                        'nueva_entrada': row['Salida_Original'],
-                        'nueva_salida': row['Entrada_Original']
-                    }
+                    _registrar_correccion('correcciones_ambiguos', idx, row['Salida_Original'], row['Entrada_Original'])
                     correcciones_realizadas = True
                 else:
                     # Mantener original
-                    if idx in st.session_state.correcciones_ambiguos:
-                        del st.session_state.correcciones_ambiguos[idx]
+                    _quitar_correccion('correcciones_ambiguos', idx)
             
             with col3:
                 st.markdown("**⏱️ Horas resultantes:**")
@@ -526,6 +594,40 @@ def mostrar_editor_horarios_ambiguos(df_ambiguos):
     return False, df_ambiguos
 
 
+def _tabla_correcciones(clave):
+    """
+    Tabla de correcciones guardada en session_state: una fila por registro corregido
+    (índice = Id_Registro) con la Entrada y Salida nuevas, lista para aplicarse de una vez
+    
+    Args:
+        clave: Clave en session_state ('correcciones_horarios' o 'correcciones_ambiguos')
+        
+    Returns:
+        DataFrame: Tabla de correcciones (vacía si aún no hay ninguna)
+    """
+    import pandas as pd
+    
+    if not isinstance(st.session_state.get(clave), pd.DataFrame):
+        st.session_state[clave] = pd.DataFrame(columns=['Entrada', 'Salida'], dtype=object)
+    return st.session_state[clave]
+
+
+def _registrar_correccion(clave, idx, entrada, salida):
+    """Guarda (o reemplaza) la corrección de un registro en la tabla de la sesión"""
+    tabla = _tabla_correcciones(clave)
+    # Los editores vuelven a registrar cada corrección en cada recarga: solo escribir si cambió
+    if idx in tabla.index and tabla.loc[idx, 'Entrada'] == entrada and tabla.loc[idx, 'Salida'] == salida:
+        return
+    tabla.loc[idx] = [entrada, salida]
+
+
+def _quitar_correccion(clave, idx):
+    """Descarta la corrección de un registro, si la había"""
+    tabla = _tabla_correcciones(clave)
+    if idx in tabla.index:
+        st.session_state[clave] = tabla.drop(index=idx)
+
+
 def aplicar_correcciones_ambiguos_a_dataframe(df_original, df_ambiguos):
     """
     Aplica las correcciones de horarios ambiguos al DataFrame original
@@ -537,31 +639,28 @@ def aplicar_correcciones_ambiguos_a_dataframe(df_original, df_ambiguos):
     Returns:
         DataFrame: DataFrame con intercambios aplicados
     """
-    import pandas as pd
-    
-    df_corregido = df_original.copy()
+    from auto_correcciones import aplicar_tabla_correcciones
+    from identificadores import COLUMNA_ID, ids_registro
     
-    if 'correcciones_ambiguos' not in st.session_state:
-        return df_corregido
+    correcciones = _tabla_correcciones('correcciones_ambiguos')
+    correcciones = correcciones[correcciones.index.isin(ids_registro(df_original))]
+    if correcciones.empty:
+        return df_original
     
-    intercambios_aplicados = 0
+    # Un solo paso para todos los intercambios
+    df_corregido = aplicar_tabla_correcciones(
+        df_original, correcciones, COLUMNA_ID if COLUMNA_ID in df_original.columns else None
+    )
     
-    for idx, correcciones in st.session_state.correcciones_ambiguos.items():
-        df_corregido.at[idx, 'Entrada'] = correcciones['nueva_entrada']
-        df_corregido.at[idx, 'Salida'] = correcciones['nueva_salida']
-        intercambios_aplicados += 1
+    st.markdown(f"""
+    <div class="custom-alert alert-success">
+        <strong>🔄 Intercambios Aplicados</strong><br>
+        Se intercambiaron los horarios en {len(correcciones)} registro(s).
+    </div>
+    """, unsafe_allow_html=True)
     
-    if intercambios_aplicados > 0:
-        st.markdown(f"""
-        <div class="custom-alert alert-success">
-            <strong>🔄 Intercambios Aplicados</strong><br>
-            Se intercambiaron los horarios en {intercambios_aplicados} registro(s).
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Limpiar session state
-        if 'correcciones_ambiguos' in st.session_state:
-            del st.session_state.correcciones_ambiguos
+    # Limpiar session state
+    del st.session_state.correcciones_ambiguos
     
     return df_corregido
 
@@ -577,41 +676,155 @@ def aplicar_correcciones_a_dataframe(df_original, df_incompletos):
     Returns:
         DataFrame: DataFrame corregido con horarios completos
     """
-    import pandas as pd
+    from auto_correcciones import aplicar_tabla_correcciones
+    from identificadores import COLUMNA_ID, ids_registro
+    
+    # Solo las correcciones de los registros incompletos actuales
+    correcciones = _tabla_correcciones('correcciones_horarios')
+    correcciones = correcciones[correcciones.index.isin(ids_registro(df_incompletos))]
+    if correcciones.empty:
+        return df_original
+    
+    # Aplicar correcciones basadas en decisiones administrativas (un solo paso para todas)
+    df_corregido = aplicar_tabla_correcciones(
+        df_original, correcciones, COLUMNA_ID if COLUMNA_ID in df_original.columns else None
+    )
     
-    df_corregido = df_original.copy()
+    # Mostrar resumen de correcciones aplicadas
+    st.markdown(f"""
+    <div class="custom-alert alert-success">
+        <strong>✅ Correcciones Aplicadas Exitosamente</strong><br>
+        Se corrigieron {len(correcciones)} registro(s) con decisiones administrativas.<br>
+        Los horarios faltantes han sido completados según tus especificaciones.
+    </div>
+    """, unsafe_allow_html=True)
     
-    if 'correcciones_horarios' not in st.session_state:
-        return df_corregido
+    return df_corregido
+
+
+def mostrar_periodos_guardados(valor_por_hora, fechas_feriados):
+    """
+    Muestra los períodos guardados en el almacén local con opciones para reabrirlos,
+    recalcularlos desde las marcaciones guardadas y consultar acumulados
     
-    # Aplicar correcciones basadas en decisiones administrativas
-    correcciones_aplicadas = 0
+    Args:
+        valor_por_hora: Valor por hora actual (para recalcular)
+        fechas_feriados: Feriados actuales (para recalcular)
+    """
+    import sqlite3
+    from almacen_periodos import hay_periodos
     
-    for idx in df_incompletos.index:
-        entrada_corregida = False
-        salida_corregida = False
-        
-        # Aplicar entrada corregida
-        if f"{idx}_entrada" in st.session_state.correcciones_horarios:
-            df_corregido.at[idx, 'Entrada'] = st.session_state.correcciones_horarios[f"{idx}_entrada"]
-            entrada_corregida = True
+    try:
+        # Consulta liviana primero: sin períodos guardados no hace falta cargar pandas
+        if not hay_periodos():
+            st.markdown("""
+            <div class="custom-alert alert-info">
+                Aún no hay períodos guardados. Usa el botón «💾 Guardar período» debajo de los resultados de un cálculo.
+            </div>
+            """, unsafe_allow_html=True)
+            return
         
-        # Aplicar salida corregida
-        if f"{idx}_salida" in st.session_state.correcciones_horarios:
-            df_corregido.at[idx, 'Salida'] = st.session_state.correcciones_horarios[f"{idx}_salida"]
-            salida_corregida = True
+        import pandas as pd
+        from almacen_periodos import listar_periodos, cargar_marcaciones, cargar_resultados, resumen_acumulado
+        from calculations import centavos_a_decimal, minutos_a_horasminutos
         
-        if entrada_corregida or salida_corregida:
-            correcciones_aplicadas += 1
+        df_periodos = listar_periodos()
+    except sqlite3.Error as e:
+        st.warning(f"⚠️ No se pudo abrir el almacén de períodos: {str(e)}")
+        return
     
-    # Mostrar resumen de correcciones aplicadas
-    if correcciones_aplicadas > 0:
-        st.markdown(f"""
-        <div class="custom-alert alert-success">
-            <strong>✅ Correcciones Aplicadas Exitosamente</strong><br>
-            Se corrigieron {correcciones_aplicadas} registro(s) con decisiones administrativas.<br>
-            Los horarios faltantes han sido completados según tus especificaciones.
-        </div>
-        """, unsafe_allow_html=True)
+    etiquetas = {
+        fila.id: f"{fila.nombre} ({fila.fecha_desde} → {fila.fecha_hasta}, {fila.registros} registros)"
+        for fila in df_periodos.itertuples()
+    }
     
-    return df_corregido
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        periodo_id = st.selectbox(
+            "Período:",
+            options=list(etiquetas.keys()),
+            format_func=lambda pid: etiquetas[pid],
+            key="periodo_guardado"
+        )
+    with col2:
+        st.markdown("<div style='margin-top: 1.7rem;'></div>", unsafe_allow_html=True)
+        reabrir = st.button("📂 Reabrir", use_container_width=True, key="reabrir_periodo")
+    with col3:
+        st.markdown("<div style='margin-top: 1.7rem;'></div>", unsafe_allow_html=True)
+        recalcular = st.button("🔁 Recalcular", use_container_width=True, key="recalcular_periodo",
+                               help="Recalcula con el valor por hora y feriados actuales usando las marcaciones guardadas")
+    
+    if reabrir or recalcular:
+        st.session_state.periodo_abierto = (periodo_id, "recalcular" if recalcular else "reabrir")
+    
+    periodo_abierto = st.session_state.get("periodo_abierto")
+    if periodo_abierto and periodo_abierto[0] == periodo_id:
+        from data_processor import mostrar_resultados
+        nombre = etiquetas[periodo_id]
+        
+        if periodo_abierto[1] == "recalcular":
+            from data_processor import calcular_periodo
+            from identificadores import asignar_id_registro
+            from registro_empleados import obtener_registro
+            # Id_Empleado del proceso (no se guarda) y los Id_Registro guardados (los períodos
+            # anteriores los reciben ahora)
+            df_marcaciones = obtener_registro().unificar(cargar_marcaciones(periodo_id))
+            df_marcaciones = asignar_id_registro(
+                df_marcaciones, df_periodos.set_index('id').loc[periodo_id, 'nombre']
+            )
+            salida_calculo = calcular_periodo(df_marcaciones, valor_por_hora, fechas_feriados, "trabajo_recalculo")
+            if salida_calculo is not None:
+                resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales = salida_calculo
+                mostrar_resultados(resultados, total_horas, total_sueldos, total_horas_normales, total_horas_especiales,
+                                   valor_por_hora, fechas_feriados, df_periodos.set_index('id').loc[periodo_id, 'nombre'])
+        else:
+            df_guardado = cargar_resultados(periodo_id)
+            resultados = pd.DataFrame({
+                "Empleado": df_guardado['empleado'],
+                "Fecha": df_guardado['fecha'],
+                "Entrada": df_guardado['entrada'],
+                "Salida": df_guardado['salida'],
+                "Feriado": df_guardado['feriado'],
+                "Horas Trabajadas (h:mm)": minutos_a_horasminutos(df_guardado['minutos_trabajados']),
+                "Horas Normales": minutos_a_horasminutos(df_guardado['minutos_normales']),
+                "Horas Especiales": minutos_a_horasminutos(df_guardado['minutos_especiales']),
+                "Descuento Inventario": df_guardado['descuento_inventario'],
+                "Descuento Caja": df_guardado['descuento_caja'],
+                "Retiro": df_guardado['retiro'],
+                "_sueldo_centavos": df_guardado['sueldo_centavos'],
+                "Observaciones": df_guardado['observaciones'],
+                "Id_Registro": df_guardado['id_registro']
+            }).to_dict('records')
+            st.markdown(f"#### 📂 {nombre}")
+            mostrar_resultados(
+                resultados,
+                df_guardado['minutos_trabajados'].sum() / 60,
+                centavos_a_decimal(df_guardado['sueldo_centavos'].sum()),
+                df_guardado['minutos_normales'].sum() / 60,
+                df_guardado['minutos_especiales'].sum() / 60,
+                nombre_archivo=df_periodos.set_index('id').loc[periodo_id, 'nombre']
+            )
+    
+    with st.expander("📊 Acumulado por empleado", expanded=False):
+        hoy = datetime.now().date()
+        col1, col2 = st.columns(2)
+        with col1:
+            desde = st.date_input("Desde:", value=hoy.replace(month=1, day=1), key="acumulado_desde")
+        with col2:
+            hasta = st.date_input("Hasta:", value=hoy, key="acumulado_hasta")
+        
+        df_acumulado = resumen_acumulado(desde.strftime('%Y-%m-%d'), hasta.strftime('%Y-%m-%d'))
+        if df_acumulado.empty:
+            st.info("No hay resultados guardados en ese rango de fechas.")
+        else:
+            df_acumulado['Horas Trabajadas'] = minutos_a_horasminutos(df_acumulado['minutos_trabajados'])
+            df_acumulado['Horas Especiales'] = minutos_a_horasminutos(df_acumulado['minutos_especiales'])
+            df_acumulado['Sueldo Total'] = df_acumulado['sueldo_centavos'].map(centavos_a_decimal)
+            st.dataframe(
+                df_acumulado.rename(columns={
+                    'empleado': 'Empleado',
+                    'dias': 'Días',
+                    'descuentos': 'Descuentos'
+                })[['Empleado', 'Días', 'Horas Trabajadas', 'Horas Especiales', 'Descuentos', 'Sueldo Total']],
+                use_container_width=True
+            )